@@ -23,14 +23,11 @@ import gi, os, subprocess, threading
 gi.require_version('Gtk', '4.0')
 gi.require_version('Adw', '1')
 
-from gi.repository import Gtk, Gio, Adw
+from gi.repository import Gtk, Gio, Adw, GLib
 from .window import GtkOllamaWindow # type: ignore
 from pathlib import Path
 from .help_overlay import Help_Overlay_ShortcutsWindow # type: ignore
 from .ollama_model import Ollama_model # type: ignore
-from .ollama_get_models import scrape_ollama_library # type: ignore
-
-from gradio_client import Client
 
 
 class GtkOllamaApplication(Adw.Application):
@@ -44,6 +41,8 @@ class GtkOllamaApplication(Adw.Application):
         self.create_action('preferences', self.on_preferences_action)
         self.create_action('help', self.on_help_action, ['F1'])
         self.create_action('open_save', self.on_open_save, ['<primary>o'])
+        self.create_action('load_conv', self.on_open_save)
+        self.create_action('export_conv', self.on_export_conv, ['<primary><shift>s'])
         self.create_action('new_conv', self.on_new_conv, ['<primary>n'])
         self.create_action('change_view', self.on_view_change)
         self.create_action('actualize_model', self.on_actualize_model)
@@ -140,13 +139,41 @@ class GtkOllamaApplication(Adw.Application):
     def on_file_chooser_response(self, dialog, response):
         """Callback pour gérer la réponse de la boîte de dialogue."""
         if response == Gtk.ResponseType.OK:
-            print("Fichier sélectionné :", dialog.get_file().get_path())
+            file_path = dialog.get_file().get_path()
+            print("Fichier sélectionné :", file_path)
+            self.props.active_window.import_conversations(file_path)
         elif response == Gtk.ResponseType.CANCEL:
             print("Action annulée.")
 
         # Fermer et détruire la boîte de dialogue
         dialog.close()
 
+    def on_export_conv(self, *args):
+        parent_window = self.props.active_window
+        if not parent_window:
+            print("Erreur : aucune fenêtre active pour afficher la boîte de dialogue.")
+            return
+
+        dialog = Gtk.FileChooserDialog(
+            title="Exporter les conversations (.jsonl ou .md)",
+            transient_for=parent_window,
+            modal=True,
+        )
+        dialog.set_action(Gtk.FileChooserAction.SAVE)
+        dialog.set_current_name("conversations.jsonl")
+        dialog.add_buttons(
+            "_Annuler", Gtk.ResponseType.CANCEL,
+            "_Exporter", Gtk.ResponseType.OK
+        )
+        dialog.connect("response", self.on_export_chooser_response)
+        dialog.show()
+
+    def on_export_chooser_response(self, dialog, response):
+        """Callback pour lancer l'export vers le fichier choisi."""
+        if response == Gtk.ResponseType.OK:
+            self.props.active_window.export_conversations(dialog.get_file().get_path())
+        dialog.close()
+
     def on_new_conv(self, *args):
         self.props.active_window.active_toggle_button =  None
         self.props.active_window._clear_messages()
@@ -176,7 +203,8 @@ class GtkOllamaApplication(Adw.Application):
         )
 
         def background_scrape():
-            # Appelle le scraper dans le thread secondaire
+            # Appelle le scraper dans le thread secondaire (bs4 n'est importé qu'ici, pas au démarrage)
+            from .ollama_get_models import scrape_ollama_library # type: ignore
             scrape_ollama_library()
 
             # Une fois terminé, met à jour l'UI dans le thread principal
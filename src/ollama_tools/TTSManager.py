@@ -1,9 +1,7 @@
-import pygame # type: ignore
 import os
 import tempfile
 import platform
 import time
-from gradio_client import Client
 from typing import Dict, Any, Optional, Generator
 
 
@@ -22,11 +20,13 @@ class TTSManager:
         """
         self.tts_client_id = tts_client_id
         self.tts_client = None
-        self._init_audio_system()
+        # Le système audio est initialisé à la première lecture (pygame n'est pas importé au démarrage)
+        self.audio_system = None
     
     def _init_audio_system(self):
         """Initialise le système audio pygame."""
         try:
+            import pygame # type: ignore
             pygame.mixer.init(frequency=22050, size=-16, channels=2, buffer=512)
             self.audio_system = "pygame"
             print("✅ Système audio pygame initialisé")
@@ -34,10 +34,11 @@ class TTSManager:
             print(f"⚠️ Impossible d'initialiser pygame: {e}")
             self.audio_system = "system"
     
-    def _get_tts_client(self) -> Client:
-        """Récupère ou crée le client TTS."""
+    def _get_tts_client(self):
+        """Récupère ou crée le client TTS (gradio_client est importé à ce moment)."""
         if self.tts_client is None:
             try:
+                from gradio_client import Client
                 self.tts_client = Client(self.tts_client_id)
                 print("✅ Client Kokoro-TTS initialisé")
             except Exception as e:
@@ -140,6 +141,8 @@ class TTSManager:
             print(f"❌ Fichier audio introuvable: {file_path}")
             return False
         
+        if self.audio_system is None:
+            self._init_audio_system()
         if self.audio_system == "pygame":
             return self._play_with_pygame(file_path)
         else:
@@ -148,6 +151,7 @@ class TTSManager:
     def _play_with_pygame(self, file_path: str) -> bool:
         """Lit l'audio avec pygame."""
         try:
+            import pygame # type: ignore
             print(f"🔊 Lecture avec pygame: {os.path.basename(file_path)}")
             
             pygame.mixer.music.load(file_path)
@@ -0,0 +1,133 @@
+import os, hashlib
+from typing import Optional
+
+
+class Blob_Store:
+    """
+    Stockage adressé par contenu des messages volumineux.
+
+    Chaque contenu au-delà du seuil est écrit une seule fois dans un fichier nommé
+    par son empreinte SHA-256 et compté à chaque message qui le référence.
+    Un fichier n'est supprimé que lorsque sa dernière référence disparaît.
+    """
+
+    def __init__(self, directory: str = f"{os.path.expanduser('~')}/Documents/saves_ollama/blobs",
+                 threshold: int = 4096) -> None:
+        """
+        Args:
+            directory (str): Le dossier contenant les blobs.
+            threshold (int): Taille (en caractères) à partir de laquelle un contenu est externalisé.
+        """
+        self.directory = directory
+        self.threshold = threshold
+        self.refcounts = {}   # empreinte -> nombre de messages qui la référencent
+        self._contents = {}   # empreinte -> contenu partagé par tous les messages identiques
+        self._pending_deletion = set()
+
+    @staticmethod
+    def digest(content: str) -> str:
+        """Retourne l'empreinte SHA-256 d'un contenu."""
+        return hashlib.sha256(content.encode('utf-8')).hexdigest()
+
+    def is_large(self, content: str) -> bool:
+        """Indique si un contenu doit être stocké dans le blob store."""
+        return isinstance(content, str) and len(content) >= self.threshold
+
+    def _path(self, digest: str) -> str:
+        return os.path.join(self.directory, digest[:2], digest)
+
+    def retain(self, content: str) -> tuple[str, str]:
+        """
+        Ajoute une référence vers un contenu, en l'écrivant sur le disque s'il est nouveau.
+        Args:
+            content (str): Le contenu à stocker.
+
+        Returns:
+            tuple[str, str]: L'empreinte et l'instance partagée du contenu.
+        """
+        digest = self.digest(content)
+        if digest not in self.refcounts:
+            self._write(digest, content)
+        return digest, self.retain_digest(digest, content)
+
+    def retain_digest(self, digest: str, content: Optional[str] = None) -> str:
+        """
+        Ajoute une référence vers un blob déjà stocké et retourne son contenu partagé.
+        """
+        self.refcounts[digest] = self.refcounts.get(digest, 0) + 1
+        self._pending_deletion.discard(digest)
+        if digest not in self._contents:
+            self._contents[digest] = content if content is not None else self.read(digest)
+        return self._contents[digest]
+
+    def release(self, digest: str) -> None:
+        """
+        Retire une référence ; le blob sera supprimé à la prochaine sauvegarde s'il n'est plus utilisé.
+        """
+        count = self.refcounts.get(digest, 0) - 1
+        if count > 0:
+            self.refcounts[digest] = count
+            return
+        self.refcounts.pop(digest, None)
+        self._contents.pop(digest, None)
+        self._pending_deletion.add(digest)
+
+    def read(self, digest: str) -> str:
+        """Lit le contenu d'un blob, ou un texte de remplacement s'il est introuvable."""
+        if digest in self._contents:
+            return self._contents[digest]
+        try:
+            with open(self._path(digest), 'r', encoding='utf-8') as f:
+                return f.read()
+        except OSError as e:
+            print(f"Blob {digest} introuvable : {e}")
+            return f"[Contenu introuvable : {digest}]"
+
+    def _write(self, digest: str, content: str) -> None:
+        """Écrit un blob de manière atomique s'il n'existe pas déjà."""
+        path = self._path(digest)
+        if os.path.exists(path):
+            return
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(content)
+        os.replace(tmp_path, path)
+
+    def flush_deletions(self) -> None:
+        """
+        Supprime les blobs qui ne sont plus référencés.
+        Appelé après l'écriture de la sauvegarde pour ne jamais laisser de référence orpheline sur le disque.
+        """
+        for digest in self._pending_deletion:
+            if digest in self.refcounts:
+                continue
+            try:
+                os.remove(self._path(digest))
+            except FileNotFoundError:
+                pass
+            except OSError as e:
+                print(f"Impossible de supprimer le blob {digest} : {e}")
+        self._pending_deletion.clear()
+
+    def collect_garbage(self) -> int:
+        """
+        Supprime du disque tous les blobs qui ne sont référencés par aucun message.
+        Returns:
+            int: Le nombre de blobs supprimés.
+        """
+        removed = 0
+        if not os.path.isdir(self.directory):
+            return removed
+        for prefix in os.listdir(self.directory):
+            prefix_dir = os.path.join(self.directory, prefix)
+            if not os.path.isdir(prefix_dir):
+                continue
+            for name in os.listdir(prefix_dir):
+                if name not in self.refcounts:
+                    try:
+                        os.remove(os.path.join(prefix_dir, name))
+                        removed += 1
+                    except OSError as e:
+                        print(f"Impossible de supprimer le blob {name} : {e}")
+        return removed
@@ -0,0 +1,216 @@
+import re, math
+from typing import Optional
+
+# Critères de tri du catalogue : pertinence de la recherche, popularité, taille, fraîcheur
+SORT_KEYS = ('relevance', 'pulls', 'size', 'updated')
+# Multiplicateurs des suffixes de nombres de téléchargements ("49.6M", "605.3K")
+PULLS_UNITS = {'': 1, 'K': 1e3, 'M': 1e6, 'B': 1e9}
+# Nombre de paramètres, en milliards, des suffixes de taille ("270m", "7b", "1t")
+PARAMETER_UNITS = {'m': 1e-3, 'b': 1, 't': 1e3}
+# Durée en secondes des unités des dates relatives ("2 weeks ago")
+AGE_UNITS = {
+    'second': 1, 'minute': 60, 'hour': 3600, 'day': 86400,
+    'week': 7 * 86400, 'month': 30 * 86400, 'year': 365 * 86400,
+}
+
+_PULLS = re.compile(r'([\d.]+)\s*([KMB]?)', re.IGNORECASE)
+# "7b", "1.5b", "270m", "8x7b" (mixture d'experts), "e2b" (paramètres effectifs)
+_PARAMETERS = re.compile(r'(?:(\d+)x)?(\d+(?:\.\d+)?)([mbt])\b', re.IGNORECASE)
+_AGE = re.compile(r'(\d+|an?)\s+(second|minute|hour|day|week|month|year)s?\s+ago')
+
+
+def parse_pulls(text: Optional[str]) -> int:
+    """Retourne le nombre de téléchargements d'un libellé comme "49.6M" (0 si illisible)."""
+    match = _PULLS.match((text or '').replace(',', '').strip())
+    if not match:
+        return 0
+    return int(float(match.group(1)) * PULLS_UNITS[match.group(2).upper()])
+
+
+def parse_parameters(text: Optional[str]) -> Optional[float]:
+    """Retourne le nombre de paramètres, en milliards, d'une taille comme "7b" ou "8x7b"."""
+    match = _PARAMETERS.search(text or '')
+    if not match:
+        return None
+    experts = int(match.group(1) or 1)
+    return experts * float(match.group(2)) * PARAMETER_UNITS[match.group(3).lower()]
+
+
+def parse_age(text: Optional[str]) -> float:
+    """Retourne l'ancienneté, en secondes, d'une date relative comme "2 weeks ago" (infinie si illisible)."""
+    text = (text or '').strip().lower()
+    if text == 'yesterday':
+        return AGE_UNITS['day']
+    match = _AGE.search(text)
+    if not match:
+        return math.inf
+    count = 1 if match.group(1) in ('a', 'an') else int(match.group(1))
+    return count * AGE_UNITS[match.group(2)]
+
+
+def canonical_name(model: str) -> str:
+    """Retourne le nom complet 'nom:tag' d'un modèle ('latest' si le tag est omis, comme le fait Ollama)."""
+    return model if ':' in model.rsplit('/', 1)[-1] else f"{model}:latest"
+
+
+def fuzzy_score(query: str, text: str) -> int:
+    """
+    Note la correspondance d'un mot recherché avec un texte (tous deux en minuscules) ; 0 si aucune.
+    Une sous-chaîne l'emporte (d'autant plus qu'elle est au début), puis une sous-séquence
+    (les lettres dans l'ordre, pénalisée par les trous).
+    """
+    index = text.find(query)
+    if index == 0:
+        return 300
+    if index > 0:
+        return 200 - min(index, 99)
+    position, gaps = 0, 0
+    for char in query:
+        found = text.find(char, position)
+        if found == -1:
+            return 0
+        gaps += found - position
+        position = found + 1
+    return max(100 - gaps, 1)
+
+
+class Catalogue_Entry:
+    """Modèle du catalogue, avec les champs de recherche et de tri précalculés."""
+    __slots__ = ('data', 'key', 'name', 'description', 'pulls', 'parameters', 'age', 'modalities')
+
+    def __init__(self, data: dict) -> None:
+        self.data = data
+        # Nom complet de la version installée par défaut, comparable aux noms des modèles locaux
+        self.key = canonical_name(data.get('name', ''))
+        self.name = data.get('name', '').lower()
+        self.description = data.get('description', '').lower()
+        self.pulls = parse_pulls(data.get('pulls'))
+        # Tailles disponibles, en milliards de paramètres, de la plus petite à la plus grande
+        self.parameters = sorted(
+            size for size in map(parse_parameters, data.get('sizes', [])) if size is not None
+        )
+        self.age = parse_age(data.get('last_updated'))
+        modalities = set()
+        for version in data.get('versions', []):
+            modalities.update(part.strip().lower() for part in (version.get('input') or '').split(',') if part.strip())
+        # Sans version connue, le modèle est supposé ne lire que du texte
+        self.modalities = frozenset(modalities or {'text'})
+
+    def score(self, words: list[str]) -> int:
+        """Note la correspondance avec les mots recherchés : chacun doit figurer dans le nom ou la description."""
+        total = 0
+        for word in words:
+            # Le nom compte davantage que la description, où seule une sous-chaîne est retenue
+            score = max(2 * fuzzy_score(word, self.name), 1 if word in self.description else 0)
+            if not score:
+                return 0
+            total += score
+        return total
+
+    def accepts(self, modality: Optional[str], max_parameters: Optional[float]) -> bool:
+        if modality is not None and modality not in self.modalities:
+            return False
+        if max_parameters is not None and not (self.parameters and self.parameters[0] <= max_parameters):
+            return False
+        return True
+
+
+class Catalogue_Index:
+    """
+    Index en mémoire du catalogue des modèles distants.
+
+    Les champs de recherche et de tri sont calculés une fois à la construction ; une recherche
+    ne parcourt que des valeurs prêtes. Une recherche qui prolonge la précédente (frappe d'une
+    lettre de plus) ne reparcourt que les résultats de celle-ci.
+    Les modèles sont aussi indexés par nom, et leurs versions par nom complet ('nom:tag').
+    """
+
+    def __init__(self, models: list[dict]) -> None:
+        self.entries = [Catalogue_Entry(model) for model in models if model.get('name')]
+        self.by_name = {entry.data['name']: entry for entry in self.entries}
+        self.by_tag = {}
+        for entry in self.entries:
+            for version in entry.data.get('versions', []):
+                if version.get('name'):
+                    self.by_tag.setdefault(version['name'], version)
+                if version.get('latest'):
+                    # La version marquée 'latest' est celle qu'installe le nom seul
+                    self.by_tag.setdefault(entry.key, version)
+        self._last = None   # (mots, modalité, taille maximale, [(note, entrée)])
+
+    def version(self, model: str) -> Optional[dict]:
+        """Retourne la version du catalogue d'un modèle ('nom' ou 'nom:tag'), None si elle est inconnue."""
+        return self.by_tag.get(canonical_name(model))
+
+    def search(self, query: str = '', sort: str = 'relevance', modality: Optional[str] = None,
+               max_parameters: Optional[float] = None) -> list[Catalogue_Entry]:
+        """
+        Recherche dans le catalogue.
+        Args:
+            query (str): Les mots recherchés (approximativement) dans le nom et la description.
+            sort (str): Le critère de tri, parmi SORT_KEYS ; 'relevance' trie par popularité sans recherche.
+            modality (str, optional): Le type d'entrée exigé ('text', 'image').
+            max_parameters (float, optional): La taille maximale, en milliards de paramètres,
+                d'au moins une des versions du modèle.
+
+        Returns:
+            list: Les entrées retenues, dans l'ordre demandé.
+        """
+        words = query.lower().split()
+        candidates = [(0, entry) for entry in self.entries]
+        if self._last is not None:
+            last_words, last_modality, last_max, last_matches = self._last
+            # Chaque mot précédent est prolongé par le mot correspondant : les résultats ne peuvent que se réduire
+            if (
+                last_modality == modality and last_max == max_parameters and len(last_words) <= len(words)
+                and all(word.startswith(last) for last, word in zip(last_words, words))
+            ):
+                candidates = last_matches
+
+        matches = []
+        for _, entry in candidates:
+            if not entry.accepts(modality, max_parameters):
+                continue
+            score = entry.score(words) if words else 0
+            if words and not score:
+                continue
+            matches.append((score, entry))
+        self._last = (words, modality, max_parameters, matches)
+
+        if sort == 'size':
+            key = lambda match: (match[1].parameters[0] if match[1].parameters else math.inf, -match[1].pulls)
+        elif sort == 'updated':
+            key = lambda match: (match[1].age, -match[1].pulls)
+        elif sort == 'relevance' and words:
+            key = lambda match: (-match[0], -match[1].pulls)
+        else:
+            key = lambda match: -match[1].pulls
+        return [entry for _, entry in sorted(matches, key=key)]
+
+
+def describe(data: dict) -> str:
+    """Retourne le résumé affiché sous le nom d'un modèle du catalogue."""
+    details = [f"{data['pulls']} téléchargements"] if data.get('pulls') else []
+    if data.get('sizes'):
+        details.append(", ".join(data['sizes']))
+    if data.get('last_updated'):
+        details.append(data['last_updated'])
+    return " · ".join(details)
+
+
+if __name__ == "__main__":
+    import json, sys, time
+    from .model_manager import CATALOGUE_FILE # type: ignore
+
+    with open(sys.argv[1] if len(sys.argv) > 1 else CATALOGUE_FILE, 'r', encoding='utf-8') as f:
+        catalogue = json.load(f)
+    start = time.perf_counter()
+    index = Catalogue_Index(catalogue)
+    print(f"Index de {len(index.entries)} modèles : {(time.perf_counter() - start) * 1000:.1f} ms")
+    # Frappe lettre par lettre, comme dans le champ de recherche
+    for sort in SORT_KEYS:
+        start = time.perf_counter()
+        for length in range(1, len("llama vision") + 1):
+            results = index.search("llama vision"[:length], sort=sort)
+        elapsed = (time.perf_counter() - start) * 1000 / len("llama vision")
+        print(f"{sort:>9} : {elapsed:.2f} ms par frappe, {len(results)} résultats")
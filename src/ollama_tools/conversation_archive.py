@@ -0,0 +1,480 @@
+import os, re, json, codecs, datetime
+from typing import Callable, Iterable, Iterator, Optional
+
+# Taille des blocs lus sur le disque lors d'un import
+READ_CHUNK_SIZE = 64 * 1024
+# Nombre de conversations écrites entre deux rapports de progression
+PROGRESS_STEP = 50
+# Taille maximale (en caractères) d'un élément de tableau ou d'une ligne JSONL importé
+MAX_ITEM_SIZE = 64 * 1024 * 1024
+
+# Horodatages d'une conversation conservés par l'export JSONL
+TIMESTAMP_KEYS = ('created_at', 'updated_at')
+# Noms des mêmes horodatages dans un export ChatGPT
+CHATGPT_TIMESTAMP_KEYS = {'created_at': 'create_time', 'updated_at': 'update_time'}
+
+# Caractères délimitant un élément JSON, hors des chaînes puis à l'intérieur
+_STRUCTURE_CHARS = re.compile(r'["\[\]{},]')
+_STRING_CHARS = re.compile(r'["\\]')
+
+ROLE_TITLES = {
+    'system': 'Système',
+    'user': 'Utilisateur',
+    'assistant': 'Assistant',
+}
+
+
+def export_to_jsonl(conversations: Iterable[dict], file_path: str,
+                    progress_callback: Optional[Callable[[float], None]] = None) -> int:
+    """
+    Exporte les conversations au format JSONL, une ligne par enregistrement.
+
+    Chaque conversation est écrite sous la forme d'une ligne d'en-tête
+    ``{"type": "conversation", ...}`` suivie d'une ligne ``{"type": "message", ...}``
+    par message : aucune conversation n'est sérialisée d'un bloc.
+    Tout l'arbre des messages est exporté, branches comprises : chaque message porte
+    son 'id' et celui de son 'parent', et l'en-tête la feuille ('leaf') du fil actif
+    ainsi que les horodatages de la conversation ('created_at', 'updated_at').
+
+    Args:
+        conversations (Iterable[dict]): Les conversations à exporter.
+        file_path (str): Le chemin du fichier de destination.
+        progress_callback (callable, optional): Reçoit la progression entre 0 et 1.
+
+    Returns:
+        int: Le nombre de conversations exportées.
+    """
+    conversations = list(conversations)  # Copie des références uniquement
+    total = len(conversations)
+    with open(file_path, 'w', encoding='utf-8') as f:
+        for index, conv in enumerate(conversations, start=1):
+            header = {
+                'type': 'conversation',
+                'id': conv.get('id'),
+                'model': conv.get('model'),
+                'title': conv.get('title'),
+            }
+            if conv.get('system'):
+                header['system'] = conv['system']
+            for key in TIMESTAMP_KEYS:
+                if conv.get(key) is not None:
+                    header[key] = conv[key]
+            history = conv.get('history', [])
+            if hasattr(history, 'to_list'):
+                header['leaf'] = history.leaf
+                history = history.to_list()
+            f.write(json.dumps(header, ensure_ascii=False))
+            f.write('\n')
+
+            for message in history:
+                record = {
+                    'type': 'message',
+                    'role': message['role'],
+                    'content': message['content'],
+                }
+                if message.get('id') is not None:
+                    record['id'] = message['id']
+                    record['parent'] = message.get('parent')
+                f.write(json.dumps(record, ensure_ascii=False))
+                f.write('\n')
+
+            _report_progress(progress_callback, index, total)
+    return total
+
+
+def export_to_markdown(conversations: Iterable[dict], file_path: str,
+                       progress_callback: Optional[Callable[[float], None]] = None) -> int:
+    """
+    Exporte les conversations dans un document Markdown lisible.
+    Seul le fil actif de chaque conversation est exporté : les autres branches
+    (messages édités ou régénérés) ne le sont qu'au format JSONL.
+
+    Args:
+        conversations (Iterable[dict]): Les conversations à exporter.
+        file_path (str): Le chemin du fichier de destination.
+        progress_callback (callable, optional): Reçoit la progression entre 0 et 1.
+
+    Returns:
+        int: Le nombre de conversations exportées.
+    """
+    conversations = list(conversations)
+    total = len(conversations)
+    with open(file_path, 'w', encoding='utf-8') as f:
+        for index, conv in enumerate(conversations, start=1):
+            f.write(f"# {conv.get('title') or 'Sans titre'}\n\n")
+            if conv.get('model'):
+                f.write(f"*Modèle : {conv['model']}*\n\n")
+            if conv.get('system'):
+                f.write(f"### {ROLE_TITLES['system']}\n\n{conv['system']}\n\n")
+
+            for message in conv.get('history', []):
+                role = ROLE_TITLES.get(message['role'], message['role'])
+                f.write(f"### {role}\n\n")
+                f.write(message['content'])
+                f.write("\n\n")
+
+            f.write("---\n\n")
+            _report_progress(progress_callback, index, total)
+    return total
+
+
+def iter_conversations_from_file(file_path: str,
+                                 progress_callback: Optional[Callable[[float], None]] = None) -> Iterator[dict]:
+    """
+    Lit un fichier d'export de manière incrémentale et produit les conversations une à une.
+
+    Formats reconnus :
+        - tableau JSON (sauvegarde de l'application, export ChatGPT ``conversations.json``,
+          export Claude, ou tout objet possédant une liste ``messages``) ;
+        - JSONL produit par :func:`export_to_jsonl`, ou une conversation par ligne.
+
+    Le fichier n'est jamais chargé entièrement : seule la conversation en cours
+    de décodage réside en mémoire. Un élément de tableau illisible est ignoré.
+
+    Args:
+        file_path (str): Le chemin du fichier à importer.
+        progress_callback (callable, optional): Reçoit la progression entre 0 et 1.
+
+    Yields:
+        dict: Une conversation au format de l'application (sans 'id') ; l'historique d'un export
+        de l'arbre garde les 'id' et 'parent' de ses messages, et la conversation sa 'leaf'.
+
+    Raises:
+        ValueError: Si un élément ou une ligne dépasse MAX_ITEM_SIZE caractères.
+    """
+    total_size = os.path.getsize(file_path) or 1
+
+    with open(file_path, 'rb') as f:
+        reader = _Chunk_Reader(f, total_size, progress_callback)
+        first = reader.peek_non_whitespace()
+        if first is None:
+            return
+        if first == '[':
+            for obj in reader.iter_array_items():
+                conversation = normalize_conversation(obj)
+                if conversation:
+                    yield conversation
+        else:
+            yield from _iter_jsonl_conversations(reader.iter_lines())
+        _report_progress(progress_callback, 1, 1)
+
+
+def normalize_conversation(obj) -> Optional[dict]:
+    """
+    Convertit une conversation d'un format tiers vers le format de l'application.
+
+    Args:
+        obj: L'objet JSON décodé.
+
+    Returns:
+        dict: La conversation normalisée, ou None si le format n'est pas reconnu.
+    """
+    if not isinstance(obj, dict):
+        return None
+
+    title = obj.get('title') or obj.get('name') or "Conversation importée"
+    model = obj.get('model') or obj.get('default_model_slug') or ""
+
+    leaf = None
+    if 'history' in obj:
+        history, leaf = _history_from_records(obj['history'], obj.get('leaf'))
+    elif 'mapping' in obj:
+        history = _history_from_chatgpt_mapping(obj['mapping'], obj.get('current_node'))
+    elif 'chat_messages' in obj:
+        history = [
+            _message('user' if m.get('sender') == 'human' else 'assistant', m.get('text'))
+            for m in obj['chat_messages'] if isinstance(m, dict)
+        ]
+    elif 'messages' in obj:
+        history = [_message(m.get('role'), m.get('content')) for m in obj['messages'] if isinstance(m, dict)]
+    else:
+        return None
+
+    conversation = {
+        'model': model,
+        'title': title,
+        'history': [m for m in history if m],
+    }
+    if conversation['history'] and 'id' in conversation['history'][0]:
+        conversation['leaf'] = leaf
+    if obj.get('system'):
+        conversation['system'] = obj['system']
+    for key in TIMESTAMP_KEYS:
+        timestamp = _timestamp(obj.get(key, obj.get(CHATGPT_TIMESTAMP_KEYS[key])))
+        if timestamp is not None:
+            conversation[key] = timestamp
+    return conversation
+
+
+def _timestamp(value) -> Optional[float]:
+    """Convertit un horodatage (secondes depuis l'epoch ou date ISO 8601) en secondes, ou retourne None."""
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return float(value)
+    if isinstance(value, str):
+        try:
+            date = datetime.datetime.fromisoformat(value.replace('Z', '+00:00'))
+        except ValueError:
+            return None
+        if date.tzinfo is None:
+            date = date.replace(tzinfo=datetime.timezone.utc)
+        return date.timestamp()
+    return None
+
+
+def _message(role, content) -> Optional[dict]:
+    """Construit un message valide ou retourne None."""
+    if isinstance(content, list):
+        # Contenu multi-parties (OpenAI / Claude) : ne garder que le texte
+        content = "\n".join(
+            part if isinstance(part, str) else str(part.get('text', ''))
+            for part in content if isinstance(part, (str, dict))
+        )
+    if role not in ROLE_TITLES or not isinstance(content, str) or not content:
+        return None
+    return {'role': role, 'content': content}
+
+
+def _history_from_records(records: list, leaf=None) -> tuple[list, Optional[int]]:
+    """
+    Reconstruit l'historique d'une conversation de l'application.
+    Si chaque message porte un 'id' (export de l'arbre), les pointeurs 'parent' sont conservés :
+    les enfants d'un message écarté (invalide) sont rattachés à son parent.
+
+    Returns:
+        tuple: Les messages valides et la feuille du fil actif (None pour un historique linéaire).
+    """
+    records = [m for m in records if isinstance(m, dict)]
+    if not records or not all(isinstance(m.get('id'), int) for m in records):
+        return [_message(m.get('role'), m.get('content')) for m in records], None
+
+    history = []
+    dropped = {}    # id d'un message écarté -> son parent
+    for record in records:
+        parent = record.get('parent')
+        while parent in dropped:
+            parent = dropped[parent]
+        entry = _message(record.get('role'), record.get('content'))
+        if entry:
+            entry['id'], entry['parent'] = record['id'], parent
+            history.append(entry)
+        else:
+            dropped[record['id']] = parent
+    while leaf in dropped:
+        leaf = dropped[leaf]
+    return history, leaf
+
+
+def _history_from_chatgpt_mapping(mapping: dict, current_node) -> list:
+    """Reconstruit le fil actif d'une conversation ChatGPT à partir de ses pointeurs parents."""
+    if not isinstance(mapping, dict):
+        return []
+    if current_node not in mapping:
+        # Sans nœud courant, prendre la dernière feuille rencontrée
+        leaves = [key for key, node in mapping.items() if not node.get('children')]
+        current_node = leaves[-1] if leaves else None
+
+    history = []
+    node_id = current_node
+    while node_id in mapping:
+        node = mapping[node_id]
+        message = node.get('message') or {}
+        role = (message.get('author') or {}).get('role')
+        parts = (message.get('content') or {}).get('parts')
+        entry = _message(role, parts)
+        if entry:
+            history.append(entry)
+        node_id = node.get('parent')
+    history.reverse()
+    return history
+
+
+def _iter_jsonl_conversations(lines: Iterator[str]) -> Iterator[dict]:
+    """Regroupe les lignes JSONL en conversations."""
+    current = None  # En-tête de la conversation en cours et ses messages bruts
+    for line in lines:
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            record = json.loads(line)
+        except json.JSONDecodeError as e:
+            print(f"Ligne JSONL ignorée : {e}")
+            continue
+
+        record_type = record.get('type') if isinstance(record, dict) else None
+        if record_type == 'conversation':
+            if current:
+                yield from _finish_conversation(current)
+            current = dict(record, history=[])
+        elif record_type == 'message':
+            if current is not None:
+                current['history'].append(record)
+        else:
+            if current:
+                yield from _finish_conversation(current)
+                current = None
+            conversation = normalize_conversation(record)
+            if conversation:
+                yield conversation
+    if current:
+        yield from _finish_conversation(current)
+
+
+def _finish_conversation(record: dict) -> Iterator[dict]:
+    """Normalise une conversation JSONL une fois tous ses messages lus."""
+    conversation = normalize_conversation(record)
+    if conversation:
+        yield conversation
+
+
+def _report_progress(progress_callback, done: int, total: int) -> None:
+    """Transmet la progression si un callback est fourni."""
+    if progress_callback and (done % PROGRESS_STEP == 0 or done >= total):
+        progress_callback(min(done / total, 1.0) if total else 1.0)
+
+
+class _Chunk_Reader:
+    """Lecture par blocs d'un fichier binaire avec décodage UTF-8 incrémental."""
+
+    def __init__(self, f, total_size: int, progress_callback=None) -> None:
+        self.f = f
+        self.total_size = total_size
+        self.progress_callback = progress_callback
+        self.decoder = codecs.getincrementaldecoder('utf-8')(errors='replace')
+        self.decoder_json = json.JSONDecoder()
+        self.buffer = ""
+        self.pos = 0
+        self.eof = False
+        self.bytes_read = 0
+
+    def _fill(self) -> bool:
+        """
+        Ajoute un bloc au tampon en abandonnant la partie déjà consommée.
+        Le bloc lu est au moins aussi grand que la partie restante : un long élément
+        est recopié un nombre logarithmique de fois.
+        """
+        if self.eof:
+            return False
+        data = self.f.read(max(READ_CHUNK_SIZE, len(self.buffer) - self.pos))
+        self.bytes_read += len(data)
+        if not data:
+            self.eof = True
+            self.buffer = self.buffer[self.pos:] + self.decoder.decode(b"", final=True)
+            self.pos = 0
+            return False
+        self.buffer = self.buffer[self.pos:] + self.decoder.decode(data)
+        self.pos = 0
+        if self.progress_callback:
+            self.progress_callback(min(self.bytes_read / self.total_size, 0.99))
+        return True
+
+    def _skip_whitespace(self) -> Optional[str]:
+        """Avance jusqu'au prochain caractère significatif et le retourne."""
+        while True:
+            while self.pos < len(self.buffer) and self.buffer[self.pos] in " \t\r\n":
+                self.pos += 1
+            if self.pos < len(self.buffer):
+                return self.buffer[self.pos]
+            if not self._fill():
+                return None
+
+    def peek_non_whitespace(self) -> Optional[str]:
+        """Retourne le premier caractère significatif sans le consommer."""
+        char = self._skip_whitespace()
+        if char == '﻿':  # BOM
+            self.pos += 1
+            char = self._skip_whitespace()
+        return char
+
+    def iter_array_items(self) -> Iterator:
+        """
+        Décode un à un les éléments d'un tableau JSON de premier niveau.
+        La fin de chaque élément est repérée avant son décodage : un élément illisible est ignoré
+        sans entraîner la suite du fichier dans le tampon.
+        """
+        self.pos += 1  # '['
+        while True:
+            char = self._skip_whitespace()
+            if char is None or char == ']':
+                return
+            if char == ',':
+                self.pos += 1
+                continue
+            item_end = self._find_item_end()
+            try:
+                obj, end = self.decoder_json.raw_decode(self.buffer, self.pos)
+                if end > item_end or self.buffer[end:item_end].strip():
+                    raise json.JSONDecodeError("Contenu inattendu après l'élément", self.buffer, min(end, item_end))
+            except json.JSONDecodeError as e:
+                print(f"Élément ignoré lors de l'import : {e.msg}")
+                if item_end >= len(self.buffer) and self.eof:
+                    return  # Fichier tronqué
+                self.pos = item_end
+                continue
+            self.pos = item_end
+            yield obj
+
+    def _find_item_end(self) -> int:
+        """
+        Cherche la fin de l'élément de tableau commençant à self.pos, en suivant la profondeur
+        des imbrications et les chaînes, et lit la suite du fichier au besoin.
+        Chaque caractère n'est examiné qu'une fois, même si l'élément s'étend sur plusieurs blocs.
+
+        Returns:
+            int: L'indice suivant l'élément dans le tampon (sa virgule ou le ']' final, ou la fin du fichier).
+        """
+        depth = 0
+        in_string = False
+        scanned = 0  # Caractères déjà examinés depuis self.pos
+        while True:
+            buffer = self.buffer
+            index = self.pos + scanned
+            while True:
+                match = (_STRING_CHARS if in_string else _STRUCTURE_CHARS).search(buffer, index)
+                if match is None:
+                    index = max(index, len(buffer))
+                    break
+                char = match.group()
+                index = match.end()
+                if in_string:
+                    if char == '\\':
+                        index += 1  # Caractère échappé
+                        continue
+                    in_string = False
+                    if depth == 0:
+                        return index
+                elif char == '"':
+                    in_string = True
+                elif char in '[{':
+                    depth += 1
+                elif char in ']}':
+                    if depth == 0:
+                        return index - 1
+                    depth -= 1
+                    if depth == 0:
+                        return index
+                elif depth == 0:  # ','
+                    return index - 1
+
+            scanned = index - self.pos
+            if scanned > MAX_ITEM_SIZE:
+                raise ValueError(f"Élément de plus de {MAX_ITEM_SIZE} caractères : fichier corrompu ou trop volumineux")
+            if not self._fill():
+                return len(self.buffer)
+
+    def iter_lines(self) -> Iterator[str]:
+        """Produit les lignes du fichier sans le charger entièrement."""
+        while True:
+            newline = self.buffer.find('\n', self.pos)
+            if newline != -1:
+                line = self.buffer[self.pos:newline]
+                self.pos = newline + 1
+                yield line
+                continue
+            if len(self.buffer) - self.pos > MAX_ITEM_SIZE:
+                raise ValueError(f"Ligne de plus de {MAX_ITEM_SIZE} caractères : fichier corrompu ou trop volumineux")
+            if not self._fill():
+                if self.pos < len(self.buffer):
+                    yield self.buffer[self.pos:]
+                    self.pos = len(self.buffer)
+                return
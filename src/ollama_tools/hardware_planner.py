@@ -0,0 +1,228 @@
+import os, re
+from typing import Optional
+from .catalogue_index import parse_parameters # type: ignore
+
+# Taille du contexte utilisée par Ollama quand num_ctx n'est pas précisé
+DEFAULT_NUM_CTX = 4096
+# Octets par paramètre d'un modèle quantifié en Q4_K_M (quantification par défaut des modèles Ollama),
+# pour estimer le nombre de paramètres d'après la taille du fichier
+BYTES_PER_PARAMETER = 0.6
+# Cache clé/valeur (fp16) par token de contexte et par milliard de paramètres (ordre de grandeur
+# des modèles récents à attention groupée : Llama 3, Qwen 2.5, Gemma 3...)
+KV_BYTES_PER_TOKEN = 16 * 1024
+# Mémoire de travail du moteur d'inférence (tampons de calcul, graphe)
+RUNTIME_OVERHEAD = 512 * 1024 ** 2
+# Part de la mémoire disponible qu'un modèle peut occuper sans gêner le reste du système
+MEMORY_HEADROOM = 0.9
+# Débit mémoire effectif supposé d'un processeur de bureau (octets/s) : sur CPU, chaque token
+# généré relit l'ensemble des poids, le débit de génération en dépend directement
+CPU_MEMORY_BANDWIDTH = 25e9
+# Facteur appliqué au débit sans instructions vectorielles larges (AVX2 sur x86, NEON sur ARM)
+NO_SIMD_FACTOR = 0.4
+# Facteur appliqué au débit d'un modèle qui ne tient pas en mémoire (lectures sur le swap)
+SWAP_FACTOR = 0.05
+# Nombre de cœurs en dessous duquel le calcul, plutôt que la mémoire, limite le débit
+MIN_CORES = 4
+# Débit de génération (tokens/s) en dessous duquel un avertissement est affiché
+MIN_USABLE_TPS = 5
+# Ordre de classement des niveaux d'adéquation
+FIT_LEVELS = ('fits', 'tight', 'swap')
+
+_SIZE = re.compile(r'([\d.]+)\s*([KMGT]?)B', re.IGNORECASE)
+_CONTEXT = re.compile(r'([\d.]+)\s*([KM]?)', re.IGNORECASE)
+_SIZE_UNITS = {'': 1, 'K': 1e3, 'M': 1e6, 'G': 1e9, 'T': 1e12}
+_CONTEXT_UNITS = {'': 1, 'K': 1024, 'M': 1024 ** 2}
+
+
+def parse_size(text: Optional[str]) -> Optional[int]:
+    """Retourne la taille en octets d'un libellé comme "4.7GB" (None si illisible)."""
+    match = _SIZE.search(text or '')
+    if not match:
+        return None
+    return int(float(match.group(1)) * _SIZE_UNITS[match.group(2).upper()])
+
+
+def parse_context(text: Optional[str]) -> Optional[int]:
+    """Retourne la longueur de contexte, en tokens, d'un libellé comme "128K" (None si illisible)."""
+    match = _CONTEXT.match((text or '').strip())
+    if not match:
+        return None
+    return int(float(match.group(1)) * _CONTEXT_UNITS[match.group(2).upper()])
+
+
+def format_bytes(size: float) -> str:
+    return f"{size / 1e9:.1f} Go"
+
+
+def format_speed(tokens_per_second: float) -> str:
+    return f"~{tokens_per_second:.0f} tokens/s" if tokens_per_second >= 10 else f"~{tokens_per_second:.1f} tokens/s"
+
+
+def read_meminfo(path: str = '/proc/meminfo') -> dict[str, int]:
+    """Retourne les compteurs de /proc/meminfo, en octets ({} si le fichier est illisible)."""
+    values = {}
+    try:
+        with open(path, 'r', encoding='ascii') as f:
+            for line in f:
+                key, _, value = line.partition(':')
+                fields = value.split()
+                if fields and fields[0].isdigit():
+                    values[key] = int(fields[0]) * (1024 if len(fields) > 1 else 1)
+    except OSError:
+        pass
+    return values
+
+
+def read_cpuinfo(path: str = '/proc/cpuinfo') -> tuple[int, frozenset]:
+    """
+    Retourne le nombre de processeurs logiques et les extensions du processeur
+    (champ flags sur x86, Features sur ARM) lus dans /proc/cpuinfo.
+    """
+    count, flags = 0, set()
+    try:
+        with open(path, 'r', encoding='utf-8', errors='replace') as f:
+            for line in f:
+                key, _, value = line.partition(':')
+                key = key.strip()
+                if key == 'processor':
+                    count += 1
+                elif key in ('flags', 'Features') and not flags:
+                    flags.update(value.split())
+    except OSError:
+        pass
+    return count or os.cpu_count() or 1, frozenset(flags)
+
+
+class Version_Plan:
+    """Estimation, pour cette machine, de l'exécution d'une version d'un modèle."""
+    __slots__ = ('version', 'num_ctx', 'footprint', 'tokens_per_second', 'fit', 'warnings')
+
+    def __init__(self, version: dict, num_ctx: int) -> None:
+        self.version = version
+        self.num_ctx = num_ctx
+        self.footprint = None           # Mémoire nécessaire (octets), None si la taille est inconnue
+        self.tokens_per_second = None
+        self.fit = 'fits'               # Un des FIT_LEVELS
+        self.warnings = []
+
+    @property
+    def name(self) -> str:
+        return self.version.get('name', '')
+
+    def summary(self) -> str:
+        """Retourne le résumé affiché sous la version."""
+        if self.footprint is None:
+            return "Besoins inconnus"
+        return (
+            f"≈ {format_bytes(self.footprint)} avec {self.num_ctx} tokens de contexte"
+            f" · {format_speed(self.tokens_per_second)}"
+        )
+
+
+class Hardware_Planner:
+    """
+    Estime, d'après la mémoire et le processeur de la machine (lus dans /proc), la mémoire
+    nécessaire et le débit de génération de chaque version d'un modèle, pour une inférence
+    sur le processeur. Les versions sont classées par adéquation puis par débit attendu.
+
+    La mémoire disponible est relue à chaque estimation ; les caractéristiques du
+    processeur ne sont lues qu'une fois.
+    """
+
+    _default = None
+
+    @classmethod
+    def get_default(cls) -> "Hardware_Planner":
+        """Retourne le planificateur partagé par toute l'application."""
+        if cls._default is None:
+            cls._default = cls()
+        return cls._default
+
+    def __init__(self, meminfo_path: str = '/proc/meminfo', cpuinfo_path: str = '/proc/cpuinfo') -> None:
+        self.meminfo_path = meminfo_path
+        self.cores, self.cpu_flags = read_cpuinfo(cpuinfo_path)
+
+    @property
+    def has_simd(self) -> bool:
+        """Indique si le processeur dispose des instructions vectorielles utilisées par llama.cpp."""
+        return bool({'avx2', 'asimd', 'neon'} & self.cpu_flags)
+
+    def plan(self, version: dict, num_ctx: int = DEFAULT_NUM_CTX) -> Version_Plan:
+        """
+        Estime l'exécution d'une version.
+        Args:
+            version (dict): La version, telle que relevée dans le catalogue (name, size, context...).
+            num_ctx (int): La taille de contexte demandée (limitée à celle du modèle).
+        """
+        context = parse_context(version.get('context'))
+        plan = Version_Plan(version, min(num_ctx, context) if context else num_ctx)
+        weights = parse_size(version.get('size'))
+        if weights is None:
+            return plan
+
+        tag = version.get('name', '').partition(':')[2]
+        parameters = parse_parameters(tag) or weights / BYTES_PER_PARAMETER / 1e9
+        kv_cache = KV_BYTES_PER_TOKEN * parameters * plan.num_ctx
+        plan.footprint = weights + kv_cache + RUNTIME_OVERHEAD
+
+        memory = read_meminfo(self.meminfo_path)
+        total = memory.get('MemTotal')
+        available = memory.get('MemAvailable', total)
+        if total:
+            if plan.footprint <= available * MEMORY_HEADROOM:
+                plan.fit = 'fits'
+            elif plan.footprint <= total * MEMORY_HEADROOM:
+                plan.fit = 'tight'
+                plan.warnings.append(
+                    f"Ce modèle nécessite ≈ {format_bytes(plan.footprint)} alors que {format_bytes(available)}"
+                    " sont disponibles : fermez des applications avant de l'utiliser."
+                )
+            else:
+                plan.fit = 'swap'
+                plan.warnings.append(
+                    f"Ce modèle nécessite ≈ {format_bytes(plan.footprint)}, plus que ce que la mémoire de la machine"
+                    f" ({format_bytes(total)}) peut lui consacrer : le système va utiliser le swap et devenir très lent."
+                )
+
+        speed = CPU_MEMORY_BANDWIDTH / (weights + kv_cache)
+        if not self.has_simd:
+            speed *= NO_SIMD_FACTOR
+        if self.cores < MIN_CORES:
+            speed *= self.cores / MIN_CORES
+        if plan.fit == 'swap':
+            speed *= SWAP_FACTOR
+        plan.tokens_per_second = speed
+
+        if not self.has_simd and self.cpu_flags:
+            plan.warnings.append("Le processeur ne dispose pas d'AVX2 : la génération sera lente.")
+        if speed < MIN_USABLE_TPS:
+            plan.warnings.append(f"Génération estimée à {format_speed(speed)} sur cette machine.")
+        return plan
+
+    def rank(self, versions: list[dict], num_ctx: int = DEFAULT_NUM_CTX) -> list[Version_Plan]:
+        """
+        Estime des versions et les classe : celles qui tiennent en mémoire d'abord, puis par débit ;
+        les versions de taille inconnue en dernier.
+        """
+        plans = [self.plan(version, num_ctx) for version in versions]
+        return sorted(plans, key=lambda plan: (
+            plan.footprint is None, FIT_LEVELS.index(plan.fit), -(plan.tokens_per_second or 0),
+        ))
+
+
+if __name__ == "__main__":
+    import json, sys
+    from .model_manager import CATALOGUE_FILE # type: ignore
+
+    planner = Hardware_Planner()
+    memory = read_meminfo()
+    print(f"{planner.cores} processeurs logiques, SIMD : {'oui' if planner.has_simd else 'non'}, "
+          f"mémoire disponible : {format_bytes(memory.get('MemAvailable', 0))} / {format_bytes(memory.get('MemTotal', 0))}")
+    with open(CATALOGUE_FILE, 'r', encoding='utf-8') as f:
+        catalogue = {model.get('name'): model for model in json.load(f)}
+    for name in sys.argv[1:]:
+        print(name)
+        for plan in planner.rank(catalogue.get(name, {}).get('versions', [])):
+            print(f"  [{plan.fit:>5}] {plan.name} : {plan.summary()}")
+            for warning in plan.warnings:
+                print(f"          {warning}")
@@ -0,0 +1,220 @@
+import sys
+from typing import Iterator, Optional
+
+# Sentinelle : "rattacher au dernier message du fil actif"
+_ACTIVE_LEAF = object()
+
+
+class Message:
+    """
+    Message d'une conversation, stocké de manière compacte.
+
+    Les attributs sont déclarés dans __slots__ (pas de dictionnaire par instance)
+    et le rôle est interné : tous les messages d'un même rôle partagent la même chaîne.
+    L'accès par clé (message['content']) reste possible pour le code existant.
+    """
+    __slots__ = ('id', 'parent', 'role', 'content', 'blob')
+
+    def __init__(self, id: int, parent: Optional[int], role: str, content: str, blob: Optional[str] = None) -> None:
+        self.id = id
+        self.parent = parent
+        self.role = sys.intern(role)
+        self.content = content
+        self.blob = blob
+
+    def __getitem__(self, key: str):
+        if key not in self.__slots__:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def __setitem__(self, key: str, value) -> None:
+        if key not in self.__slots__:
+            raise KeyError(key)
+        setattr(self, key, sys.intern(value) if key == 'role' else value)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self.__slots__ and getattr(self, key) is not None
+
+    def get(self, key: str, default=None):
+        """Équivalent de dict.get, pour la compatibilité avec les anciens messages."""
+        return getattr(self, key) if key in self else default
+
+    def to_dict(self) -> dict:
+        """Retourne une représentation compatible JSON du message."""
+        data = {'id': self.id, 'parent': self.parent, 'role': self.role, 'content': self.content}
+        if self.blob is not None:
+            data['blob'] = self.blob
+        return data
+
+    def __repr__(self) -> str:
+        return f"Message({self.to_dict()!r})"
+
+
+class Message_Tree:
+    """
+    Historique d'une conversation stocké sous forme d'arbre de messages.
+
+    Chaque message connaît son parent : une édition ou une régénération crée
+    une nouvelle branche qui partage le préfixe existant sans le copier.
+    Le fil actif est défini par sa feuille ('leaf') et se parcourt en O(profondeur).
+    """
+
+    def __init__(self) -> None:
+        self.nodes = {}         # id -> Message
+        self.children = {None: []}  # id parent -> ids des enfants (None = racine)
+        self.selected = {}      # id parent -> enfant sur la dernière branche consultée
+        self.leaf = None
+        self._next_id = 1
+
+    @classmethod
+    def from_rows(cls, rows: list, leaf: Optional[int] = None) -> "Message_Tree":
+        """
+        Reconstruit un arbre depuis sa forme sauvegardée.
+        Args:
+            rows (list): Les lignes [id, parent, role, content, ...], parents avant enfants.
+            leaf (int, optional): La feuille du fil actif.
+
+        Returns:
+            Message_Tree: L'arbre reconstruit.
+        """
+        tree = cls()
+        for row in rows:
+            tree._insert(row[0], row[1], row[2], row[3])
+
+        tree._next_id = max(tree.nodes, default=0) + 1
+        last = rows[-1][0] if rows else None
+        tree.switch_branch(leaf if leaf in tree.nodes else last)
+        return tree
+
+    def to_list(self) -> list:
+        """
+        Retourne tous les messages de l'arbre, parents avant enfants.
+        """
+        return list(self.nodes.values())
+
+    def _insert(self, node_id: int, parent: Optional[int], role: str, content: str) -> Message:
+        """Insère un nœud sans modifier le fil actif."""
+        node = Message(node_id, parent, role, content)
+        self.nodes[node_id] = node
+        self.children.setdefault(parent, []).append(node_id)
+        return node
+
+    def add(self, role: str, content: str, parent=_ACTIVE_LEAF) -> Message:
+        """
+        Ajoute un message et en fait la nouvelle feuille du fil actif.
+        Args:
+            role (str): Le rôle du message ('user', 'assistant').
+            content (str): Le contenu du message.
+            parent (int, optional): Le message parent. Par défaut, la feuille actuelle.
+
+        Returns:
+            Message: Le message ajouté.
+        """
+        if parent is _ACTIVE_LEAF:
+            parent = self.leaf
+        node = self._insert(self._next_id, parent, role, content)
+        self._next_id += 1
+        self.set_leaf(node.id)
+        return node
+
+    def get(self, node_id: int) -> Optional[Message]:
+        """Retourne le message correspondant à l'ID ou None."""
+        return self.nodes.get(node_id)
+
+    def set_leaf(self, node_id: Optional[int]) -> None:
+        """
+        Termine le fil actif sur node_id et mémorise la branche suivie à chaque niveau.
+        Args:
+            node_id (int): Le message qui devient la fin du fil actif (None pour un fil vide).
+        """
+        self.leaf = node_id
+        while node_id is not None:
+            parent = self.nodes[node_id].parent
+            self.selected[parent] = node_id
+            node_id = parent
+
+    def switch_branch(self, node_id: Optional[int]) -> None:
+        """
+        Active la branche passant par node_id, en redescendant jusqu'à sa dernière feuille consultée.
+        Args:
+            node_id (int): Un message de la branche à activer.
+        """
+        self.set_leaf(node_id)
+        child = self._selected_child(node_id)
+        while child is not None:
+            self.leaf = child
+            child = self._selected_child(child)
+
+    def _selected_child(self, node_id: Optional[int]) -> Optional[int]:
+        """Retourne l'enfant à suivre sous node_id, ou None si c'est une feuille."""
+        children = self.children.get(node_id)
+        if not children:
+            return None
+        selected = self.selected.get(node_id)
+        return selected if selected in children else children[-1]
+
+    def siblings(self, node_id: int) -> list:
+        """
+        Retourne les IDs des versions alternatives d'un message (lui compris), dans l'ordre de création.
+        """
+        node = self.nodes.get(node_id)
+        if node is None:
+            return []
+        return self.children.get(node.parent, [])
+
+    def path(self, leaf=_ACTIVE_LEAF) -> list:
+        """
+        Retourne les messages de la racine jusqu'à leaf (par défaut la feuille active).
+        """
+        if leaf is _ACTIVE_LEAF:
+            leaf = self.leaf
+        messages = []
+        while leaf is not None:
+            node = self.nodes[leaf]
+            messages.append(node)
+            leaf = node.parent
+        messages.reverse()
+        return messages
+
+    def remove(self, node_id: int) -> bool:
+        """
+        Supprime un message ; ses réponses sont rattachées à son parent.
+        Args:
+            node_id (int): L'ID du message à supprimer.
+
+        Returns:
+            bool: True si le message existait.
+        """
+        node = self.nodes.pop(node_id, None)
+        if node is None:
+            return False
+
+        parent = node.parent
+        children = self.children.pop(node_id, [])
+        for child in children:
+            self.nodes[child].parent = parent
+
+        siblings = self.children[parent]
+        index = siblings.index(node_id)
+        siblings[index:index + 1] = children
+
+        selected = self.selected.pop(node_id, None)
+        if self.selected.get(parent) == node_id:
+            if selected is not None:
+                self.selected[parent] = selected
+            else:
+                del self.selected[parent]
+
+        if self.leaf == node_id:
+            if children:
+                self.switch_branch(parent)
+            else:
+                self.set_leaf(parent)
+        return True
+
+    def __iter__(self) -> Iterator[Message]:
+        """Parcourt les messages du fil actif."""
+        return iter(self.path())
+
+    def __len__(self) -> int:
+        return len(self.path())
@@ -0,0 +1,275 @@
+import os, json
+from concurrent.futures import ThreadPoolExecutor
+from gi.repository import GObject, GLib, Gio
+from typing import Callable, Optional
+from .catalogue_index import Catalogue_Index, canonical_name, fuzzy_score # type: ignore
+
+# Dernier inventaire local connu, affiché immédiatement au démarrage
+STATE_FILE = f"{os.path.expanduser('~')}/Documents/saves_ollama/models_state.json"
+# Catalogue des modèles distants produit par scrape_ollama_library
+CATALOGUE_FILE = f"{os.path.expanduser('~')}/Documents/saves_ollama/ollama_models.json"
+
+# Catégories de la vue des modèles, dans leur ordre d'affichage
+CATEGORY_TITLES = {
+    'downloading': "Modele en cours de Téléchargement...",
+    'local': "Modèles locaux",
+    'distant': "Modèles distant",
+}
+
+
+class Model_Item(GObject.Object):
+    """Élément de la liste des modèles : les données d'un modèle et sa catégorie."""
+    __gtype_name__ = "ModelItem"
+
+    def __init__(self, data: dict, category: str, rank: int = 0) -> None:
+        super().__init__()
+        self.data = data
+        self.category = category
+        self.rank = rank    # Rang dans les résultats de la recherche (modèles distants)
+
+    @property
+    def name(self) -> str:
+        return self.data.get('name', '')
+
+    def same_as(self, other: "Model_Item") -> bool:
+        return (
+            self.category == other.category and self.rank == other.rank
+            and (self.data is other.data or self.data == other.data)
+        )
+
+
+class Model_Manager(GObject.Object):
+    """
+    Inventaire des modèles locaux et catalogue des modèles distants.
+
+    Les requêtes à l'API et les lectures du catalogue sont faites par un thread de travail,
+    dans l'ordre de leur demande. Les résultats sont publiés dans le thread principal sur
+    self.sections : un Gio.ListStore contenant, par catégorie, un Gio.ListStore de Model_Item,
+    qui n'est modifié que là où il diffère. Les modèles distants affichés sont ceux de la
+    recherche en cours dans l'index du catalogue (voir search()), hors modèles installés ou en
+    cours de téléchargement : quand seul l'inventaire local change, seules les lignes des modèles
+    concernés sont insérées ou retirées, sans reparcourir le catalogue.
+    Au démarrage, le dernier inventaire connu est publié sans attendre l'API.
+    """
+    __gtype_name__ = "ModelManager"
+
+    __gsignals__ = {
+        # Les noms des modèles locaux ont changé
+        'local-models-changed': (GObject.SignalFlags.RUN_FIRST, None, ()),
+    }
+
+    def __init__(self, client, state_file: str = STATE_FILE, catalogue_file: str = CATALOGUE_FILE) -> None:
+        """
+        Args:
+            client (Ollama_client): Le client de l'API Ollama.
+            state_file (str): Le fichier du dernier inventaire local connu.
+            catalogue_file (str): Le fichier JSON du catalogue distant.
+        """
+        super().__init__()
+        self.client = client
+        self.state_file = state_file
+        self.catalogue_file = catalogue_file
+        self.sections = Gio.ListStore(item_type=Gio.ListStore)
+        self._stores = {}
+        for category in CATEGORY_TITLES:
+            self._stores[category] = Gio.ListStore(item_type=Model_Item)
+            self.sections.append(self._stores[category])
+        self.local_models = []
+        self.downloading = []
+        self.index = Catalogue_Index([])
+        # Recherche en cours : (texte, tri, type d'entrée, taille maximale)
+        self.query = ('', 'relevance', None, None)
+        self._results = {}      # nom complet -> (rang, entrée), pour les résultats de la recherche en cours
+        self._hidden = set()    # noms complets des modèles retirés de la liste distante
+        self._catalogue = None  # liste lue par le thread de travail lors de la dernière construction de l'index
+        self._saved_local = None
+        self._worker = ThreadPoolExecutor(max_workers=1, thread_name_prefix="model_manager")
+
+        self._load_state()
+
+    @property
+    def local_names(self) -> list[str]:
+        return [model['name'] for model in self.local_models if 'name' in model]
+
+    def supports_images(self, model: str) -> bool:
+        """
+        Indique si un modèle accepte des images, d'après le type d'entrée relevé dans le catalogue.
+        Un modèle absent du catalogue est supposé les accepter (le serveur tranchera).
+        """
+        version = self.index.version(model)
+        if version is not None and version.get('input'):
+            return 'image' in version['input'].lower()
+        return True
+
+    def refresh(self) -> None:
+        """Relit l'inventaire local et, s'il a changé sur le disque, le catalogue distant."""
+        self._worker.submit(self._fetch)
+
+    def delete(self, name: str, on_done: Optional[Callable[[bool], None]] = None) -> None:
+        """
+        Supprime un modèle local puis met l'inventaire à jour.
+        Args:
+            name (str): Le nom du modèle.
+            on_done (callable, optional): Reçoit True si la suppression a réussi (thread principal).
+        """
+        def task() -> None:
+            try:
+                self.client.delete_model(name)
+                success = True
+            except Exception as e:
+                print(f"Erreur lors de la suppression du modèle {name} : {e}")
+                success = False
+            self._fetch()
+            if on_done:
+                GLib.idle_add(on_done, success)
+
+        self._worker.submit(task)
+
+    def search(self, query: str = '', sort: str = 'relevance', modality: Optional[str] = None,
+               max_parameters: Optional[float] = None) -> None:
+        """
+        Filtre et trie les modèles affichés (voir Catalogue_Index.search()).
+        Le texte recherché s'applique aussi aux modèles locaux, par leur nom ; le tri
+        et les filtres ne concernent que le catalogue distant.
+        """
+        self.query = (query, sort, modality, max_parameters)
+        self._update_local()
+        self._update_distant()
+
+    def set_downloading(self, model: dict) -> None:
+        """
+        Place un modèle dans la catégorie des téléchargements en cours.
+        Args:
+            model (dict): Les données du modèle, dont 'name' est le nom téléchargé ('nom' ou 'nom:tag') :
+                le modèle quitte la catégorie quand ce nom apparaît dans l'inventaire local.
+        """
+        key = canonical_name(model.get('name', ''))
+        if all(canonical_name(m.get('name', '')) != key for m in self.downloading):
+            self.downloading.append(model)
+            self._update_local()
+            self._update_hidden()
+
+    def cancel_downloading(self, name: str) -> None:
+        """Retire un modèle des téléchargements en cours (téléchargement échoué)."""
+        key = canonical_name(name)
+        downloading = [m for m in self.downloading if canonical_name(m.get('name', '')) != key]
+        if len(downloading) != len(self.downloading):
+            self.downloading = downloading
+            self._update_local()
+            self._update_hidden()
+
+    def _fetch(self) -> None:
+        """Interroge l'API et relit le catalogue si nécessaire ; exécuté par le thread de travail."""
+        local_models = self.client.get_list_models().get('models')
+        if local_models is not None and local_models != self._saved_local:
+            self._save_state(local_models)
+        # Le client retourne la même liste tant que le fichier du catalogue n'a pas changé
+        catalogue = self.client.get_distant_models(self.catalogue_file)
+        index = None
+        if catalogue is not self._catalogue:
+            index = Catalogue_Index(catalogue)
+            self._catalogue = catalogue
+        GLib.idle_add(self._publish, local_models, index)
+
+    def _publish(self, local_models: Optional[list], index: Optional[Catalogue_Index]) -> bool:
+        """Publie un nouvel état dans le thread principal ; None conserve la valeur précédente."""
+        if local_models is not None and local_models != self.local_models:
+            names_changed = [m.get('name') for m in local_models] != self.local_names
+            self.local_models = local_models
+            # Un modèle téléchargé apparaît dans l'inventaire local
+            names = {canonical_name(name) for name in self.local_names}
+            self.downloading = [model for model in self.downloading if canonical_name(model.get('name', '')) not in names]
+            self._update_local()
+            if names_changed:
+                self.emit('local-models-changed')
+        if index is not None:
+            self.index = index
+            self._update_distant()
+        else:
+            self._update_hidden()
+        return False
+
+    def _hidden_names(self) -> set[str]:
+        """Noms complets des modèles installés ou en cours de téléchargement."""
+        names = {canonical_name(name) for name in self.local_names}
+        names.update(canonical_name(model.get('name', '')) for model in self.downloading)
+        return names
+
+    def _update_local(self) -> None:
+        """Met à jour les téléchargements et les modèles locaux répondant à la recherche."""
+        words = self.query[0].lower().split()
+        local_models = [
+            model for model in self.local_models
+            if all(fuzzy_score(word, model.get('name', '').lower()) for word in words)
+        ]
+        self._splice(self._stores['downloading'], [Model_Item(model, 'downloading') for model in self.downloading])
+        self._splice(self._stores['local'], [Model_Item(model, 'local') for model in local_models])
+
+    def _update_distant(self) -> None:
+        """Recalcule la recherche dans le catalogue (recherche ou catalogue modifiés)."""
+        results = self.index.search(*self.query)
+        self._results = {entry.key: (rank, entry) for rank, entry in enumerate(results)}
+        self._hidden = self._hidden_names()
+        self._splice(self._stores['distant'], [
+            Model_Item(entry.data, 'distant', rank) for rank, entry in enumerate(results)
+            if entry.key not in self._hidden
+        ])
+
+    def _update_hidden(self) -> None:
+        """
+        Retire de la liste distante les modèles nouvellement installés et y remet les modèles
+        supprimés : seules les lignes concernées sont touchées (recherche dichotomique par rang).
+        """
+        hidden = self._hidden_names()
+        store = self._stores['distant']
+        for key in hidden ^ self._hidden:
+            if key not in self._results:
+                continue
+            rank, entry = self._results[key]
+            low, high = 0, store.get_n_items()
+            while low < high:
+                middle = (low + high) // 2
+                if store.get_item(middle).rank < rank:
+                    low = middle + 1
+                else:
+                    high = middle
+            present = low < store.get_n_items() and store.get_item(low).rank == rank
+            if key in hidden and present:
+                store.remove(low)
+            elif key not in hidden and not present:
+                store.insert(low, Model_Item(entry.data, 'distant', rank))
+        self._hidden = hidden
+
+    @staticmethod
+    def _splice(store: Gio.ListStore, rows: list[Model_Item]) -> None:
+        """Remplace, en un seul splice, la seule plage de lignes qui diffère de l'état affiché."""
+        count = store.get_n_items()
+        start = 0
+        while start < min(count, len(rows)) and store.get_item(start).same_as(rows[start]):
+            start += 1
+        end_old, end_new = count, len(rows)
+        while end_old > start and end_new > start and store.get_item(end_old - 1).same_as(rows[end_new - 1]):
+            end_old -= 1
+            end_new -= 1
+        if start < end_old or start < end_new:
+            store.splice(start, end_old - start, rows[start:end_new])
+
+    def _load_state(self) -> None:
+        """Publie le dernier inventaire local enregistré (le catalogue est lu par refresh())."""
+        try:
+            with open(self.state_file, 'r', encoding='utf-8') as f:
+                self.local_models = json.load(f).get('local', [])
+        except (OSError, ValueError):
+            return
+        self._saved_local = self.local_models
+        self._update_local()
+
+    def _save_state(self, local_models: list) -> None:
+        """Enregistre l'inventaire local ; exécuté par le thread de travail."""
+        try:
+            os.makedirs(os.path.dirname(self.state_file), exist_ok=True)
+            with open(self.state_file, 'w', encoding='utf-8') as f:
+                json.dump({'local': local_models}, f)
+            self._saved_local = local_models
+        except OSError as e:
+            print(f"Erreur lors de l'enregistrement de l'état des modèles : {e}")
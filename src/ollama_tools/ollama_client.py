@@ -8,6 +8,7 @@ class Ollama_client:
         :param api_url: URL de l'API pour récupérer les modèles (par défaut localhost).
         """
         self.api_url = api_url
+        self._catalogue_cache = {}  # chemin -> (date de modification, taille, modèles)
 
     def get_list_models(self) -> json:
         """
@@ -25,30 +26,39 @@ class Ollama_client:
             print(f"Erreur lors de la récupération des modèles : {e}")
             return {}
 
-    def get_distant_models(self, file_path=f"{os.path.expanduser('~')}/Documents/saves_ollama/ollama_models.json") -> None:
+    def get_distant_models(self, file_path=f"{os.path.expanduser('~')}/Documents/saves_ollama/ollama_models.json") -> list:
         """
         Charge les modele distant à partir d'un fichier JSON.
+        Le catalogue est conservé en mémoire : le fichier n'est relu que si sa date de modification
+        ou sa taille a changé, et la même liste est retournée tant qu'il est inchangé.
         Args:
             file_path (str): Le chemin du fichier contenant les données JSON.
         """
+        try:
+            stat = os.stat(file_path)
+        except FileNotFoundError:
+            print(f"Fichier {file_path} introuvable. Initialisation avec une liste vide.")
+            return []
+        cached = self._catalogue_cache.get(file_path)
+        if cached is not None and cached[:2] == (stat.st_mtime_ns, stat.st_size):
+            return cached[2]
+
         try:
             with open(file_path, 'r', encoding='utf-8') as f:
                 content = f.read().strip()
                 if content:
                     distant_models = json.loads(content)
-                    return distant_models
                 else:
                     print(f"Le fichier {file_path} est vide. Initialisation avec une liste vide.")
                     distant_models = []
-                    return distant_models
         except FileNotFoundError:
             print(f"Fichier {file_path} introuvable. Initialisation avec une liste vide.")
-            distant_models = []
-            return distant_models
+            return []
         except json.JSONDecodeError as e:
             print(f"Erreur de décodage JSON dans le fichier {file_path} : {e}")
-            distant_models = []
-            return distant_models
+            return []
+        self._catalogue_cache[file_path] = (stat.st_mtime_ns, stat.st_size, distant_models)
+        return distant_models
 
     def get_name_model(self) -> list:
         """
@@ -67,9 +77,12 @@ class Ollama_client:
             print(f"Erreur lors de l'extraction des noms : {e}")
             return []
 
-    def prepare_messages(self, conversation, user_input):
+    def prepare_messages(self, conversation, user_input, images=None):
         """
         Prépare les messages pour inclure l'historique de la conversation et le nouveau message utilisateur.
+        Seul le fil actif de l'historique est parcouru. Si user_input vaut None (régénération),
+        le dernier message du fil sert de requête.
+        Les images (encodées en base64) sont jointes au nouveau message utilisateur.
         """
         messages = []
 
@@ -77,26 +90,26 @@ class Ollama_client:
         if 'system' in conversation:
             messages.append({'role': 'system', 'content': conversation['system']})
 
-        # Ajouter l'historique des messages
+        # Ajouter l'historique des messages (fil actif de l'arbre)
         if isinstance(conversation, dict) and 'history' in conversation:
-            for message in conversation['history']:
-                if isinstance(message, dict) and 'role' in message and 'content' in message:
-                    messages.append({'role': message['role'], 'content': message['content']})
-                else:
-                    print(f"Message mal formé dans l'historique : {message}")
+            for message in conversation['history'].path():
+                messages.append({'role': message.role, 'content': message.content})
 
         # Ajouter le message utilisateur
-        messages.append({'role': 'user', 'content': user_input})
+        if user_input is not None:
+            messages.append({'role': 'user', 'content': user_input})
+            if images:
+                messages[-1]['images'] = list(images)
 
         return messages
 
 
-    def response(self, model, user_input, conversation, temp):
+    def response(self, model, user_input, conversation, temp, images=None):
         """
         Envoie une requête au modèle et retourne un générateur pour le streaming.
         """
         # Prépare les messages (inclut déjà le message utilisateur)
-        messages = self.prepare_messages(conversation, user_input)
+        messages = self.prepare_messages(conversation, user_input, images)
 
         system = conversation.get('system', '')
         options = Options(
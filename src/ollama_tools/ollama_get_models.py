@@ -1,87 +1,169 @@
 #!/usr/bin/env python
 
-from bs4 import BeautifulSoup
+import os, json, time, importlib.util
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
 import requests
-import json
-import os
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from bs4 import BeautifulSoup, SoupStrainer
+
+# Site dont le catalogue est extrait (un serveur local de pages enregistrées peut le remplacer)
+BASE_URL = "https://ollama.com"
+SAVE_DIR = f"{os.path.expanduser('~')}/Documents/saves_ollama"
+# Catalogue produit, lu par le gestionnaire de modèles
+OUTPUT_FILE = f"{SAVE_DIR}/ollama_models.json"
+# Validateurs HTTP (ETag, Last-Modified) des pages déjà téléchargées
+HTTP_CACHE_FILE = f"{SAVE_DIR}/ollama_models_http_cache.json"
+# Nombre de pages de modèles téléchargées simultanément
+MAX_WORKERS = 8
+# Délais de connexion et de lecture d'une requête, en secondes
+REQUEST_TIMEOUT = (5, 20)
+# Nouvelles tentatives sur erreur réseau ou réponse 429/5xx
+MAX_RETRIES = 2
+# Analyseur HTML : lxml (en C) s'il est installé, sinon celui de la bibliothèque standard
+PARSER = 'lxml' if importlib.util.find_spec('lxml') else 'html.parser'
+# Classe des éléments de la liste des modèles de la page de recherche
+LISTING_CLASS = 'flex items-baseline border-b border-neutral-200 py-6'
+# Classes des lignes de versions d'une page de modèle (affichage large, affichage mobile)
+VERSION_CLASSES = frozenset({'sm:grid', 'sm:hidden'})
+
+
+def scrape_ollama_library(base_url: str = BASE_URL, output_file: str = OUTPUT_FILE,
+                          cache_file: str = HTTP_CACHE_FILE, max_workers: int = MAX_WORKERS) -> Optional[list]:
+    """
+    Met à jour le catalogue des modèles distants.
+
+    La page de recherche et les pages des modèles sont demandées sous condition (If-None-Match,
+    If-Modified-Since) : une page inchangée n'est ni retransmise ni analysée. Seuls les modèles
+    dont la date de mise à jour affichée dans la liste a changé voient leur page redemandée ;
+    ces pages sont téléchargées en parallèle sur une session dont les connexions sont réutilisées.
+    Le fichier du catalogue n'est réécrit que s'il change.
+    Args:
+        base_url (str): L'adresse du site.
+        output_file (str): Le fichier JSON du catalogue.
+        cache_file (str): Le fichier des validateurs HTTP.
+        max_workers (int): Le nombre de pages téléchargées simultanément.
+
+    Returns:
+        list: Les modèles du catalogue (None si la page de recherche est inaccessible).
+    """
+    os.makedirs(os.path.dirname(output_file) or '.', exist_ok=True)
+    previous = {model['name']: model for model in _load_json(output_file, []) if model.get('name')}
+    validators = _load_json(cache_file, {})
+
+    with _create_session(max_workers) as session:
+        search_url = f"{base_url}/search"
+        # Sans catalogue précédent, une réponse 304 serait inutilisable : la page est redemandée entière
+        status, content = _fetch(session, search_url, validators, conditional=bool(previous))
+        if status == 304:
+            print("Liste des modèles inchangée")
+            models = [{key: value for key, value in model.items() if key != 'versions'} for model in previous.values()]
+        elif status == 200:
+            models = parse_content(content)
+        else:
+            print(f"Failed to retrieve the page. Status code: {status}")
+            return None
+
+        # Les modèles dont la date affichée n'a pas changé gardent leurs versions
+        stale = []
+        for model in models:
+            known = previous.get(model.get('name'))
+            if known is not None and 'versions' in known and known.get('last_updated') == model.get('last_updated'):
+                model['versions'] = known['versions']
+            elif model.get('name'):
+                stale.append(model)
+
+        def update_versions(model: dict) -> None:
+            url = f"{base_url}/library/{model['name']}"
+            known = previous.get(model['name'], {})
+            status, content = _fetch(session, url, validators, conditional='versions' in known)
+            if status == 200:
+                model['versions'] = parse_model_versions(content)
+            elif status == 304 and 'versions' in known:
+                model['versions'] = known['versions']
+            else:
+                print(f"Failed to retrieve page for {model['name']}. Status code: {status}")
+                if 'versions' in known:
+                    model['versions'] = known['versions']
+
+        print(f"{len(stale)} modèle(s) sur {len(models)} à mettre à jour")
+        with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="scraper") as pool:
+            list(pool.map(update_versions, stale))
+
+    _save_json(cache_file, validators)
+    if models != list(previous.values()):
+        _save_json(output_file, models)
+        print(f"Extracted information saved to {output_file}")
+    return models
 
-import os
-import requests
-import json
-from bs4 import BeautifulSoup
-
-def scrape_ollama_library():
-    input_file_path = f"{os.path.expanduser('~')}/Documents/saves_ollama/ollama_models_html.txt"
-    output_file_path = f"{os.path.expanduser('~')}/Documents/saves_ollama/ollama_models.json"
-    url = "https://ollama.com/search"
-
-    # Crée le dossier si nécessaire
-    os.makedirs(f'{os.path.expanduser("~")}/Documents/saves_ollama/', exist_ok=True)
-
-    # Récupération du HTML
-    if os.path.exists(input_file_path):
-        print("Reading from existing file...")
-        with open(input_file_path, 'r', encoding='utf-8') as file:
-            content = file.read()
-    else:
-        print("Scraping website...")
-        response = requests.get(url)
-        if response.status_code != 200:
-            print(f"Failed to retrieve the page. Status code: {response.status_code}")
-            return
-        content = response.text
-        with open(input_file_path, 'w', encoding='utf-8') as file:
-            file.write(content)
-
-    # Parser le contenu principal
-    soup = BeautifulSoup(content, 'html.parser')
-    models = parse_content(soup)  # informations principales
-
-    # Récupérer les versions pour chaque modèle
-    for model in models:
-        model_name = model.get('name')
-        if not model_name:
-            continue
-
-        model_url = f"https://ollama.com/library/{model_name}"
-        
-        print(f"url models : {model_url}")
-        response = requests.get(model_url)
-        if response.status_code != 200:
-            print(f"Failed to retrieve page for {model_name}. Status code: {response.status_code}")
-            continue
-
-        model_soup = BeautifulSoup(response.text, 'html.parser')
-        versions = parse_model_versions(model_soup)  # versions du modèle
-        model['versions'] = versions
-
-    # Affichage formaté
-    for model in models:
-        print(f"Name: {model.get('name', 'N/A')}")
-        print(f"Description: {model.get('description', 'N/A')}")
-        print(f"Pulls: {model.get('pulls', 'N/A')}")
-        print(f"Tags: {model.get('tags', 'N/A')}")
-        print(f"Last Updated: {model.get('last_updated', 'N/A')}")
-        if 'versions' in model and model['versions']:
-            print("Versions:")
-            for version in model['versions']:
-                print(f"  - Name: {version.get('name', 'N/A')}")
-                print(f"    Latest: {version.get('latest', 'N/A')}")
-                print(f"    Size: {version.get('size', 'N/A')}")
-                print(f"    Context: {version.get('context', 'N/A')}")
-                print(f"    Input: {version.get('input', 'N/A')}")
-        print("-" * 50)
-
-    # Sauvegarder en JSON
-    with open(output_file_path, 'w', encoding='utf-8') as file:
-        json.dump(models, file, indent=2)
-
-    print(f"Extracted information saved to {output_file_path}")
-
-
-def parse_content(soup):
+
+def _create_session(max_workers: int) -> requests.Session:
+    """Crée une session dont le groupe de connexions suffit aux téléchargements simultanés."""
+    session = requests.Session()
+    retry = Retry(total=MAX_RETRIES, backoff_factor=0.5, status_forcelist=(429, 500, 502, 503, 504))
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max_workers, max_retries=retry)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+def _fetch(session: requests.Session, url: str, validators: dict,
+           conditional: bool = True) -> tuple[Optional[int], Optional[str]]:
+    """
+    Demande une page, sous condition de modification si conditional est vrai.
+    Returns:
+        tuple: Le code HTTP (None en cas d'erreur réseau) et le contenu (None sauf pour 200).
+    """
+    known = validators.get(url, {}) if conditional else {}
+    headers = {}
+    if known.get('etag'):
+        headers['If-None-Match'] = known['etag']
+    if known.get('last_modified'):
+        headers['If-Modified-Since'] = known['last_modified']
+    try:
+        response = session.get(url, headers=headers, timeout=REQUEST_TIMEOUT)
+    except requests.RequestException as e:
+        print(f"Erreur lors de la requête {url} : {e}")
+        return None, None
+    if response.status_code != 200:
+        return response.status_code, None
+    validators[url] = {
+        'etag': response.headers.get('ETag'),
+        'last_modified': response.headers.get('Last-Modified'),
+    }
+    return 200, response.text
+
+
+def _load_json(path: str, default):
+    try:
+        with open(path, 'r', encoding='utf-8') as file:
+            return json.load(file)
+    except (OSError, ValueError):
+        return default
+
+
+def _save_json(path: str, data) -> None:
+    """Écrit un fichier JSON d'un bloc : le gestionnaire de modèles ne lit jamais un fichier incomplet."""
+    temp_path = f"{path}.tmp"
+    with open(temp_path, 'w', encoding='utf-8') as file:
+        json.dump(data, file, indent=2)
+    os.replace(temp_path, path)
+
+
+def parse_content(html: str, parser: str = PARSER, parse_only: bool = True) -> list:
+    """
+    Extrait les modèles de la page de recherche.
+    Args:
+        html (str): La page.
+        parser (str): L'analyseur HTML utilisé par BeautifulSoup.
+        parse_only (bool): Ne construit que les éléments de la liste des modèles
+            (le reste de la page est ignoré pendant l'analyse).
+    """
+    strainer = SoupStrainer('li', class_=LISTING_CLASS) if parse_only else None
+    soup = BeautifulSoup(html, parser, parse_only=strainer)
     models = []
-    li_elements = soup.find_all('li', class_='flex items-baseline border-b border-neutral-200 py-6')
+    li_elements = soup.find_all('li', class_=LISTING_CLASS)
 
     for li in li_elements:
         model = {}
@@ -123,11 +205,17 @@ def parse_content(soup):
 
     return models
 
-def parse_model_versions(soup):
+def parse_model_versions(html: str, parser: str = PARSER, parse_only: bool = True) -> list:
     """
     Parse the Ollama library HTML and extract model versions in a format
     similar to parse_content().
+    Args:
+        html (str): La page du modèle.
+        parser (str): L'analyseur HTML utilisé par BeautifulSoup.
+        parse_only (bool): Ne construit que les lignes de versions.
     """
+    strainer = SoupStrainer(class_=_has_version_class) if parse_only else None
+    soup = BeautifulSoup(html, parser, parse_only=strainer)
     models = []
 
     # Desktop entries
@@ -184,4 +272,100 @@ def parse_model_versions(soup):
 
         models.append(model)
 
-    return models
\ No newline at end of file
+    return models
+
+def _has_version_class(classes) -> bool:
+    """
+    Indique si un élément porte une des VERSION_CLASSES. Pendant l'analyse, SoupStrainer reçoit
+    l'attribut class entier ("hidden group sm:grid ...") et non ses classes une à une.
+    """
+    if not classes:
+        return False
+    if isinstance(classes, str):
+        classes = classes.split()
+    return not VERSION_CLASSES.isdisjoint(classes)
+
+def check_extraction(pages_dir: str, rounds: int = 5) -> bool:
+    """
+    Compare, sur des pages enregistrées (search, library/<nom>), l'extraction rapide (PARSER,
+    analyse restreinte) à l'extraction de référence (arbre complet avec html.parser) et mesure les deux.
+    Returns:
+        bool: True si les deux extractions donnent le même résultat sur toutes les pages.
+    """
+    pages = [(parse_content, os.path.join(pages_dir, 'search'))]
+    library = os.path.join(pages_dir, 'library')
+    if os.path.isdir(library):
+        pages += [(parse_model_versions, os.path.join(library, name)) for name in sorted(os.listdir(library))]
+    contents = []
+    for parse, path in pages:
+        with open(path, 'r', encoding='utf-8') as file:
+            contents.append((parse, path, file.read()))
+
+    identical = True
+    for parse, path, html in contents:
+        if parse(html) != parse(html, 'html.parser', parse_only=False):
+            print(f"Extraction différente de la référence : {path}")
+            identical = False
+
+    for label, options in (("référence", {'parser': 'html.parser', 'parse_only': False}), (f"{PARSER}, restreinte", {})):
+        start = time.perf_counter()
+        for _ in range(rounds):
+            for parse, _, html in contents:
+                parse(html, **options)
+        elapsed = (time.perf_counter() - start) * 1000 / (rounds * len(contents))
+        print(f"Extraction ({label}) : {elapsed:.2f} ms par page")
+    return identical
+
+
+if __name__ == "__main__":
+    import sys, tempfile, threading
+    from collections import Counter
+    from functools import partial
+    from http.server import ThreadingHTTPServer, SimpleHTTPRequestHandler
+
+    # Pages enregistrées servies localement (avec Last-Modified) : celles du dépôt (tests/fixtures),
+    # ou un dossier passé en argument (search, library/<nom>) ; une adresse utilise le site réel
+    FIXTURES_DIR = os.path.join(
+        os.path.dirname(os.path.dirname(os.path.dirname(os.path.realpath(__file__)))),
+        'tests', 'fixtures', 'ollama_library',
+    )
+    # Latence simulée de chaque réponse du serveur local, en secondes
+    SIMULATED_LATENCY = 0.1
+
+    source = sys.argv[1] if len(sys.argv) > 1 else FIXTURES_DIR if os.path.isdir(FIXTURES_DIR) else BASE_URL
+    server = None
+    statuses = Counter()
+    if os.path.isdir(source):
+        print(f"Pages servies depuis {source}")
+        if not check_extraction(source):
+            sys.exit(1)
+
+        class Quiet_Handler(SimpleHTTPRequestHandler):
+            def send_response(self, code, message=None) -> None:
+                time.sleep(SIMULATED_LATENCY)
+                statuses[code] += 1
+                super().send_response(code, message)
+
+            def log_message(self, *args) -> None:
+                pass
+
+        server = ThreadingHTTPServer(('127.0.0.1', 0), partial(Quiet_Handler, directory=source))
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        source = f"http://127.0.0.1:{server.server_address[1]}"
+
+    runs = (("complet, séquentiel", 1, True), ("complet, parallèle", MAX_WORKERS, True), ("incrémental", MAX_WORKERS, False))
+    with tempfile.TemporaryDirectory() as directory:
+        output, cache = os.path.join(directory, 'models.json'), os.path.join(directory, 'cache.json')
+        for run, workers, reset in runs:
+            if reset:
+                for path in (output, cache):
+                    if os.path.exists(path):
+                        os.remove(path)
+            statuses.clear()
+            start = time.perf_counter()
+            models = scrape_ollama_library(source, output, cache, max_workers=workers)
+            elapsed = time.perf_counter() - start
+            codes = ", ".join(f"{code} : {count}" for code, count in sorted(statuses.items()))
+            print(f"Passage {run} : {elapsed:.2f} s, {len(models or [])} modèles" + (f" (réponses {codes})" if codes else ""))
+    if server is not None:
+        server.shutdown()
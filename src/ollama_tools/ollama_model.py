@@ -1,4 +1,29 @@
-import os, json
+import os, time
+from collections.abc import Iterable, Iterator, Sequence
+from typing import Callable, Optional
+from .conversation_archive import export_to_jsonl, export_to_markdown, iter_conversations_from_file # type: ignore
+from .message_tree import Message_Tree # type: ignore
+from .blob_store import Blob_Store # type: ignore
+from .save_format import read_save, write_save, migrate # type: ignore
+
+class Conversation_List_View(Sequence):
+    """
+    Vue en lecture seule sur la liste des conversations, sans copie de leurs données.
+    """
+    __slots__ = ('_conversations',)
+
+    def __init__(self, conversations: list) -> None:
+        self._conversations = conversations
+
+    def __getitem__(self, index):
+        return self._conversations[index]
+
+    def __len__(self) -> int:
+        return len(self._conversations)
+
+    def __iter__(self):
+        return iter(self._conversations)
+
 
 class Ollama_model:
     def __init__(self) -> None:
@@ -6,6 +31,9 @@ class Ollama_model:
         Initialise une instance d'OllamaModel avec une liste vide de conversations.
         """
         self.conversations = []
+        self.blob_store = Blob_Store()
+        # Sauvegarde illisible : ne rien écrire ni supprimer qui pourrait l'écraser
+        self.read_only = False
 
     def add_conversation(self, model, title, user, assistant, conv_id=None) -> dict:
         """
@@ -21,27 +49,24 @@ class Ollama_model:
                 dict: La conversation ajoutée.
         """
         if conv_id == None:
-            new_id = len(self.conversations) + 1
+            new_id = self._next_conversation_id()
+            history = Message_Tree()
+            self._retain_blobs([history.add('user', user), history.add('assistant', assistant)])
             new_conversation = {
                 'id': new_id,
                 'model': model,
                 'title': title,
-                'history': [
-                    {'role': 'user', 'content': user},
-                    {'role': 'assistant', 'content': assistant},
-                ]
+                'history': history,
+                'updated_at': time.time()
             }
             self.conversations.append(new_conversation)
         return new_conversation
 
-    def get_all_conversations(self) -> list:
+    def _next_conversation_id(self) -> int:
         """
-        Retourne une liste de toutes les conversations sous forme de dictionnaires contenant 'id' et 'title'.
+        Retourne un ID de conversation libre, même après des suppressions ou un import.
         """
-        if not hasattr(self, 'conversations') or not self.conversations:
-            return []  # Retourne une liste vide si aucune conversation n'existe
-
-        return [{'id': conv['id'], 'title': conv['title']} for conv in self.conversations]
+        return max((conv['id'] for conv in self.conversations), default=0) + 1
 
     def set_active_conversation(self, conv_id) -> list:
         """
@@ -62,12 +87,13 @@ class Ollama_model:
                 return conv
         return None
 
-    def update_conversation(self, conv_id: int, user_input:str, assistant_response: str) ->bool:
+    def update_conversation(self, conv_id: int, user_input: Optional[str], assistant_response: str) ->bool:
         """
-        Met à jour une conversation existante en ajoutant les nouveaux messages à l'historique.
+        Met à jour une conversation existante en ajoutant les nouveaux messages au bout du fil actif.
+        Si le fil actif a été raccourci (édition, régénération), une nouvelle branche est créée.
         Args:
             conv_id (int): L'ID de la conversation à mettre à jour.
-            user_input (str): Le message de l'utilisateur.
+            user_input (str): Le message de l'utilisateur, ou None pour une régénération.
             assistant_response (str): La réponse de l'assistant.
 
         Returns:
@@ -76,12 +102,58 @@ class Ollama_model:
         for conv in self.conversations:
             if conv['id'] == conv_id:
                 if 'history' not in conv:
-                    conv['history'] = []  # Initialiser l'historique s'il n'existe pas
-                conv['history'].append({'role': 'user', 'content': user_input})
-                conv['history'].append({'role': 'assistant', 'content': assistant_response})
+                    conv['history'] = Message_Tree()  # Initialiser l'historique s'il n'existe pas
+                new_messages = []
+                if user_input is not None:
+                    new_messages.append(conv['history'].add('user', user_input))
+                new_messages.append(conv['history'].add('assistant', assistant_response))
+                self._retain_blobs(new_messages)
+                # Horodatage du dernier message : regroupement par date dans le panneau latéral
+                conv['updated_at'] = time.time()
                 return True
         return False
 
+    def set_active_message(self, conv_id: int, message_id: Optional[int]) -> bool:
+        """
+        Termine le fil actif sur un message : la prochaine réponse créera une branche à partir de lui.
+        Args:
+            conv_id (int): L'ID de la conversation.
+            message_id (int): Le message qui devient la fin du fil actif (None pour repartir de zéro).
+
+        Returns:
+            bool: True si le message existe, False sinon.
+        """
+        conv = self.get_conversation(conv_id)
+        if not conv or (message_id is not None and conv['history'].get(message_id) is None):
+            return False
+        conv['history'].set_leaf(message_id)
+        return True
+
+    def switch_branch(self, conv_id: int, message_id: int) -> bool:
+        """
+        Active la branche contenant un message donné.
+        Args:
+            conv_id (int): L'ID de la conversation.
+            message_id (int): Un message de la branche à afficher.
+
+        Returns:
+            bool: True si la branche a été activée, False sinon.
+        """
+        conv = self.get_conversation(conv_id)
+        if not conv or conv['history'].get(message_id) is None:
+            return False
+        conv['history'].switch_branch(message_id)
+        return True
+
+    def get_message_branches(self, conv_id: int, message_id: int) -> list:
+        """
+        Retourne les IDs des versions d'un message (lui compris) dans l'ordre de création.
+        """
+        conv = self.get_conversation(conv_id)
+        if not conv:
+            return []
+        return conv['history'].siblings(message_id)
+
     def update_system_model(self, conv_id, system_entry: str) -> bool:
         for conv in self.conversations:
             if conv.get("id") == conv_id:
@@ -103,6 +175,7 @@ class Ollama_model:
         )
 
         if conversation_to_delete:
+            self._release_blobs(conversation_to_delete['history'].to_list())
             self.conversations = [
                 conv for conv in self.conversations if conv['id'] != conv_id
             ]
@@ -123,10 +196,11 @@ class Ollama_model:
         )
 
         if conversation_to_update:
-            # Supprimer le message de la conversation
-            conversation_to_update['history'] = [
-                msg for msg in conversation_to_update['history'] if msg['id'] != message_id
-            ]
+            # Supprimer le message de la conversation (ses réponses sont rattachées à son parent)
+            message = conversation_to_update['history'].get(message_id)
+            if message:
+                self._release_blobs([message])
+            conversation_to_update['history'].remove(message_id)
             self.save_to_file()  # Sauvegarder après modification
         else:
             print(f"Aucune conversation trouvée avec l'ID {conv_id}.")
@@ -144,52 +218,167 @@ class Ollama_model:
                 return conv
         return None
 
-    def get_all_conversations(self) -> list:
+    def get_all_conversations(self) -> "Conversation_List_View":
         """
-        Retourne une liste de toutes les conversations avec leurs 'id', 'title' et 'history'.
+        Retourne une vue en lecture seule sur les conversations ('id', 'title', 'history', ...).
+        Aucune copie n'est faite : chaque élément est la conversation elle-même.
         """
-        if not hasattr(self, 'conversations') or not self.conversations:
-            return []  # Retourne une liste vide si aucune conversation n'existe
+        return Conversation_List_View(self.conversations)
 
-        # Récupère toutes les données nécessaires
-        return [
-            {
-                'id': conv['id'],
-                'title': conv['title'],
-                'history': conv['history']  # Inclut l'historique complet
-            }
-            for conv in self.conversations
+    def save_to_file(self, file_path: Optional[str] = None) -> None:
+        """
+        Sauvegarde les conversations dans le format versionné (binaire si msgpack est disponible, JSON sinon).
+        Args:
+            file_path (str, optional): Le chemin du fichier ; '.json' force le format JSON.
+        """
+        if self.read_only:
+            print("Sauvegarde désactivée : la sauvegarde existante n'a pas pu être lue")
+            return
+        write_save([self._to_saved(conv) for conv in self.conversations], file_path)
+        # Les blobs sans référence ne sont supprimés qu'une fois la sauvegarde écrite
+        self.blob_store.flush_deletions()
+
+    @staticmethod
+    def _to_saved(conv: dict) -> dict:
+        """
+        Prépare une conversation pour la sauvegarde : l'arbre devient une liste de lignes
+        [id, parent, role, content, blob], accompagnée de la feuille du fil actif.
+        Les contenus volumineux sont remplacés par l'empreinte de leur blob.
+        """
+        saved = dict(conv)
+        saved['history'] = [
+            [m.id, m.parent, m.role, None if m.blob else m.content, m.blob]
+            for m in conv['history'].to_list()
         ]
+        saved['leaf'] = conv['history'].leaf
+        return saved
 
-    def save_to_file(self) -> None:
+    def _from_saved(self, conv: dict) -> dict:
         """
-        Sauvegarde les conversations dans un fichier JSON.
+        Reconstruit l'arbre d'une conversation sauvegardée au schéma courant
+        et reprend une référence sur chacun de ses blobs.
         """
-        file_path = f"{os.path.expanduser('~')}/Documents/saves_ollama/saves.json"
-        with open(file_path, 'w', encoding='utf-8') as f:
-            json.dump(self.conversations, f, ensure_ascii=False, indent=4)
+        rows = conv.get('history', [])
+        for row in rows:
+            if row[4]:
+                row[3] = self.blob_store.retain_digest(row[4])
 
+        tree = Message_Tree.from_rows(rows, conv.pop('leaf', None))
+        # L'arbre conserve l'ordre des lignes sauvegardées
+        for node, row in zip(tree.to_list(), rows):
+            if row[4]:
+                node.blob = row[4]
+            else:
+                self._retain_blobs([node])
+        conv['history'] = tree
+        return conv
 
-    def load_from_file(self, file_path= f"{os.path.expanduser('~')}/Documents/saves_ollama/saves.json") -> None:
+    def _retain_blobs(self, messages: list) -> None:
+        """
+        Place les contenus volumineux des messages dans le blob store et partage leur instance en mémoire.
         """
-        Charge les conversations à partir d'un fichier JSON.
+        for message in messages:
+            if message.blob is None and self.blob_store.is_large(message.content):
+                message.blob, message.content = self.blob_store.retain(message.content)
+
+    def _release_blobs(self, messages: list) -> None:
+        """
+        Retire la référence de chaque message vers son blob.
+        """
+        for message in messages:
+            if message.blob is not None:
+                self.blob_store.release(message.blob)
+
+
+    def load_from_file(self, file_path: Optional[str] = None) -> None:
+        """
+        Charge les conversations depuis la sauvegarde, en migrant les anciens formats si nécessaire.
+        Si la sauvegarde existe mais ne peut pas être lue, les conversations restent vides et
+        read_only empêche de l'écraser (ainsi que de supprimer les blobs qu'elle référence).
         Args:
-            file_path (str): Le chemin du fichier contenant les données JSON.
+            file_path (str, optional): Le chemin de la sauvegarde. Par défaut, la sauvegarde binaire
+                si elle existe, sinon saves.json.
         """
         try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                content = f.read().strip()
-                if content:
-                    self.conversations = json.loads(content)
-                else:
-                    print(f"Le fichier {file_path} est vide. Initialisation avec une liste vide.")
-                    self.conversations = []
+            self.conversations = [self._from_saved(conv) for conv in read_save(file_path)]
+            if self.conversations:
+                # Supprimer les blobs laissés par une session interrompue
+                self.blob_store.collect_garbage()
+            else:
+                print("Le fichier de sauvegarde est vide. Initialisation avec une liste vide.")
         except FileNotFoundError:
-            print(f"Fichier {file_path} introuvable. Initialisation avec une liste vide.")
+            print(f"Fichier {file_path or 'de sauvegarde'} introuvable. Initialisation avec une liste vide.")
             self.conversations = []
-        except json.JSONDecodeError as e:
-            print(f"Erreur de décodage JSON dans le fichier {file_path} : {e}")
+        except ValueError as e:
+            print(f"Erreur de décodage de la sauvegarde {file_path or ''} : {e}")
             self.conversations = []
+            self.read_only = True
+
+    def export_to_file(self, file_path: str, progress_callback: Optional[Callable[[float], None]] = None) -> int:
+        """
+        Exporte toutes les conversations en flux, en Markdown si le fichier se termine par '.md', en JSONL sinon.
+        Le JSONL contient l'arbre complet des messages ; le Markdown, le seul fil actif.
+        Args:
+            file_path (str): Le chemin du fichier de destination.
+            progress_callback (callable, optional): Reçoit la progression entre 0 et 1.
+
+        Returns:
+            int: Le nombre de conversations exportées.
+        """
+        if file_path.lower().endswith(('.md', '.markdown')):
+            return export_to_markdown(self.conversations, file_path, progress_callback)
+        return export_to_jsonl(self.conversations, file_path, progress_callback)
+
+    def read_import(self, file_path: str, progress_callback: Optional[Callable[[float], None]] = None) -> Iterator[dict]:
+        """
+        Lit des conversations depuis un export (JSON ou JSONL) au fil du fichier, sans le charger en entier.
+        Ne modifie pas les conversations : peut s'exécuter dans un thread de travail,
+        les conversations sont ensuite ajoutées par add_imported() depuis le thread principal.
+        Args:
+            file_path (str): Le chemin du fichier à importer.
+            progress_callback (callable, optional): Reçoit la progression entre 0 et 1.
+
+        Yields:
+            dict: Chaque conversation lue, au schéma courant et sans ID.
+        """
+        for conversation in iter_conversations_from_file(file_path, progress_callback):
+            # Historique linéaire (schéma initial) ou arbre exporté avec ses pointeurs parents
+            if conversation['history']:
+                yield migrate([conversation])[0]
+
+    def add_imported(self, conversations: Iterable[dict], save: bool = True) -> int:
+        """
+        Ajoute des conversations lues par read_import() et sauvegarde.
+        Comme toute modification des conversations, à appeler depuis le thread principal.
+        Les conversations importées reçoivent de nouveaux IDs et s'ajoutent aux existantes.
+        Args:
+            conversations (iterable): Les conversations à ajouter, éventuellement un lot parmi d'autres.
+            save (bool): False pour ne sauvegarder qu'après le dernier lot.
+
+        Returns:
+            int: Le nombre de conversations importées.
+        """
+        next_id = self._next_conversation_id()
+        count = 0
+        for conversation in conversations:
+            conversation['id'] = next_id
+            next_id += 1
+            count += 1
+            self.conversations.append(self._from_saved(conversation))
+
+        if count and save:
+            self.save_to_file()
+        return count
+
+    def import_from_file(self, file_path: str, progress_callback: Optional[Callable[[float], None]] = None) -> int:
+        """
+        Importe des conversations depuis un export (voir read_import() et add_imported()).
+        Bloquant : depuis l'interface, lire l'export dans un thread de travail avec read_import().
+
+        Returns:
+            int: Le nombre de conversations importées.
+        """
+        return self.add_imported(self.read_import(file_path, progress_callback))
 
     def list_conversations(self) -> list:
         """
@@ -0,0 +1,192 @@
+import os, json
+
+try:
+    import msgpack # type: ignore
+except ImportError:
+    # Sans msgpack, la sauvegarde reste au format JSON
+    msgpack = None
+
+SAVE_DIR = f"{os.path.expanduser('~')}/Documents/saves_ollama"
+BINARY_SAVE_PATH = f"{SAVE_DIR}/saves.msgpack"
+JSON_SAVE_PATH = f"{SAVE_DIR}/saves.json"
+
+# Historique des versions du schéma :
+#   0 : liste de conversations, historique linéaire de {'role', 'content'}
+#   1 : liste de conversations, arbre de {'id', 'parent', 'role', 'content' | 'blob'} et 'leaf'
+#   2 : enveloppe {'version', 'conversations'}, messages compacts [id, parent, role, content, blob]
+SCHEMA_VERSION = 2
+
+# En-tête identifiant une sauvegarde binaire
+MAGIC = b"GTKOLLAMA\x00"
+
+
+def _migrate_v0_to_v1(conversations: list) -> list:
+    """Transforme un historique linéaire en chaîne de messages avec pointeurs parents."""
+    for conv in conversations:
+        history = []
+        parent = None
+        for index, message in enumerate(conv.get('history', []), start=1):
+            history.append({'id': index, 'parent': parent, 'role': message['role'], 'content': message['content']})
+            parent = index
+        conv['history'] = history
+        conv['leaf'] = parent
+    return conversations
+
+
+def _migrate_v1_to_v2(conversations: list) -> list:
+    """Remplace chaque message par une ligne compacte [id, parent, role, content, blob]."""
+    for conv in conversations:
+        conv['history'] = [
+            [m['id'], m['parent'], m['role'], None if 'blob' in m else m['content'], m.get('blob')]
+            for m in conv.get('history', [])
+        ]
+    return conversations
+
+
+MIGRATIONS = {
+    0: _migrate_v0_to_v1,
+    1: _migrate_v1_to_v2,
+}
+
+
+def migrate(data, version: int = None) -> list:
+    """
+    Amène des données sauvegardées, quelle que soit leur version, au schéma courant.
+    Args:
+        data: Le contenu décodé (enveloppe versionnée ou ancienne liste).
+        version (int, optional): Force la version de départ (par exemple 0 pour un import).
+
+    Returns:
+        list: Les conversations au format SCHEMA_VERSION.
+    """
+    if isinstance(data, dict):
+        conversations = data.get('conversations', [])
+        version = data.get('version', 0) if version is None else version
+    else:
+        conversations = data or []
+        if version is None:
+            # Les anciennes listes ne portent pas de version : l'arbre se reconnaît aux pointeurs parents
+            version = 1 if any(
+                isinstance(m, dict) and 'parent' in m
+                for conv in conversations for m in conv.get('history', [])
+            ) else 0
+
+    if version > SCHEMA_VERSION:
+        raise ValueError(f"Version de sauvegarde {version} plus récente que celle supportée ({SCHEMA_VERSION})")
+
+    while version < SCHEMA_VERSION:
+        conversations = MIGRATIONS[version](conversations)
+        version += 1
+    return conversations
+
+
+def decode(raw: bytes) -> list:
+    """
+    Décode une sauvegarde binaire (msgpack) ou JSON et la migre au schéma courant.
+    Raises:
+        ValueError: Si le contenu est illisible.
+    """
+    if raw.startswith(MAGIC):
+        if msgpack is None:
+            raise ValueError("Sauvegarde binaire mais le module msgpack n'est pas installé")
+        try:
+            data = msgpack.unpackb(raw[len(MAGIC):], raw=False, strict_map_key=False)
+        except Exception as e:
+            raise ValueError(f"Sauvegarde binaire corrompue : {e}") from e
+    else:
+        text = raw.decode('utf-8').strip()
+        data = json.loads(text) if text else []
+    if not isinstance(data, (dict, list)):
+        raise ValueError(f"Sauvegarde inattendue : {type(data).__name__}")
+    return migrate(data)
+
+
+def encode(conversations: list, binary: bool = True) -> bytes:
+    """
+    Encode des conversations au schéma courant, en msgpack si possible et demandé, en JSON sinon.
+    """
+    envelope = {'version': SCHEMA_VERSION, 'conversations': conversations}
+    if binary and msgpack is not None:
+        return MAGIC + msgpack.packb(envelope, use_bin_type=True)
+    return json.dumps(envelope, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+
+def default_save_path() -> str:
+    """
+    Retourne la sauvegarde à charger : la binaire si elle existe, la JSON sinon.
+    Raises:
+        ValueError: Si la sauvegarde binaire existe mais que msgpack n'est pas installé ;
+            saves.json, plus ancien, ne doit alors pas la remplacer.
+    """
+    if os.path.exists(BINARY_SAVE_PATH):
+        if msgpack is None:
+            raise ValueError(
+                f"{BINARY_SAVE_PATH} ne peut pas être lue sans le module msgpack ; "
+                f"{JSON_SAVE_PATH}, plus ancienne, n'est pas chargée"
+            )
+        return BINARY_SAVE_PATH
+    return JSON_SAVE_PATH
+
+
+def read_save(file_path: str = None) -> list:
+    """
+    Lit une sauvegarde et retourne ses conversations au schéma courant.
+    Raises:
+        FileNotFoundError: Si le fichier n'existe pas.
+        ValueError: Si le contenu est illisible.
+    """
+    with open(file_path or default_save_path(), 'rb') as f:
+        return decode(f.read())
+
+
+def write_save(conversations: list, file_path: str = None) -> str:
+    """
+    Écrit une sauvegarde de manière atomique.
+    Sans chemin explicite, le format binaire est utilisé si msgpack est disponible.
+    Returns:
+        str: Le chemin du fichier écrit.
+    """
+    if file_path is None:
+        file_path = BINARY_SAVE_PATH if msgpack is not None else JSON_SAVE_PATH
+    binary = not file_path.endswith('.json')
+
+    os.makedirs(os.path.dirname(file_path), exist_ok=True)
+    tmp_path = f"{file_path}.tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(encode(conversations, binary))
+    os.replace(tmp_path, file_path)
+    return file_path
+
+
+if __name__ == "__main__":
+    import sys, tempfile, time
+
+    # Temps d'écriture et de lecture d'une sauvegarde de N messages, en msgpack puis en JSON
+    def make_conversations(count: int, per_conversation: int = 100) -> list:
+        conversations = []
+        for conv_id in range(1, count // per_conversation + 1):
+            history = [
+                [i, i - 1 or None, 'user' if i % 2 else 'assistant', f"Message {i} de la conversation {conv_id}. " * 8, None]
+                for i in range(1, per_conversation + 1)
+            ]
+            conversations.append({'id': conv_id, 'model': 'llama3', 'title': f"Conversation {conv_id}",
+                                  'history': history, 'leaf': per_conversation})
+        return conversations
+
+    formats = [('msgpack', 'saves.msgpack'), ('JSON', 'saves.json')] if msgpack else [('JSON', 'saves.json')]
+    if msgpack is None:
+        print("msgpack n'est pas installé : seul le format JSON est mesuré")
+    sizes = [int(arg) for arg in sys.argv[1:]] or [1_000, 10_000, 100_000]
+    with tempfile.TemporaryDirectory() as directory:
+        for count in sizes:
+            conversations = make_conversations(count)
+            for label, name in formats:
+                path = os.path.join(directory, name)
+                start = time.perf_counter()
+                write_save(conversations, path)
+                saved = time.perf_counter()
+                loaded = read_save(path)
+                end = time.perf_counter()
+                assert sum(len(conv['history']) for conv in loaded) == count
+                print(f"{count:>7} messages, {label:>7} : écriture {(saved - start) * 1000:6.0f} ms, "
+                      f"lecture {(end - saved) * 1000:6.0f} ms, {os.path.getsize(path) / 1e6:6.1f} Mo")
@@ -0,0 +1,155 @@
+import gi, os, base64, threading
+gi.require_version('Gdk', '4.0')
+gi.require_version('GdkPixbuf', '2.0')
+from gi.repository import Gdk, GdkPixbuf
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Optional
+
+# Nombre de threads qui décodent et réduisent les images
+MAX_WORKERS = 2
+# Résolution (plus grand côté, en pixels) utilisée par les modèles de vision, par famille de modèle ;
+# une image plus grande est réduite à cette taille avant l'envoi
+MODEL_RESOLUTIONS = {
+    'llava': 672,
+    'bakllava': 672,
+    'llava-llama3': 672,
+    'llava-phi3': 672,
+    'llama3.2-vision': 1120,
+    'llama4': 1120,
+    'gemma3': 896,
+    'qwen2.5vl': 1024,
+    'minicpm-v': 1344,
+    'moondream': 378,
+    'granite3.2-vision': 768,
+    'mistral-small3.1': 1540,
+}
+# Résolution des modèles inconnus
+DEFAULT_RESOLUTION = 1024
+# Taille (plus grand côté) des miniatures affichées
+THUMBNAIL_SIZE = 96
+# Nombre d'images traitées conservées en cache
+IMAGE_CACHE_SIZE = 64
+# Qualité de l'encodage JPEG des images sans transparence
+JPEG_QUALITY = "85"
+
+
+def model_resolution(model: str) -> int:
+    """
+    Retourne la résolution effective d'un modèle de vision.
+    Args:
+        model (str): Le nom du modèle ('llava:7b', 'gemma3:4b'...).
+    """
+    family = model.split(':', 1)[0].rsplit('/', 1)[-1]
+    return MODEL_RESOLUTIONS.get(family, DEFAULT_RESOLUTION)
+
+
+class Processed_Image:
+    """Image prête à être envoyée au modèle : données encodées en base64 et miniature."""
+    __slots__ = ('path', 'data', 'thumbnail', 'texture')
+
+    def __init__(self, path: str, data: str, thumbnail: GdkPixbuf.Pixbuf) -> None:
+        self.path = path
+        self.data = data            # Image réduite, encodée en base64 (champ 'images' de l'API)
+        self.thumbnail = thumbnail
+        self.texture = None
+
+    def get_texture(self) -> Gdk.Texture:
+        """Retourne la miniature à afficher (texture créée au premier affichage puis réutilisée)."""
+        if self.texture is None:
+            self.texture = Gdk.Texture.new_for_pixbuf(self.thumbnail)
+        return self.texture
+
+
+class Image_Processor:
+    """
+    Prépare les images jointes aux messages sans bloquer l'interface.
+
+    Le décodage, la réduction à la résolution du modèle et l'encodage en base64 sont
+    faits par un groupe de threads. Les images traitées (et leurs miniatures) sont
+    conservées en cache, par fichier et par résolution.
+    """
+
+    _default = None
+
+    @classmethod
+    def get_default(cls) -> "Image_Processor":
+        """Retourne le processeur partagé par toute l'application."""
+        if cls._default is None:
+            cls._default = cls()
+        return cls._default
+
+    def __init__(self, max_workers: int = MAX_WORKERS) -> None:
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="image_processor")
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+
+    def process(self, path: str, resolution: int = DEFAULT_RESOLUTION,
+                callback: Optional[Callable[[Future], None]] = None) -> Future:
+        """
+        Traite une image en arrière-plan.
+        Args:
+            path (str): Le chemin de l'image.
+            resolution (int): Le plus grand côté de l'image envoyée.
+            callback (callable, optional): Reçoit le Future une fois le traitement terminé,
+                depuis un thread de travail : l'interface doit passer par GLib.idle_add.
+
+        Returns:
+            Future: Le traitement, dont le résultat est un Processed_Image
+                (ou l'exception GLib.Error / OSError si l'image ne peut pas être lue).
+        """
+        try:
+            stat = os.stat(path)
+            key = (path, stat.st_mtime_ns, stat.st_size, resolution)
+        except OSError:
+            key = None
+
+        with self._lock:
+            future = self._cache.get(key) if key else None
+            if future is not None:
+                self._cache.move_to_end(key)
+            else:
+                future = self._pool.submit(self._load, path, resolution)
+                if key:
+                    self._cache[key] = future
+                    if len(self._cache) > IMAGE_CACHE_SIZE:
+                        self._cache.popitem(last=False)
+                    future.add_done_callback(lambda done: self._on_processed(key, done))
+
+        if callback:
+            future.add_done_callback(callback)
+        return future
+
+    def _on_processed(self, key: tuple, future: Future) -> None:
+        """Retire un échec du cache : le fichier pourra être relu."""
+        if future.cancelled() or future.exception() is not None:
+            with self._lock:
+                if self._cache.get(key) is future:
+                    del self._cache[key]
+
+    @staticmethod
+    def _load(path: str, resolution: int) -> Processed_Image:
+        """Décode l'image directement à la taille voulue, puis l'encode ; exécuté par un thread de travail."""
+        info, width, height = GdkPixbuf.Pixbuf.get_file_info(path)
+        if info is None:
+            raise OSError(f"Format d'image non reconnu : {path}")
+        if max(width, height) > resolution:
+            pixbuf = GdkPixbuf.Pixbuf.new_from_file_at_scale(path, resolution, resolution, True)
+        else:
+            pixbuf = GdkPixbuf.Pixbuf.new_from_file(path)
+        pixbuf = pixbuf.apply_embedded_orientation() or pixbuf
+
+        if pixbuf.get_has_alpha():
+            _, data = pixbuf.save_to_bufferv("png", [], [])
+        else:
+            _, data = pixbuf.save_to_bufferv("jpeg", ["quality"], [JPEG_QUALITY])
+
+        scale = THUMBNAIL_SIZE / max(pixbuf.get_width(), pixbuf.get_height())
+        if scale < 1:
+            thumbnail = pixbuf.scale_simple(
+                max(1, round(pixbuf.get_width() * scale)), max(1, round(pixbuf.get_height() * scale)),
+                GdkPixbuf.InterpType.BILINEAR,
+            )
+        else:
+            thumbnail = pixbuf
+        return Processed_Image(path, base64.b64encode(data).decode('ascii'), thumbnail)
@@ -0,0 +1,257 @@
+import re, hashlib, time
+from collections import OrderedDict
+
+# Seuls les premiers caractères d'un bloc sont analysés : ils suffisent à reconnaître le langage
+SAMPLE_SIZE = 8192
+# Score minimal pour attribuer un langage (sinon 'text')
+MIN_SCORE = 2
+# Nombre de résultats conservés en mémoire
+CACHE_SIZE = 512
+
+C_FAMILY = ('c', 'cpp', 'csharp', 'java', 'javascript', 'typescript', 'go', 'rust', 'kotlin', 'php')
+
+# Jetons pondérés : (expression, {langage: poids}), regroupés selon leur point d'ancrage
+# pour que le moteur écarte vite les positions sans intérêt.
+# À une position donnée seul le premier jeton qui correspond compte : dans chaque groupe,
+# les jetons spécifiques doivent précéder les génériques.
+
+# Jetons de début de ligne (après l'indentation)
+LINE_TOKENS = [
+    (r'#!.*\b(?:ba|z|k|da)?sh\b', {'shell': 10}),
+    (r'#!.*\bpython', {'python': 10}),
+    (r'#!.*\bnode\b', {'javascript': 10}),
+    (r'using System\b', {'csharp': 5}),
+    (r'(?:async )?def \w+\s*\(.*\)\s*(?:->.*)?:[ \t]*$', {'python': 4}),
+    (r'class \w+(?:\(.*\))?:[ \t]*$', {'python': 3}),
+    (r'(?:elif .*|else|try|finally|except.*|with .*|for .* in .*|while .*|if .*):[ \t]*$', {'python': 2}),
+    (r'(?:from [\w.]+ )?import [\w.]+(?: as \w+)?(?:, \w+)*[ \t]*$', {'python': 2}),
+    (r'package [\w.]+;', {'java': 4}),
+    (r'import [\w.]+(?:\.\*)?;', {'java': 3}),
+    (r'package \w+[ \t]*$', {'go': 4}),
+    (r'#include\s*[<"]', {'c': 3, 'cpp': 3}),
+    (r'#define\b', {'c': 3, 'cpp': 2}),
+    (r'use \w+::', {'rust': 3}),
+    (r'def \w+[?!]?[ \t]*(?:\(.*\))?[ \t]*$', {'ruby': 2}),
+    (r'end[ \t]*$', {'ruby': 2, 'lua': 2}),
+    (r'\$ ', {'shell': 3}),
+    (r'(?:sudo|apt|apt-get|dnf|yum|pacman|brew|pip3?|npm|git|cd|ls|mkdir|chmod|chown|rm|cp|mv|export'
+     r'|echo|curl|wget|cat|grep|systemctl|flatpak|docker|tar|touch|source|ollama)\b', {'shell': 3}),
+    (r'(?:fi|done|esac)\b', {'shell': 3}),
+    (r'---[ \t]*$', {'yaml': 3}),
+    (r'"[^"\n]+"[ \t]*:', {'json': 2}),
+    (r'\w+\??[ \t]*:[ \t]*(?:string|number|boolean|any|void|unknown)\b', {'typescript': 4}),
+    (r'[\w-]+[ \t]*:(?!:)[ \t]*[^;{}\n]+;[ \t]*$', {'css': 3}),
+    (r'[.#]?[\w-]+(?:[.#:][\w-]+)*(?:(?:[ \t]*[,>+~][ \t]*|[ \t]+)[.#:]?[\w-]+(?:[.#:][\w-]+)*)*[ \t]*\{[ \t]*$',
+     {'css': 1}),
+    (r'[\w.-]+:(?:[ \t]+[^{;\n]*)?$', {'yaml': 1}),
+    (r'- [\w"\']', {'yaml': 1}),
+    (r'//', {lang: 1 for lang in C_FAMILY}),
+    (r'#(?!include|define|!)', {'python': 1, 'shell': 1, 'ruby': 1, 'yaml': 1}),
+]
+
+# Jetons de début de mot
+WORD_TOKENS = [
+    (r'if __name__ == ', {'python': 5}),
+    (r'System\.out\.print', {'java': 5}),
+    (r'Console\.Write', {'csharp': 5}),
+    (r'println!\(', {'rust': 5}),
+    (r'std::', {'cpp': 5}),
+    (r'(?:SELECT|INSERT INTO|UPDATE|DELETE FROM|CREATE TABLE|ALTER TABLE|DROP TABLE)\b', {'sql': 4}),
+    (r'(?:WHERE|JOIN|GROUP BY|ORDER BY|VALUES|PRIMARY KEY)\b', {'sql': 2}),
+    (r'self\.', {'python': 1, 'ruby': 1}),
+    (r'(?:None|True|False)\b', {'python': 1}),
+    (r'print\(', {'python': 1}),
+    (r'lambda \w*:', {'python': 2}),
+    (r'String\[\] args', {'java': 4}),
+    (r'public (?:static )?(?:class|void|final|int|String|async)\b', {'java': 3, 'csharp': 2}),
+    (r'namespace \w+', {'csharp': 2, 'cpp': 2}),
+    (r'fun \w+\s*\(', {'kotlin': 4}),
+    (r'val \w+\s*[:=]', {'kotlin': 3}),
+    (r'int main\s*\(', {'c': 3, 'cpp': 3}),
+    (r'printf\(', {'c': 3, 'cpp': 1}),
+    (r'(?:malloc|free|sizeof)\(', {'c': 2, 'cpp': 1}),
+    (r'(?:cout|cin|endl)\b', {'cpp': 3}),
+    (r'template\s*<', {'cpp': 3}),
+    (r'nullptr\b', {'cpp': 3}),
+    (r'fmt\.', {'go': 4}),
+    (r'func \w*\s*\(', {'go': 3}),
+    (r'fn \w+\s*[<(]', {'rust': 4}),
+    (r'let mut\b', {'rust': 4}),
+    (r'impl\b', {'rust': 3}),
+    (r'interface \w+\s*\{', {'typescript': 3}),
+    (r'import .* from [\'"]', {'javascript': 2, 'typescript': 2}),
+    (r'console\.log\(', {'javascript': 3, 'typescript': 2}),
+    (r'(?:document|window)\.', {'javascript': 2}),
+    (r'require\([\'"]', {'javascript': 2}),
+    (r'module\.exports\b|export (?:default|const|function)\b', {'javascript': 2, 'typescript': 1}),
+    (r'(?:const|let|var) \w+\s*=', {'javascript': 2, 'typescript': 1}),
+    (r'function \w+[.:]\w+\(', {'lua': 3}),
+    (r'function\s*\w*\s*\(', {'javascript': 2, 'php': 1}),
+    (r'local \w+\s*=', {'lua': 4}),
+    (r'puts\b', {'ruby': 3}),
+    (r'require [\'"]', {'ruby': 3}),
+    (r'\.each\b|do \|', {'ruby': 3}),
+    (r'\w+\??\s*:\s*(?:string|number|boolean|any|void|unknown)\b', {'typescript': 4}),
+]
+
+# Jetons de ponctuation
+SYMBOL_TOKENS = [
+    (r'<\?php', {'php': 10}),
+    (r'<\?xml ', {'xml': 10}),
+    (r'<!DOCTYPE html', {'html': 10}),
+    (r'</?(?:html|head|body|div|span|p|a|ul|li|script|style|table|h[1-6])\b[^>]*>', {'html': 2, 'xml': 1}),
+    (r'</\w+>', {'html': 1, 'xml': 1}),
+    (r'@media\b|@import\b|!important', {'css': 3}),
+    (r'@Override\b', {'java': 3, 'kotlin': 1}),
+    (r'===|!==', {'javascript': 2, 'typescript': 2, 'php': 1}),
+    (r'=>', {'javascript': 1, 'typescript': 1}),
+    (r':=', {'go': 3}),
+    (r'~=', {'lua': 2}),
+    (r'--\[\[', {'lua': 4}),
+    (r'\$\{\w+\}|\$\(\w|\$[1-9@#?]', {'shell': 2}),
+    (r'\$\w+\s*=', {'php': 2}),
+    (r'\|\s*(?:grep|awk|sed|sort|head|tail|xargs|wc|tee)\b', {'shell': 3}),
+]
+
+TOKENS = LINE_TOKENS + WORD_TOKENS + SYMBOL_TOKENS
+
+
+def _alternatives(tokens: list, offset: int) -> str:
+    return '|'.join(f'(?P<t{offset + index}>{pattern})' for index, (pattern, _) in enumerate(tokens))
+
+
+# Expression unique : un groupe nommé par jeton, une seule passe sur le bloc
+_PATTERN = re.compile(
+    f'^[ \\t]*+(?:{_alternatives(LINE_TOKENS, 0)})'
+    f'|\\b(?=[\\w.])(?:{_alternatives(WORD_TOKENS, len(LINE_TOKENS))})'
+    f'|(?=[<@=!:~$|-])(?:{_alternatives(SYMBOL_TOKENS, len(LINE_TOKENS) + len(WORD_TOKENS))})',
+    re.MULTILINE
+)
+_WEIGHTS = {f't{index}': weights for index, (_, weights) in enumerate(TOKENS)}
+
+_cache = OrderedDict()
+
+
+def classify(code: str) -> str:
+    """
+    Détermine le langage d'un bloc de code.
+    Le résultat est mémorisé par empreinte du contenu : un même bloc n'est analysé qu'une fois.
+    Args:
+        code (str): Le contenu du bloc.
+
+    Returns:
+        str: Le nom du langage ('python', 'shell', ...) ou 'text' s'il n'est pas reconnu.
+    """
+    key = hashlib.blake2b(code.encode('utf-8', errors='replace'), digest_size=16).digest()
+    language = _cache.get(key)
+    if language is not None:
+        _cache.move_to_end(key)
+        return language
+
+    language = _score(code[:SAMPLE_SIZE])
+    _cache[key] = language
+    if len(_cache) > CACHE_SIZE:
+        _cache.popitem(last=False)
+    return language
+
+
+def _score(code: str) -> str:
+    """Additionne en une passe les poids des jetons trouvés et retourne le meilleur langage."""
+    scores = {}
+    for match in _PATTERN.finditer(code):
+        for language, weight in _WEIGHTS[match.lastgroup].items():
+            scores[language] = scores.get(language, 0) + weight
+    if not scores:
+        return 'text'
+    language, score = max(scores.items(), key=lambda item: item[1])
+    return language if score >= MIN_SCORE else 'text'
+
+
+# Échantillons ayant servi à régler les jetons et leurs poids (mesure du débit)
+SAMPLES = [
+    ('python', 'import os\n\ndef main(path: str) -> None:\n    for name in os.listdir(path):\n        print(name)\n\nif __name__ == "__main__":\n    main(".")'),
+    ('python', 'class Point:\n    def __init__(self, x, y):\n        self.x = x\n        self.y = y'),
+    ('javascript', 'const items = [1, 2, 3];\nitems.forEach(item => {\n  console.log(item);\n});'),
+    ('javascript', 'function add(a, b) {\n  return a + b;\n}\nmodule.exports = add;'),
+    ('typescript', 'interface User {\n  name: string;\n  age: number;\n}\nconst greet = (user: User): void => console.log(user.name);'),
+    ('java', 'public class Main {\n    public static void main(String[] args) {\n        System.out.println("Hello");\n    }\n}'),
+    ('c', '#include <stdio.h>\n\nint main(void) {\n    printf("Hello\\n");\n    return 0;\n}'),
+    ('cpp', '#include <iostream>\n\nint main() {\n    std::cout << "Hello" << std::endl;\n    return 0;\n}'),
+    ('csharp', 'using System;\n\nclass Program {\n    static void Main() {\n        Console.WriteLine("Hello");\n    }\n}'),
+    ('go', 'package main\n\nimport "fmt"\n\nfunc main() {\n    msg := "Hello"\n    fmt.Println(msg)\n}'),
+    ('rust', 'fn main() {\n    let mut total = 0;\n    for i in 0..10 { total += i; }\n    println!("{}", total);\n}'),
+    ('ruby', 'require "json"\n\ndef greet(name)\n  puts "Hello #{name}"\nend\n\n[1, 2].each do |n|\n  greet(n)\nend'),
+    ('php', '<?php\n$name = "World";\necho "Hello $name";\n?>'),
+    ('lua', 'local count = 0\nfunction M.increment()\n  count = count + 1\nend'),
+    ('kotlin', 'fun main() {\n    val name = "Kotlin"\n    println("Hello $name")\n}'),
+    ('shell', '#!/bin/bash\nfor f in *.txt; do\n  echo "$f"\ndone'),
+    ('shell', 'sudo dnf install ollama\nollama pull llama3\nls -la ~/.ollama | grep models'),
+    ('sql', 'SELECT name, COUNT(*) FROM users\nJOIN orders ON orders.user_id = users.id\nGROUP BY name;'),
+    ('html', '<!DOCTYPE html>\n<html>\n<body>\n  <div class="main"><p>Hello</p></div>\n</body>\n</html>'),
+    ('css', '.box_message {\n    border-radius: 10px;\n    padding: 10px;\n}\n@media (max-width: 600px) { .box { display: none; } }'),
+    ('json', '{\n  "name": "gtk_ollama",\n  "version": "1.0",\n  "modules": []\n}'),
+    ('yaml', '---\nname: build\non: push\njobs:\n  build:\n    runs-on: ubuntu-latest'),
+    ('xml', '<?xml version="1.0" encoding="UTF-8"?>\n<interface>\n  <object class="GtkBox"/>\n</interface>'),
+]
+
+
+# Échantillons de contrôle, jamais utilisés pour régler les poids : seule mesure de précision significative
+HELD_OUT_SAMPLES = [
+    ('python', 'with open("data.csv") as f:\n    rows = [line.split(",") for line in f]\nprint(len(rows))'),
+    ('python', 'try:\n    value = int(text)\nexcept ValueError:\n    value = 0'),
+    ('python', 'squares = {n: n ** 2 for n in range(10)}\nresult = sorted(squares.items(), key=lambda kv: kv[1])'),
+    ('javascript', 'fetch("/api/items")\n  .then(res => res.json())\n  .then(data => console.log(data));'),
+    ('javascript', 'document.querySelector("#btn").addEventListener("click", () => {\n  alert("ok");\n});'),
+    ('typescript', 'type Point = { x: number; y: number };\nfunction dist(a: Point, b: Point): number {\n  return Math.hypot(a.x - b.x, a.y - b.y);\n}'),
+    ('java', 'import java.util.List;\n\nList<String> names = List.of("a", "b");\nfor (String n : names) {\n    System.out.println(n);\n}'),
+    ('c', '#include <stdlib.h>\n\nint *buffer = malloc(16 * sizeof(int));\nfree(buffer);'),
+    ('cpp', '#include <vector>\n\nstd::vector<int> v{3, 1, 2};\nstd::sort(v.begin(), v.end());'),
+    ('go', 'func add(a int, b int) int {\n    return a + b\n}\n\nresult := add(1, 2)\nfmt.Println(result)'),
+    ('rust', 'use std::collections::HashMap;\n\nlet mut counts = HashMap::new();\n*counts.entry("a").or_insert(0) += 1;'),
+    ('ruby', 'class Dog\n  def bark\n    puts "Woof"\n  end\nend'),
+    ('php', '<?php\nforeach ($items as $item) {\n    echo $item["name"];\n}'),
+    ('shell', 'mkdir -p ~/projets\ncd ~/projets\ngit clone https://example.com/repo.git'),
+    ('shell', 'export PATH="$HOME/.local/bin:$PATH"\nsource ~/.bashrc'),
+    ('shell', 'systemctl --user restart ollama\njournalctl --user -u ollama | tail -n 20'),
+    ('sql', 'CREATE TABLE users (\n  id INTEGER PRIMARY KEY,\n  name TEXT NOT NULL\n);'),
+    ('sql', 'UPDATE orders SET status = \'sent\' WHERE id = 42;'),
+    ('html', '<ul>\n  <li><a href="/">Accueil</a></li>\n  <li><a href="/aide">Aide</a></li>\n</ul>'),
+    ('css', 'body {\n  margin: 0;\n  font-family: sans-serif;\n}'),
+    ('json', '[\n  {"id": 1, "done": true},\n  {"id": 2, "done": false}\n]'),
+    ('yaml', 'services:\n  web:\n    image: nginx\n    ports:\n      - "80:80"'),
+    ('lua', 'local t = {1, 2, 3}\nfor i, v in ipairs(t) do\n  print(i, v)\nend'),
+    ('kotlin', 'data class User(val name: String)\n\nfun greet(user: User) = println("Hi ${user.name}")'),
+]
+
+
+def accuracy(samples: list) -> tuple[float, list]:
+    """
+    Mesure la précision du classifieur sur des échantillons (langage attendu, code).
+    Returns:
+        tuple: La précision entre 0 et 1 et les erreurs (attendu, obtenu).
+    """
+    errors = [(expected, classify(code)) for expected, code in samples if classify(code) != expected]
+    return 1 - len(errors) / len(samples), errors
+
+
+def benchmark(rounds: int = 200) -> None:
+    """
+    Affiche la précision du classifieur sur les échantillons de contrôle et son débit sans cache.
+    La précision sur SAMPLES, qui ont servi au réglage, n'est donnée qu'à titre de vérification.
+    """
+    for label, samples in (("réglage", SAMPLES), ("contrôle", HELD_OUT_SAMPLES)):
+        rate, errors = accuracy(samples)
+        print(f"Précision ({label}) : {rate:.0%} ({len(samples) - len(errors)}/{len(samples)})")
+        for expected, found in errors:
+            print(f"  attendu {expected}, obtenu {found}")
+
+    text = "\n".join(code for _, code in SAMPLES)
+    start = time.perf_counter()
+    for _ in range(rounds):
+        _score(text)
+    elapsed = time.perf_counter() - start
+    print(f"Débit : {len(text) * rounds / elapsed / 1e6:.1f} M caractères/s")
+
+
+if __name__ == "__main__":
+    benchmark()
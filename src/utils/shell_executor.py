@@ -0,0 +1,216 @@
+import asyncio, codecs, tempfile, threading
+import concurrent.futures
+from typing import Callable, Optional
+from .shell_session import Shell_Session_Pool, host_command, stop_process, READ_SIZE # type: ignore
+
+# Nombre maximal de commandes exécutées simultanément
+MAX_CONCURRENT = 4
+# Quantité de sortie conservée en mémoire et affichée ; au-delà, la sortie est écrite dans un fichier
+SPOOL_THRESHOLD = 256 * 1024
+
+
+class Shell_Execution:
+    """
+    Commande en cours d'exécution.
+
+    Les premiers SPOOL_THRESHOLD caractères de sortie sont conservés en mémoire ;
+    au-delà, la sortie complète est écrite dans un fichier temporaire (spool_path).
+    """
+
+    def __init__(self, command: str, spool_threshold: int = SPOOL_THRESHOLD) -> None:
+        self.command = command
+        self.returncode = None
+        self.cancelled = False
+        self.spool_path = None
+        self._spool_threshold = spool_threshold
+        self._head = []
+        self._size = 0
+        self._spool = None
+        self._future = None
+
+    @property
+    def output(self) -> str:
+        """Retourne la sortie conservée en mémoire (stdout et stderr dans l'ordre d'arrivée)."""
+        return "".join(self._head)
+
+    @property
+    def done(self) -> bool:
+        return self._future is not None and self._future.done()
+
+    def cancel(self) -> None:
+        """Annule la commande : elle est retirée de la file d'attente ou son processus est arrêté."""
+        self.cancelled = True
+        if self._future is not None:
+            self._future.cancel()
+
+    def wait(self, timeout: Optional[float] = None) -> Optional[int]:
+        """
+        Attend la fin de la commande.
+        Returns:
+            int: Le code de sortie (None si la commande a été annulée).
+        Raises:
+            TimeoutError: Si la commande n'est pas terminée après timeout secondes.
+        """
+        try:
+            return self._future.result(timeout)
+        except concurrent.futures.CancelledError:
+            return None
+        except concurrent.futures.TimeoutError:
+            raise TimeoutError(f"Commande toujours en cours après {timeout} s") from None
+
+    def _write(self, stream: str, text: str, on_output: Optional[Callable[[str, str], None]]) -> None:
+        """Conserve ou écrit sur le disque un morceau de sortie et le transmet au callback."""
+        if self._spool is None:
+            kept = text[:self._spool_threshold - self._size]
+            if kept:
+                self._head.append(kept)
+                self._size += len(kept)
+                if on_output:
+                    on_output(stream, kept)
+            if len(kept) == len(text):
+                return
+            text = text[len(kept):]
+
+            # Sortie trop volumineuse : la suite (et la sortie déjà reçue) est écrite sur le disque
+            self._spool = tempfile.NamedTemporaryFile(
+                'w', encoding='utf-8', prefix='gtk_ollama_', suffix='.log', delete=False
+            )
+            self._spool.write(self.output)
+            self.spool_path = self._spool.name
+            if on_output:
+                on_output('spool', self.spool_path)
+        self._spool.write(text)
+
+    def _close_spool(self) -> None:
+        if self._spool is not None:
+            self._spool.close()
+            self._spool = None
+
+
+class Shell_Executor:
+    """
+    Exécute des commandes shell sur l'hôte sans bloquer l'appelant.
+
+    Les processus sont pilotés par une boucle asyncio dédiée, dans son propre thread.
+    Leur sortie est transmise au fil de l'eau, et un sémaphore limite le nombre de
+    commandes exécutées en même temps.
+    Une commande est exécutée dans un nouveau processus, ou dans la session shell
+    persistante associée à une clé (répertoire courant et environnement conservés).
+    Les callbacks sont appelés depuis le thread de la boucle : l'interface doit passer par GLib.idle_add.
+    """
+
+    _default = None
+
+    @classmethod
+    def get_default(cls) -> "Shell_Executor":
+        """Retourne l'exécuteur partagé par toute l'application."""
+        if cls._default is None:
+            cls._default = cls()
+        return cls._default
+
+    def __init__(self, max_concurrent: int = MAX_CONCURRENT, spool_threshold: int = SPOOL_THRESHOLD) -> None:
+        """
+        Args:
+            max_concurrent (int): Nombre maximal de commandes exécutées simultanément.
+            spool_threshold (int): Quantité de sortie gardée en mémoire par commande.
+        """
+        self.max_concurrent = max_concurrent
+        self.spool_threshold = spool_threshold
+        self.sessions = Shell_Session_Pool()
+        self._loop = None
+        self._semaphore = None
+        self._lock = threading.Lock()
+
+    def _ensure_loop(self) -> asyncio.AbstractEventLoop:
+        """Démarre la boucle asyncio au premier usage."""
+        with self._lock:
+            if self._loop is None:
+                self._loop = asyncio.new_event_loop()
+                self._semaphore = asyncio.Semaphore(self.max_concurrent)
+                threading.Thread(target=self._loop.run_forever, name="shell_executor", daemon=True).start()
+            return self._loop
+
+    def run(self, command: str, on_output: Optional[Callable[[str, str], None]] = None,
+            on_done: Optional[Callable[[Shell_Execution], None]] = None, session=None) -> Shell_Execution:
+        """
+        Lance une commande en arrière-plan.
+        Args:
+            command (str): Le script à exécuter avec bash.
+            on_output (callable, optional): Reçoit (flux, texte) à chaque morceau de sortie ;
+                flux vaut 'stdout', 'stderr', ou 'spool' (texte = chemin du fichier) quand la sortie
+                devient trop volumineuse pour être conservée en mémoire.
+            on_done (callable, optional): Reçoit l'exécution une fois terminée ou annulée.
+            session (optional): Clé de la session persistante où exécuter la commande
+                (l'ID de la conversation) ; None pour un processus indépendant.
+
+        Returns:
+            Shell_Execution: L'exécution, qui peut être attendue ou annulée.
+        """
+        execution = Shell_Execution(command, self.spool_threshold)
+        loop = self._ensure_loop()
+        execution._future = asyncio.run_coroutine_threadsafe(self._execute(execution, on_output, session), loop)
+        if on_done:
+            execution._future.add_done_callback(lambda future: on_done(execution))
+        return execution
+
+    def close_session(self, session) -> None:
+        """Ferme la session persistante associée à une clé."""
+        if self._loop is not None:
+            asyncio.run_coroutine_threadsafe(self.sessions.close(session), self._loop)
+
+    async def _execute(self, execution: Shell_Execution, on_output, session) -> Optional[int]:
+        if session is not None:
+            return await self._execute_in_session(execution, on_output, session)
+
+        async with self._semaphore:
+            try:
+                process = await asyncio.create_subprocess_exec(
+                    *host_command(execution.command),
+                    stdin=asyncio.subprocess.DEVNULL,
+                    stdout=asyncio.subprocess.PIPE,
+                    stderr=asyncio.subprocess.PIPE,
+                    start_new_session=True,
+                )
+            except OSError as e:
+                execution._write('stderr', f"Impossible de lancer la commande : {e}\n", on_output)
+                execution.returncode = 127
+                return execution.returncode
+
+            try:
+                await asyncio.gather(
+                    self._pump(process.stdout, 'stdout', execution, on_output),
+                    self._pump(process.stderr, 'stderr', execution, on_output),
+                )
+                execution.returncode = await process.wait()
+            except asyncio.CancelledError:
+                execution.cancelled = True
+                await stop_process(process)
+                raise
+            finally:
+                execution._close_spool()
+        return execution.returncode
+
+    async def _execute_in_session(self, execution: Shell_Execution, on_output, key) -> Optional[int]:
+        """Exécute une commande dans une session persistante (les commandes d'une session se suivent)."""
+        session = await self.sessions.acquire(key)
+        async with session.lock, self._semaphore:
+            try:
+                execution.returncode = await session.run(execution, on_output)
+            except asyncio.CancelledError:
+                execution.cancelled = True
+                raise
+            finally:
+                execution._close_spool()
+        return execution.returncode
+
+    @staticmethod
+    async def _pump(stream: asyncio.StreamReader, name: str, execution: Shell_Execution, on_output) -> None:
+        """Transmet un flux de sortie au fil de sa lecture."""
+        decoder = codecs.getincrementaldecoder('utf-8')(errors='replace')
+        while True:
+            data = await stream.read(READ_SIZE)
+            text = decoder.decode(data, final=not data)
+            if text:
+                execution._write(name, text, on_output)
+            if not data:
+                return
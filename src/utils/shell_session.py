@@ -0,0 +1,239 @@
+import os, signal, asyncio, codecs, shlex, uuid
+from collections import OrderedDict
+from typing import Callable, Optional
+
+# Taille des lectures sur les flux du processus
+READ_SIZE = 4096
+# Délai laissé au processus pour s'arrêter après SIGTERM
+TERMINATE_TIMEOUT = 2.0
+# Nombre maximal de sessions conservées (une par conversation) ; la moins récente inactive est fermée
+MAX_SESSIONS = 8
+# Nombre de sessions démarrées à l'avance, prêtes pour une nouvelle conversation
+SPARE_SESSIONS = 1
+
+# Fonction définie au démarrage de chaque session : elle écrit la sentinelle de fin de commande,
+# suivie du code de sortie et du répertoire courant sur stdout, seule sur stderr
+_BOOTSTRAP = """
+__gtk_ollama_done() {{
+    printf '%s %d %s\\n' '{sentinel}' "$1" "$PWD"
+    printf '%s\\n' '{sentinel}' >&2
+}}
+"""
+
+
+def host_shell() -> list[str]:
+    """Retourne la ligne de commande de bash sur l'hôte (via flatpak-spawn dans le bac à sable Flatpak)."""
+    if os.path.exists('/.flatpak-info'):
+        return ["flatpak-spawn", "--host", "bash"]
+    return ["bash"]
+
+
+def host_command(command: str) -> list[str]:
+    """Retourne la ligne de commande qui exécute `command` avec bash sur l'hôte."""
+    return host_shell() + ["-c", command]
+
+
+async def stop_process(process: asyncio.subprocess.Process) -> None:
+    """
+    Arrête un processus et ses descendants : SIGTERM, puis SIGKILL s'il ne s'arrête pas.
+    Le processus doit avoir été lancé dans son propre groupe (start_new_session) ;
+    flatpak-spawn relaie lui-même le signal au groupe du processus hôte.
+    """
+    if process.returncode is not None:
+        return
+    _signal_group(process, signal.SIGTERM)
+    try:
+        await asyncio.wait_for(process.wait(), TERMINATE_TIMEOUT)
+    except asyncio.TimeoutError:
+        _signal_group(process, signal.SIGKILL)
+        await process.wait()
+
+
+def _signal_group(process: asyncio.subprocess.Process, sig: int) -> None:
+    try:
+        os.killpg(process.pid, sig)
+    except (ProcessLookupError, PermissionError):
+        process.send_signal(sig)
+
+
+def _partial_marker(data: bytes, marker: bytes) -> int:
+    """Retourne la longueur de la fin de data qui pourrait être le début de marker."""
+    for length in range(min(len(marker) - 1, len(data)), 0, -1):
+        if data.endswith(marker[:length]):
+            return length
+    return 0
+
+
+class Shell_Session:
+    """
+    Shell bash persistant sur l'hôte, auquel les commandes sont envoyées sur stdin.
+
+    Chaque commande est transmise sur une trame (eval de la commande citée, suivi de
+    l'appel à __gtk_ollama_done) ; sa sortie s'arrête à une sentinelle propre à la session,
+    qui porte le code de sortie. Le répertoire courant et l'environnement sont conservés
+    d'une commande à l'autre, sans coût de démarrage.
+    Si le shell se termine (exit, annulation), il est relancé dans le dernier répertoire connu.
+    """
+
+    def __init__(self) -> None:
+        self.sentinel = f"__SENTINEL_{uuid.uuid4().hex}__"
+        self.cwd = None
+        self.lock = asyncio.Lock()
+        self._start_lock = asyncio.Lock()
+        self._process = None
+
+    @property
+    def alive(self) -> bool:
+        return self._process is not None and self._process.returncode is None
+
+    async def start(self) -> None:
+        """Démarre le shell (sans effet s'il est déjà en cours d'exécution ou de démarrage)."""
+        async with self._start_lock:
+            if self.alive:
+                return
+            process = await asyncio.create_subprocess_exec(
+                *host_shell(),
+                stdin=asyncio.subprocess.PIPE,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.PIPE,
+                start_new_session=True,
+            )
+            bootstrap = _BOOTSTRAP.format(sentinel=self.sentinel)
+            if self.cwd:
+                bootstrap += f"cd -- {shlex.quote(self.cwd)}\n"
+            process.stdin.write(bootstrap.encode('utf-8', errors='surrogateescape'))
+            await process.stdin.drain()
+            self._process = process
+
+    async def run(self, execution, on_output: Optional[Callable[[str, str], None]]) -> Optional[int]:
+        """
+        Exécute une commande dans la session. L'appelant doit détenir self.lock.
+        Args:
+            execution (Shell_Execution): L'exécution à mener, qui reçoit la sortie.
+            on_output (callable, optional): Reçoit (flux, texte) à chaque morceau de sortie.
+
+        Returns:
+            int: Le code de sortie de la commande (celui du shell s'il s'est terminé).
+        """
+        await self.start()
+        process = self._process
+        # La commande ne doit pas lire la suite des trames : son entrée est /dev/null
+        frame = f"eval {shlex.quote(execution.command)} </dev/null; __gtk_ollama_done $?\n"
+        try:
+            process.stdin.write(frame.encode('utf-8', errors='surrogateescape'))
+            await process.stdin.drain()
+            status, _ = await asyncio.gather(
+                self._pump(process.stdout, 'stdout', execution, on_output),
+                self._pump(process.stderr, 'stderr', execution, on_output),
+            )
+        except (BrokenPipeError, ConnectionResetError):
+            status = None
+        except asyncio.CancelledError:
+            # La commande ne peut pas être interrompue seule : le shell est arrêté avec elle
+            await self.stop()
+            raise
+
+        if status is None:
+            # Le shell s'est terminé pendant la commande (exit, set -e...)
+            return await process.wait()
+        code, _, cwd = status.partition(' ')
+        self.cwd = cwd or self.cwd
+        return int(code)
+
+    async def _pump(self, stream: asyncio.StreamReader, name: str, execution, on_output) -> Optional[str]:
+        """
+        Transmet un flux jusqu'à la sentinelle.
+        Returns:
+            str: Le reste de la ligne de la sentinelle (None si le flux s'est fermé avant).
+        """
+        marker = self.sentinel.encode('ascii')
+        decoder = codecs.getincrementaldecoder('utf-8')(errors='replace')
+        buffer = b""
+        while True:
+            data = await stream.read(READ_SIZE)
+            if not data:
+                text = decoder.decode(buffer, final=True)
+                if text:
+                    execution._write(name, text, on_output)
+                return None
+            buffer += data
+
+            index = buffer.find(marker)
+            if index == -1:
+                # Retenir une éventuelle sentinelle coupée entre deux lectures
+                keep = len(buffer) - _partial_marker(buffer, marker)
+                text = decoder.decode(buffer[:keep])
+                buffer = buffer[keep:]
+                if text:
+                    execution._write(name, text, on_output)
+                continue
+
+            text = decoder.decode(buffer[:index], final=True)
+            if text:
+                execution._write(name, text, on_output)
+            tail = buffer[index + len(marker):]
+            while b'\n' not in tail:
+                data = await stream.read(READ_SIZE)
+                if not data:
+                    break
+                tail += data
+            return tail.partition(b'\n')[0].decode('utf-8', errors='surrogateescape').strip(' ')
+
+    async def stop(self) -> None:
+        """Arrête le shell et la commande en cours."""
+        if self._process is not None:
+            await stop_process(self._process)
+
+
+class Shell_Session_Pool:
+    """
+    Sessions shell persistantes, une par clé (l'ID d'une conversation).
+
+    Une session de réserve est démarrée à l'avance : la première commande d'une
+    conversation ne paie pas le lancement du shell. Au-delà de MAX_SESSIONS, la
+    session inactive utilisée le moins récemment est fermée.
+    Les méthodes doivent être appelées depuis la boucle asyncio de l'exécuteur.
+    """
+
+    def __init__(self, max_sessions: int = MAX_SESSIONS, spare_sessions: int = SPARE_SESSIONS) -> None:
+        self.max_sessions = max_sessions
+        self.spare_sessions = spare_sessions
+        self._sessions = OrderedDict()
+        self._spare = []
+
+    async def acquire(self, key) -> Shell_Session:
+        """Retourne la session associée à la clé, en l'attribuant si besoin depuis la réserve."""
+        session = self._sessions.get(key)
+        if session is not None:
+            self._sessions.move_to_end(key)
+            return session
+
+        session = self._spare.pop(0) if self._spare else Shell_Session()
+        self._sessions[key] = session
+        await session.start()
+        self._evict()
+        self._fill_spare()
+        return session
+
+    async def close(self, key) -> None:
+        """Ferme la session associée à la clé (conversation supprimée)."""
+        session = self._sessions.pop(key, None)
+        if session is not None:
+            await session.stop()
+
+    def _fill_spare(self) -> None:
+        """Démarre en arrière-plan les sessions de réserve manquantes."""
+        while len(self._spare) < self.spare_sessions:
+            session = Shell_Session()
+            self._spare.append(session)
+            asyncio.get_running_loop().create_task(session.start())
+
+    def _evict(self) -> None:
+        """Ferme les sessions inactives les moins récentes au-delà de la limite."""
+        for key in list(self._sessions):
+            if len(self._sessions) <= self.max_sessions:
+                return
+            session = self._sessions[key]
+            if not session.lock.locked():
+                del self._sessions[key]
+                asyncio.get_running_loop().create_task(session.stop())
@@ -0,0 +1,114 @@
+import os, re, subprocess, sys, time
+
+# Modules lourds qui ne doivent pas être importés au démarrage : ils le sont à leur premier usage
+# (reconnaissance vocale, synthèse vocale, scraper du catalogue)
+HEAVY_MODULES = ('whisper', 'torch', 'numpy', 'sounddevice', 'gradio_client', 'bs4', 'pygame')
+# Budget du temps d'import de l'application (import de gtk_ollama.main), en millisecondes
+IMPORT_BUDGET = 400
+# Budget du temps entre le lancement du processus et la première image de la fenêtre, en millisecondes
+FIRST_FRAME_BUDGET = 1500
+
+# Script exécuté dans un processus neuf : charge les ressources, importe l'application
+# et écrit sur stdout l'heure (time.time) de la première image peinte de la fenêtre
+_FIRST_FRAME_SCRIPT = """
+import os, sys, time
+from gi.repository import Gio
+Gio.Resource.load(os.path.join({pkgdatadir!r}, 'gtk_ollama.gresource'))._register()
+from gtk_ollama import main
+
+def on_window_added(app, window):
+    def on_map(widget):
+        def on_after_paint(clock):
+            print(time.time(), flush=True)
+            app.quit()
+        widget.get_frame_clock().connect('after-paint', on_after_paint)
+    window.connect('map', on_map)
+
+app = main.GtkOllamaApplication()
+app.connect('window-added', on_window_added)
+app.run([sys.argv[0]])
+"""
+
+# Ligne de la sortie de -X importtime : "import time: self [us] | cumulative | module"
+_IMPORTTIME_LINE = re.compile(r'import time:\s+(\d+)\s+\|\s+(\d+)\s+\|\s*(\S+)')
+
+
+def _pkgdatadir() -> str:
+    """Retourne le dossier qui contient le paquet gtk_ollama installé et ses ressources."""
+    return os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def measure_imports(module: str = 'gtk_ollama.main') -> dict[str, int]:
+    """
+    Importe un module dans un processus neuf avec -X importtime.
+    Args:
+        module (str): Le module à importer.
+
+    Returns:
+        dict: Le temps d'import cumulé (en microsecondes) de chaque module importé.
+    """
+    pkgdatadir = _pkgdatadir()
+    script = (
+        "import os\nfrom gi.repository import Gio\n"
+        f"Gio.Resource.load(os.path.join({pkgdatadir!r}, 'gtk_ollama.gresource'))._register()\n"
+        f"import {module}\n"
+    )
+    env = dict(os.environ, PYTHONPATH=pkgdatadir)
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', script],
+        env=env, capture_output=True, text=True, check=True,
+    )
+    times = {}
+    for line in result.stderr.splitlines():
+        match = _IMPORTTIME_LINE.match(line)
+        if match:
+            times[match.group(3)] = int(match.group(2))
+    return times
+
+
+def measure_first_frame() -> float:
+    """Retourne le temps (en millisecondes) entre le lancement de l'application et sa première image."""
+    pkgdatadir = _pkgdatadir()
+    env = dict(os.environ, PYTHONPATH=pkgdatadir)
+    start = time.time()
+    result = subprocess.run(
+        [sys.executable, '-c', _FIRST_FRAME_SCRIPT.format(pkgdatadir=pkgdatadir)],
+        env=env, capture_output=True, text=True, check=True,
+    )
+    painted = float(result.stdout.strip().splitlines()[-1])
+    return (painted - start) * 1000
+
+
+def benchmark() -> int:
+    """
+    Mesure le démarrage et vérifie qu'il tient dans son budget.
+    Returns:
+        int: 0 si le budget est respecté, 1 sinon (code de sortie du processus).
+    """
+    failures = []
+
+    times = measure_imports()
+    heavy = sorted({name.split('.', 1)[0] for name in times} & set(HEAVY_MODULES))
+    if heavy:
+        failures.append(f"modules lourds importés au démarrage : {', '.join(heavy)}")
+    import_time = times.get('gtk_ollama.main', 0) / 1000
+    print(f"Import de l'application : {import_time:.0f} ms (budget {IMPORT_BUDGET} ms)")
+    if import_time > IMPORT_BUDGET:
+        failures.append(f"import trop long : {import_time:.0f} ms")
+
+    slowest = sorted(times.items(), key=lambda item: item[1], reverse=True)[:10]
+    for name, cumulative in slowest:
+        print(f"  {cumulative / 1000:8.1f} ms  {name}")
+
+    first_frame = measure_first_frame()
+    print(f"Première image : {first_frame:.0f} ms (budget {FIRST_FRAME_BUDGET} ms)")
+    if first_frame > FIRST_FRAME_BUDGET:
+        failures.append(f"première image trop tardive : {first_frame:.0f} ms")
+
+    for failure in failures:
+        print(f"ÉCHEC : {failure}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(benchmark())
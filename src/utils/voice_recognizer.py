@@ -1,16 +1,14 @@
-import whisper
-import sounddevice as sd
-import numpy as np
 import tempfile
 import wave
 import os
 import time
 import threading
 from gi.repository import GLib
+from .whisper_model import Whisper_Model, DEFAULT_MODEL # type: ignore
 
 
 class VoiceRecognizer:
-    def __init__(self, modele="small", sample_rate=16000, silence_threshold=0.01, silence_duree=2.0):
+    def __init__(self, modele=DEFAULT_MODEL, sample_rate=16000, silence_threshold=0.01, silence_duree=2.0):
         """
         Classe pour la reconnaissance vocale optimisée FR avec arrêt automatique sur silence.
 
@@ -20,8 +18,8 @@ class VoiceRecognizer:
             silence_threshold (float): Niveau d'énergie en dessous duquel on considère qu'il y a silence.
             silence_duree (float): Durée en secondes de silence avant d'arrêter l'enregistrement.
         """
-        print(f"🔄 Chargement du modèle Whisper '{modele}'...")
-        self.model = whisper.load_model(modele)
+        # Modèle partagé, chargé en arrière-plan à l'approche de la première dictée
+        self.whisper = Whisper_Model.get_default(modele)
         self.sample_rate = sample_rate
         self.silence_threshold = silence_threshold
         self.silence_duree = silence_duree
@@ -30,6 +28,8 @@ class VoiceRecognizer:
 
     def _enregistrer_audio_callback(self):
         """Version avec callback pour éviter les problèmes de threading."""
+        import numpy as np
+        import sounddevice as sd
         audio_total = []
         silence_start = None
         self.is_recording = True
@@ -80,6 +80,8 @@ class VoiceRecognizer:
 
     def _enregistrer_audio_bloquant(self):
         """Version bloquante améliorée avec gestion d'erreurs."""
+        import numpy as np
+        import sounddevice as sd
         duree_chunk = 0.3
         audio_total = []
         silence_start = None
@@ -123,6 +125,9 @@ class VoiceRecognizer:
 
     def transcrire_micro(self):
         """Enregistre au micro puis transcrit en français."""
+        import numpy as np
+        # Le modèle se charge pendant l'enregistrement
+        self.whisper.warm_up()
         # Utilisation de la version bloquante qui fonctionne mieux dans les threads
         audio_array = self._enregistrer_audio_bloquant()
         
@@ -141,14 +146,15 @@ class VoiceRecognizer:
                     wf.writeframes((audio_normalized * 32767).astype(np.int16).tobytes())
 
                 # Transcription Whisper
-                result = self.model.transcribe(
-                    tmp_file.name,
-                    language="fr",
-                    task="transcribe",
-                    fp16=False,
-                    temperature=0.0,
-                    initial_prompt="Ceci est une transcription en français avec ponctuation naturelle."
-                )
+                with self.whisper.use() as model:
+                    result = model.transcribe(
+                        tmp_file.name,
+                        language="fr",
+                        task="transcribe",
+                        fp16=False,
+                        temperature=0.0,
+                        initial_prompt="Ceci est une transcription en français avec ponctuation naturelle."
+                    )
 
                 os.unlink(tmp_file.name)
                 return result["text"].strip()
@@ -172,14 +178,15 @@ class VoiceRecognizer:
     def transcrire_fichier(self, chemin_fichier):
         """Transcrit un fichier audio existant."""
         try:
-            result = self.model.transcribe(
-                chemin_fichier,
-                language="fr",
-                task="transcribe",
-                fp16=False,
-                temperature=0.0,
-                initial_prompt="Ceci est une transcription en français avec ponctuation naturelle."
-            )
+            with self.whisper.use() as model:
+                result = model.transcribe(
+                    chemin_fichier,
+                    language="fr",
+                    task="transcribe",
+                    fp16=False,
+                    temperature=0.0,
+                    initial_prompt="Ceci est une transcription en français avec ponctuation naturelle."
+                )
             return result["text"].strip()
         except Exception as e:
             return f"Erreur lors de la transcription du fichier: {e}"
\ No newline at end of file
@@ -0,0 +1,157 @@
+import gc, math, sys, threading, time
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import contextmanager
+from gi.repository import GObject, GLib
+
+# Modèle Whisper utilisé par défaut pour la dictée
+DEFAULT_MODEL = "small"
+# Durée d'inactivité (en secondes) après laquelle le modèle est déchargé ; 0 pour le garder chargé
+DEFAULT_IDLE_TIMEOUT = 300
+
+
+class Whisper_Model(GObject.Object):
+    """
+    Modèle Whisper partagé, chargé en arrière-plan et déchargé après une période d'inactivité.
+
+    Le modèle (et torch) coûte plusieurs secondes de chargement et près d'un gigaoctet
+    de mémoire : il n'est chargé qu'à l'approche d'une dictée (warm_up) ou à la première
+    transcription, une seule fois pour tous les utilisateurs. La propriété state
+    (notifiée dans le thread principal) permet à l'interface d'afficher l'état du chargement.
+    """
+    __gtype_name__ = "WhisperModel"
+
+    # 'unloaded', 'loading', 'ready' ou 'error'
+    state = GObject.Property(type=str, default='unloaded')
+    idle_timeout = GObject.Property(type=int, default=DEFAULT_IDLE_TIMEOUT, minimum=0)
+
+    _instances = {}
+
+    @classmethod
+    def get_default(cls, name: str = DEFAULT_MODEL) -> "Whisper_Model":
+        """Retourne le modèle partagé par toute l'application pour ce nom de modèle."""
+        if name not in cls._instances:
+            cls._instances[name] = cls(name)
+        return cls._instances[name]
+
+    def __init__(self, name: str) -> None:
+        """
+        Args:
+            name (str): Le modèle Whisper ("tiny", "base", "small", "medium", "large").
+        """
+        super().__init__()
+        self.name = name
+        self._future = None
+        self._users = 0
+        self._last_used = 0.0
+        self._unload_source = None
+        # Réentrant : le callback d'un chargement déjà terminé est appelé par add_done_callback, verrou détenu
+        self._lock = threading.RLock()
+        self._loader = ThreadPoolExecutor(max_workers=1, thread_name_prefix="whisper_model")
+        self.connect('notify::idle-timeout', self._on_idle_timeout_changed)
+
+    def warm_up(self) -> None:
+        """Commence le chargement du modèle en arrière-plan, s'il n'est pas déjà chargé."""
+        with self._lock:
+            self._ensure_loading()
+
+    def acquire(self):
+        """
+        Retourne le modèle, en attendant la fin de son chargement ; bloquant,
+        à appeler depuis un thread de travail. Chaque appel doit être suivi de release().
+        Raises:
+            Exception: L'erreur du chargement du modèle.
+        """
+        with self._lock:
+            self._users += 1
+            future = self._ensure_loading()
+        try:
+            return future.result()
+        except Exception:
+            self.release()
+            raise
+
+    def release(self) -> None:
+        """Signale la fin d'une utilisation ; le modèle sera déchargé après idle_timeout secondes d'inactivité."""
+        with self._lock:
+            self._users -= 1
+            self._last_used = time.monotonic()
+        GLib.idle_add(self._schedule_unload)
+
+    @contextmanager
+    def use(self):
+        """Fournit le modèle le temps d'un bloc with (voir acquire())."""
+        model = self.acquire()
+        try:
+            yield model
+        finally:
+            self.release()
+
+    def _ensure_loading(self) -> Future:
+        """Retourne le chargement en cours ou terminé, en le lançant si besoin ; self._lock doit être détenu."""
+        if self._future is None:
+            self._future = self._loader.submit(self._load)
+            self._future.add_done_callback(self._on_loaded)
+            self._set_state('loading')
+        return self._future
+
+    def _load(self):
+        """Importe whisper et charge le modèle ; exécuté par le thread de chargement."""
+        import whisper
+        print(f"🔄 Chargement du modèle Whisper '{self.name}'...")
+        return whisper.load_model(self.name)
+
+    def _on_loaded(self, future: Future) -> None:
+        with self._lock:
+            if future is not self._future:
+                return
+            if future.exception() is not None:
+                print(f"Erreur lors du chargement du modèle Whisper : {future.exception()}")
+                # Un prochain appel retentera le chargement
+                self._future = None
+                self._set_state('error')
+                return
+            self._last_used = time.monotonic()
+        self._set_state('ready')
+        GLib.idle_add(self._schedule_unload)
+
+    def _schedule_unload(self, delay: int = 0) -> bool:
+        """Programme une vérification d'inactivité, par défaut à l'échéance du délai (thread principal)."""
+        if self._unload_source is None and self.idle_timeout > 0:
+            self._unload_source = GLib.timeout_add_seconds(delay or self.idle_timeout, self._unload_if_idle)
+        return False
+
+    def _on_idle_timeout_changed(self, *args) -> None:
+        """Applique un nouveau délai (réglage modifié) à la vérification en attente."""
+        if self._unload_source is not None:
+            GLib.source_remove(self._unload_source)
+            self._unload_source = None
+        self._schedule_unload()
+
+    def _unload_if_idle(self) -> bool:
+        """Décharge le modèle s'il n'a pas servi depuis idle_timeout secondes."""
+        self._unload_source = None
+        with self._lock:
+            future = self._future
+            if future is None or not future.done() or self._users > 0 or self.idle_timeout <= 0:
+                return False
+            remaining = self.idle_timeout - (time.monotonic() - self._last_used)
+            if remaining > 0:
+                # Utilisé entre-temps (ou échéance arrondie à la seconde) : nouvelle vérification plus tard
+                self._schedule_unload(math.ceil(remaining))
+                return False
+            self._future = None
+        del future
+        gc.collect()
+        torch = sys.modules.get('torch')
+        if torch is not None and torch.cuda.is_available():
+            torch.cuda.empty_cache()
+        print(f"Modèle Whisper '{self.name}' déchargé après inactivité")
+        self.state = 'unloaded'
+        return False
+
+    def _set_state(self, state: str) -> None:
+        """Met à jour l'état dans le thread principal (la notification y est émise)."""
+        def update() -> bool:
+            self.state = state
+            return False
+        GLib.idle_add(update)
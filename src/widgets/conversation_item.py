@@ -0,0 +1,57 @@
+from gi.repository import GObject
+import datetime
+
+# Sections de la liste des conversations, de la plus récente à la plus ancienne :
+# (nombre maximal de jours écoulés depuis la dernière activité, titre)
+SECTIONS = (
+    (0, "Aujourd'hui"),
+    (1, "Hier"),
+    (7, "7 derniers jours"),
+    (30, "30 derniers jours"),
+    (None, "Plus ancien"),
+)
+
+
+class Conversation_Item(GObject.Object):
+    """
+    Élément de la liste des conversations du panneau latéral (modèle d'un Gtk.ListView).
+
+    Le titre est une propriété GObject : le libellé de la ligne liée est mis à jour
+    sans recréer de widget. La section (regroupement par date) n'est calculée que
+    lorsqu'elle est demandée, puis conservée jusqu'au changement de jour.
+    """
+    __gtype_name__ = "ConversationItem"
+
+    title = GObject.Property(type=str, default="")
+
+    def __init__(self, conversation_id: int, title: str, updated_at: float = 0) -> None:
+        """
+        Args:
+            conversation_id (int): L'ID de la conversation.
+            title (str): Le titre affiché.
+            updated_at (float): L'horodatage du dernier message (0 si inconnu).
+        """
+        super().__init__(title=title)
+        self.conversation_id = conversation_id
+        self.updated_at = updated_at
+        self._section = None    # (jour de calcul, rang de la section)
+
+    def touch(self, updated_at: float) -> None:
+        """Enregistre une nouvelle activité ; la section sera recalculée."""
+        self.updated_at = updated_at
+        self._section = None
+
+    def section(self) -> int:
+        """Retourne le rang, dans SECTIONS, de la section de la conversation."""
+        today = datetime.date.today()
+        if self._section is None or self._section[0] != today:
+            days = (today - datetime.date.fromtimestamp(self.updated_at)).days if self.updated_at else None
+            rank = next(
+                index for index, (limit, _) in enumerate(SECTIONS)
+                if limit is None or (days is not None and days <= limit)
+            )
+            self._section = (today, rank)
+        return self._section[1]
+
+    def section_title(self) -> str:
+        return SECTIONS[self.section()][1]
@@ -0,0 +1,215 @@
+import re, hashlib
+from collections import OrderedDict
+from functools import lru_cache
+
+# Nombre de messages complets dont les événements d'analyse sont conservés
+EVENT_CACHE_SIZE = 256
+
+# Préfixe de ligne : titre, citation ou élément de liste
+_LINE_PATTERN = re.compile(
+    r'^(?:(?P<heading>#{1,6})\s+|>\s?(?P<quote>)|(?P<indent>[ \t]*)(?P<bullet>[-*+]|\d+[.)])\s+)'
+)
+# Mise en forme en ligne : `code`, **gras**, *italique*
+_INLINE_PATTERN = re.compile(
+    r'`(?P<code>[^`]+)`'
+    r'|\*\*(?P<bold>[^*]+?)\*\*'
+    r'|(?<![\w*])\*(?P<italic>[^*\s](?:[^*]*[^*\s])?)\*(?![\w*])'
+)
+
+
+@lru_cache(maxsize=4096)
+def parse_inline(line: str) -> tuple[tuple[str, tuple[str, ...]], ...]:
+    """
+    Découpe une ligne de prose Markdown (sans saut de ligne) en fragments à afficher.
+    Le résultat est mis en cache : les lignes déjà vues ne sont pas réanalysées.
+    Args:
+        line (str): La ligne à analyser.
+
+    Returns:
+        tuple[tuple[str, tuple[str, ...]], ...]: Les fragments (texte, noms des tags à appliquer).
+    """
+    line_tags = ()
+    fragments = []
+    match = _LINE_PATTERN.match(line)
+    if match:
+        if match.group('heading'):
+            line_tags = (f"h{min(len(match.group('heading')), 3)}",)
+        elif match.group('quote') is not None:
+            line_tags = ('quote',)
+        else:
+            line_tags = ('list',)
+            bullet = match.group('bullet')
+            fragments.append((match.group('indent') + ("•" if bullet in "-*+" else bullet) + " ", line_tags))
+        line = line[match.end():]
+
+    position = 0
+    for inline in _INLINE_PATTERN.finditer(line):
+        if inline.start() > position:
+            fragments.append((line[position:inline.start()], line_tags))
+        kind = inline.lastgroup
+        fragments.append((inline.group(kind), line_tags + (kind,)))
+        position = inline.end()
+    if position < len(line) or not fragments:
+        fragments.append((line[position:], line_tags))
+    return tuple(fragments)
+
+
+class Fence_Parser:
+    """
+    Analyseur incrémental des blocs de code délimités par ``` dans un texte reçu en flux.
+
+    Le texte brut reçu est conservé tel quel (source de vérité). Chaque appel à feed()
+    retourne uniquement les nouveaux événements :
+        ('text', contenu)     texte normal à ajouter
+        ('code_open', lang)   début d'un bloc de code (lang peut être vide)
+        ('code', contenu)     contenu à ajouter au bloc de code ouvert
+        ('code_close', '')    fin du bloc de code ouvert
+
+    Une clôture n'est reconnue que sur sa propre ligne ; une ligne incomplète qui
+    pourrait être une clôture est retenue jusqu'à ce qu'elle soit tranchée.
+    """
+
+    FENCE = "```"
+
+    # Événements des textes complets déjà analysés, par empreinte du contenu
+    _events_cache = OrderedDict()
+
+    def __init__(self) -> None:
+        self._chunks = []        # Texte brut reçu
+        self._pending = ""       # Début de ligne retenu (clôture possible)
+        self._at_line_start = True
+        self.in_code = False
+        self.lang = ""
+
+    @property
+    def text(self) -> str:
+        """Retourne le texte brut complet reçu jusqu'ici."""
+        if len(self._chunks) > 1:
+            self._chunks = ["".join(self._chunks)]
+        return self._chunks[0] if self._chunks else ""
+
+    def feed(self, chunk: str) -> list[tuple[str, str]]:
+        """
+        Analyse un nouveau morceau de texte.
+        Args:
+            chunk: Le texte reçu.
+
+        Returns:
+            list[tuple[str, str]]: Les événements produits par ce morceau.
+        """
+        self._chunks.append(chunk)
+        events = []
+        buf = self._pending + chunk
+        self._pending = ""
+
+        while buf:
+            newline = buf.find('\n')
+            if not self._at_line_start:
+                # Suite d'une ligne déjà commencée : ce ne peut pas être une clôture
+                if newline == -1:
+                    self._emit(events, buf)
+                    break
+                self._emit(events, buf[:newline + 1])
+                self._at_line_start = True
+                buf = buf[newline + 1:]
+                continue
+
+            line = buf if newline == -1 else buf[:newline]
+            stripped = line.lstrip(' ')
+            if newline == -1:
+                if stripped.startswith(self.FENCE) or self.FENCE.startswith(stripped):
+                    # Clôture possible : attendre la fin de la ligne
+                    self._pending = buf
+                else:
+                    self._emit(events, buf)
+                    self._at_line_start = False
+                break
+
+            if not self._handle_fence(events, stripped):
+                self._emit(events, buf[:newline + 1])
+            buf = buf[newline + 1:]
+
+        return events
+
+    def finish(self) -> list[tuple[str, str]]:
+        """
+        Termine l'analyse : la ligne retenue est traitée et un bloc resté ouvert est fermé.
+        Returns:
+            list[tuple[str, str]]: Les derniers événements.
+        """
+        events = []
+        if self._pending:
+            pending, self._pending = self._pending, ""
+            if not self._handle_fence(events, pending.lstrip(' ')):
+                self._emit(events, pending)
+        if self.in_code:
+            self._close(events)
+        self._at_line_start = True
+        return events
+
+    @classmethod
+    def events(cls, text: str) -> tuple[tuple[str, str], ...]:
+        """
+        Retourne les événements d'un texte complet (équivalent de feed(text) + finish()).
+        Le résultat est mis en cache par empreinte du contenu : revenir sur un message
+        déjà affiché ne relance pas l'analyse.
+        """
+        key = hashlib.blake2b(text.encode('utf-8', errors='surrogatepass'), digest_size=16).digest()
+        events = cls._events_cache.get(key)
+        if events is not None:
+            cls._events_cache.move_to_end(key)
+            return events
+
+        parser = cls()
+        events = tuple(parser.feed(text) + parser.finish())
+        cls._events_cache[key] = events
+        if len(cls._events_cache) > EVENT_CACHE_SIZE:
+            cls._events_cache.popitem(last=False)
+        return events
+
+    @classmethod
+    def parse(cls, text: str) -> list[tuple[str, str, str]]:
+        """
+        Découpe un texte complet en segments ('text' | 'code', contenu, langage).
+        Le contenu des blocs de code ne contient pas le saut de ligne final.
+        """
+        segments = []
+        for kind, value in cls.events(text):
+            if kind == 'code_open':
+                segments.append(['code', "", value])
+            elif kind == 'code_close':
+                segments[-1][1] = segments[-1][1].removesuffix('\n')
+            elif segments and segments[-1][0] == kind:
+                segments[-1][1] += value
+            else:
+                segments.append([kind, value, ''])
+        return [tuple(segment) for segment in segments]
+
+    def _handle_fence(self, events: list, stripped: str) -> bool:
+        """Traite une ligne complète si c'est une clôture ; retourne True dans ce cas."""
+        if not stripped.startswith(self.FENCE):
+            return False
+        info = stripped[len(self.FENCE):].strip()
+        if self.in_code:
+            if info:
+                # ```lang à l'intérieur d'un bloc : simple contenu
+                return False
+            self._close(events)
+        else:
+            self.in_code = True
+            self.lang = info.split()[0] if info else ""
+            events.append(('code_open', self.lang))
+        return True
+
+    def _close(self, events: list) -> None:
+        self.in_code = False
+        self.lang = ""
+        events.append(('code_close', ''))
+
+    def _emit(self, events: list, text: str) -> None:
+        """Ajoute du contenu, en fusionnant avec l'événement précédent s'il est du même type."""
+        kind = 'code' if self.in_code else 'text'
+        if events and events[-1][0] == kind:
+            events[-1] = (kind, events[-1][1] + text)
+        else:
+            events.append((kind, text))
@@ -0,0 +1,57 @@
+from gi.repository import GObject
+from typing import Optional
+
+
+class Message_Item(GObject.Object):
+    """
+    Élément de la liste des messages affichés (modèle d'un Gtk.ListView).
+
+    L'élément ne contient que les données du message : les widgets sont créés
+    par la fabrique de la liste pour les seules lignes visibles, puis recyclés.
+    Pendant le streaming, chaque morceau reçu est signalé au widget éventuellement lié.
+    """
+    __gtype_name__ = "MessageItem"
+
+    __gsignals__ = {
+        'text-appended': (GObject.SignalFlags.RUN_FIRST, None, (str,)),
+        'streaming-finished': (GObject.SignalFlags.RUN_FIRST, None, ()),
+    }
+
+    def __init__(self, text: str, user: bool, message_id: Optional[int] = None,
+                 branch_info: Optional[tuple[int, int]] = None, streaming: bool = False,
+                 images: Optional[list] = None) -> None:
+        """
+        Args:
+            text (str): Le contenu du message (partagé avec l'historique, sans copie).
+            user (bool): True si c'est un message utilisateur.
+            message_id (int, optional): L'ID du message dans l'arbre de la conversation.
+            branch_info (tuple, optional): (position, nombre) des versions du message.
+            streaming (bool): True si la réponse est en cours de réception.
+            images (list, optional): Les images jointes (Processed_Image), affichées en miniature.
+        """
+        super().__init__()
+        self.user = user
+        self.message_id = message_id
+        self.branch_info = branch_info
+        self.streaming = streaming
+        self.images = images or []
+        self._chunks = [text] if text else []
+
+    @property
+    def text(self) -> str:
+        """Retourne le contenu complet du message."""
+        if len(self._chunks) > 1:
+            self._chunks = ["".join(self._chunks)]
+        return self._chunks[0] if self._chunks else ""
+
+    def append_text(self, chunk: str) -> None:
+        """Ajoute un morceau reçu en streaming et le transmet au widget lié."""
+        if not chunk:
+            return
+        self._chunks.append(chunk)
+        self.emit('text-appended', chunk)
+
+    def finish_streaming(self) -> None:
+        """Marque la fin du streaming."""
+        self.streaming = False
+        self.emit('streaming-finished')
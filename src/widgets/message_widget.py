@@ -1,104 +1,233 @@
-import gi, re, subprocess, typing, shlex
+import gi, re, typing
 gi.require_version('Gtk', '4.0')
 gi.require_version('GtkSource', '5')
-from gi.repository import Gtk, Gdk, GLib, GtkSource
+from gi.repository import Gtk, GLib, GtkSource
+from .markdown_stream import Fence_Parser, parse_inline # type: ignore
+from .render_context import Render_Context # type: ignore
+from .message_item import Message_Item # type: ignore
+from .language_classifier import classify # type: ignore
+from .shell_executor import Shell_Executor, Shell_Execution # type: ignore
+
+# Blocs de code volumineux : seules les premières lignes sont affichées tant que le bloc n'est pas déplié
+PREVIEW_LINES = 40
+# Taille maximale de texte inséré dans un buffer par cycle de la boucle principale
+INSERT_CHUNK_SIZE = 32 * 1024
+# Hauteur au-delà de laquelle un bloc de code défile dans son propre cadre
+MAX_CODE_HEIGHT = 600
+# Hauteur maximale de la sortie d'une commande affichée sous son bloc
+MAX_OUTPUT_HEIGHT = 300
+# Langages dont les blocs peuvent être exécutés
+SHELL_LANGUAGES = {'shell', 'sh', 'bash', 'zsh', 'console'}
+# Délais d'attente des méthodes d'exécution synchrones (en secondes)
+SEQUENTIAL_TIMEOUT = 60
+COMMAND_TIMEOUT = 30
+
+
+class _Code_Block:
+    """État d'un bloc de code affiché : aperçu, texte en attente d'insertion et texte replié."""
+    __slots__ = ('buffer', 'label', 'toggle', 'language', 'lines', 'pending', 'hidden', 'hidden_lines',
+                 'expanded', 'inserting', 'mapped', 'container', 'run_button', 'execution', 'output')
+
+    def __init__(self, buffer: Gtk.TextBuffer, label: Gtk.Label, toggle: Gtk.Button, language: str,
+                 container: Gtk.Box, run_button: Gtk.Button) -> None:
+        self.buffer = buffer
+        self.label = label
+        self.toggle = toggle
+        self.language = language
+        self.container = container
+        self.run_button = run_button
+        self.execution = None   # Exécution en cours du bloc (blocs shell)
+        self.output = None      # Buffer de la sortie, créé à la première exécution
+        self.lines = 0          # Lignes insérées ou en attente d'insertion
+        self.pending = ""       # Texte en cours d'insertion par morceaux
+        self.hidden = []        # Texte au-delà de l'aperçu, inséré au dépliage
+        self.hidden_lines = 0
+        self.expanded = False
+        self.inserting = False
+        self.mapped = False
+
+    def text(self) -> str:
+        """Retourne le contenu complet du bloc."""
+        start, end = self.buffer.get_bounds()
+        return self.buffer.get_text(start, end, False) + self.pending + "".join(self.hidden)
 
 
 class Message_Widget(Gtk.Box):
-    """Widget pour afficher les messages avec support des blocs de code et exécution shell."""
+    """
+    Widget pour afficher les messages avec support des blocs de code et exécution shell.
+
+    Le widget affiche un Message_Item et peut être lié successivement à plusieurs
+    éléments (recyclage par la fabrique d'un Gtk.ListView).
+    """
     
-    def __init__(self, text: str, user: bool, delete_callback: callable, message_id: str) -> None:
+    def __init__(self, text: typing.Optional[str] = None, user: bool = False,
+                 delete_callback: callable = None, message_id: str = None,
+                 edit_callback: callable = None, branch_callback: callable = None,
+                 branch_info: typing.Optional[tuple[int, int]] = None,
+                 session_callback: callable = None) -> None:
         """
         Initialise un widget de message.
         
         Args:
-            text: Contenu du message
+            text: Contenu du message (None pour un widget vide, lié plus tard avec bind())
             user: True si c'est un message utilisateur, False sinon
             delete_callback: Fonction à appeler pour supprimer le message
             message_id: Identifiant unique du message
+            edit_callback: Fonction appelée pour éditer (utilisateur) ou régénérer (assistant) le message
+            branch_callback: Fonction appelée avec (widget, -1|+1) pour changer de version du message
+            branch_info: (position, nombre) des versions du message, si plusieurs existent
+            session_callback: Fonction qui retourne la clé de la session shell où exécuter les commandes
+                (l'ID de la conversation affichée)
         """
         super().__init__(orientation=Gtk.Orientation.VERTICAL, spacing=5)
         self.set_margin_top(10)
         self.set_margin_bottom(10)
         self.set_margin_start(15)
         self.set_margin_end(15)
-        self.message_id = message_id
         self.delete_callback = delete_callback
+        self.edit_callback = edit_callback
+        self.branch_callback = branch_callback
+        self.session_callback = session_callback
         
         # Variables de debug et d'état
         self._debug_enabled = False  # Activé pour debug
-        self._last_textview = None  # Référence au dernier TextView créé
+        self.item = None  # Message_Item affiché
+        self._item_handlers = []  # Signaux connectés sur l'élément lié
+        self._header = None
+        self._images_box = None
+        self._line_text = ""  # Ligne de prose en cours, affichée sans mise en forme
+        self._open_code = None  # Bloc de code en cours de réception
+        self._code_blocks = []  # Blocs de code du message affiché
+        self._parser = Fence_Parser()  # Texte brut et état des blocs de code
         self._executed_blocks = set()  # Éviter les exécutions multiples
-        
-        self.debug_print(f"Initialisation avec texte: '{text[:50] if text else 'None'}...' (longueur: {len(text) if text else 0})")
 
-        # Définir l'alignement principal
-        self.set_halign(Gtk.Align.END if user else Gtk.Align.START)
         self.set_hexpand(True)
 
         # Conteneur principal pour les marges internes et le style
-        main_container = Gtk.Box(orientation=Gtk.Orientation.VERTICAL, spacing=5)
-        main_container.set_hexpand(True)
-        self.append(main_container)
+        self.main_container = Gtk.Box(orientation=Gtk.Orientation.VERTICAL, spacing=5)
+        self.main_container.set_hexpand(True)
+        self.append(self.main_container)
 
         # Appliquer les classes CSS
-        self._setup_css(main_container)
-
-        # Header : Boutons (modifier, supprimer)
-        self._create_header(main_container)
+        self._setup_css(self.main_container)
 
         # Corps : Contenu du message avec détection de code
         self.content_container = Gtk.Box(orientation=Gtk.Orientation.VERTICAL, spacing=5)
-        main_container.append(self.content_container)
-        
-        # Traiter et afficher le contenu
-        if text and text.strip():
-            self.process_and_display_content(text)
+        self.main_container.append(self.content_container)
+
+        # Un seul TextView par message : la prose est mise en forme par des tags,
+        # les blocs de code sont insérés à des ancres
+        self.text_view = Gtk.TextView(buffer=Gtk.TextBuffer(tag_table=Render_Context.get_default().get_tag_table()))
+        self.text_view.set_wrap_mode(Gtk.WrapMode.WORD_CHAR)
+        self.text_view.set_editable(False)
+        self.text_view.set_cursor_visible(False)
+        self.text_view.add_css_class("message-textview")
+        self.text_view.set_hexpand(True)
+        self.text_view.set_vexpand(False)
+        self.text_view.set_size_request(800, -1)
+        self.content_container.append(self.text_view)
+
+        buffer = self.text_view.get_buffer()
+        # Début de la ligne en cours (gravité gauche : reste avant le texte inséré)
+        self._line_mark = buffer.create_mark(None, buffer.get_end_iter(), True)
+
+        if text is not None:
+            self.bind(Message_Item(text, user, message_id, branch_info, streaming=not text.strip()))
+
+    @property
+    def message_id(self):
+        return self.item.message_id if self.item else None
+
+    @property
+    def user(self) -> bool:
+        return self.item.user if self.item else False
+
+    @property
+    def branch_info(self) -> typing.Optional[tuple[int, int]]:
+        return self.item.branch_info if self.item else None
+
+    def bind(self, item: Message_Item) -> None:
+        """
+        Affiche un message dans ce widget, en remplaçant le contenu précédent.
+        Args:
+            item (Message_Item): Le message à afficher.
+        """
+        self.unbind()
+        self.item = item
+        self.debug_print(f"Liaison avec texte: '{item.text[:50]}...' (longueur: {len(item.text)})")
+
+        # Définir l'alignement principal
+        self.set_halign(Gtk.Align.END if item.user else Gtk.Align.START)
+
+        # Header : Boutons (modifier, supprimer)
+        self._create_header(self.main_container)
+
+        # Miniatures des images jointes (textures mises en cache sur les images)
+        if item.images:
+            self._images_box = Gtk.Box(orientation=Gtk.Orientation.HORIZONTAL, spacing=5)
+            self._images_box.set_halign(Gtk.Align.END if item.user else Gtk.Align.START)
+            for image in item.images:
+                picture = Gtk.Picture.new_for_paintable(image.get_texture())
+                picture.set_can_shrink(False)
+                self._images_box.append(picture)
+            self.content_container.prepend(self._images_box)
+
+        # Traiter et afficher le contenu (un message complet réutilise son analyse en cache)
+        if item.streaming:
+            self._apply_events(self._parser.feed(item.text))
         else:
-            # Si pas de texte initial, créer un TextView vide pour le streaming
-            self.debug_print("Création d'un TextView vide pour streaming")
-            self.add_text_view("")
+            self._apply_events(Fence_Parser.events(item.text))
+            self._flush_line()
+
+        self._item_handlers = [
+            item.connect('text-appended', self._on_text_appended),
+            item.connect('streaming-finished', self._on_streaming_finished),
+        ]
+
+    def unbind(self) -> None:
+        """Détache le message affiché et vide le widget pour qu'il puisse être réutilisé."""
+        if self.item is not None:
+            for handler in self._item_handlers:
+                self.item.disconnect(handler)
+        self._item_handlers = []
+        self.item = None
+
+        if self._header is not None:
+            self.main_container.remove(self._header)
+            self._header = None
+        if self._images_box is not None:
+            self.content_container.remove(self._images_box)
+            self._images_box = None
+        # Vider le buffer retire aussi les blocs de code ancrés
+        self.text_view.get_buffer().set_text("")
+
+        self._line_text = ""
+        self._open_code = None
+        for block in self._code_blocks:
+            # Interrompre les insertions encore programmées et les exécutions en cours
+            block.pending = ""
+            if block.execution is not None:
+                block.execution.cancel()
+                block.execution = None
+        self._code_blocks = []
+        self._parser = Fence_Parser()
+        self._executed_blocks.clear()
+
+    def _on_text_appended(self, item: Message_Item, chunk: str) -> None:
+        # Seuls les nouveaux événements sont appliqués : aucun widget n'est reconstruit
+        self._apply_events(self._parser.feed(chunk))
+
+    def _on_streaming_finished(self, item: Message_Item) -> None:
+        self._finish_content()
+
+    def _finish_content(self) -> None:
+        """Traite la dernière ligne retenue, ferme un bloc resté ouvert et met en forme la dernière ligne."""
+        self._apply_events(self._parser.finish())
+        self._flush_line()
 
     def _setup_css(self, main_container: Gtk.Box) -> None:
-        """Configure les styles CSS pour le widget."""
-        css_provider = Gtk.CssProvider()
-        css_provider.load_from_data(
-            b"""
-            .box_message {
-                border-radius: 10px;
-                box-shadow: 0px 2px 5px rgba(0, 0, 0, 0.1);
-                padding: 10px;
-            }
-
-            .message-textview {
-                background: transparent;
-                color: inherit;
-                min-height: 25px;
-            }
-            
-            .code-block {
-                background: #2d3748;
-                border-radius: 5px;
-                padding: 10px;
-                margin: 5px 0;
-                font-family: 'Courier New', monospace;
-            }
-            
-            .language-label {
-                background: #4a5568;
-                color: white;
-                padding: 2px 8px;
-                border-radius: 3px;
-                font-size: 12px;
-                font-weight: bold;
-            }
-            """
-        )
-        Gtk.StyleContext.add_provider_for_display(
-            Gdk.Display.get_default(),
-            css_provider,
-            Gtk.STYLE_PROVIDER_PRIORITY_USER
-        )
+        """Applique les classes CSS du widget (le CSS est chargé une seule fois par le contexte de rendu)."""
+        Render_Context.get_default().ensure_css()
         main_container.add_css_class("box_message")
 
     def _create_header(self, main_container: Gtk.Box) -> None:
@@ -106,14 +235,35 @@ class Message_Widget(Gtk.Box):
         header = Gtk.Box(orientation=Gtk.Orientation.HORIZONTAL, spacing=5)
         header.set_halign(Gtk.Align.END)
         
-        modify_button = Gtk.Button(label="Editer")
+        # Navigation entre les versions du message (branches)
+        if self.branch_info and self.branch_info[1] > 1 and self.branch_callback:
+            position, count = self.branch_info
+            previous_button = Gtk.Button(icon_name="go-previous-symbolic")
+            previous_button.set_has_frame(False)
+            previous_button.set_sensitive(position > 1)
+            previous_button.connect("clicked", lambda btn: self.branch_callback(self, -1))
+            next_button = Gtk.Button(icon_name="go-next-symbolic")
+            next_button.set_has_frame(False)
+            next_button.set_sensitive(position < count)
+            next_button.connect("clicked", lambda btn: self.branch_callback(self, 1))
+            header.append(previous_button)
+            header.append(Gtk.Label(label=f"{position}/{count}"))
+            header.append(next_button)
+
+        modify_button = Gtk.Button(label="Editer" if self.user else "Régénérer")
+        if self.edit_callback:
+            modify_button.connect("clicked", lambda btn: self.edit_callback(self))
+        else:
+            modify_button.set_sensitive(False)
         delete_button = Gtk.Button(label="Supprimer")
         delete_button.set_icon_name("user-trash-symbolic")
-        delete_button.connect("clicked", lambda btn: self.delete_callback(self))
+        if self.delete_callback:
+            delete_button.connect("clicked", lambda btn: self.delete_callback(self))
         
         header.append(modify_button)
         header.append(delete_button)
-        main_container.append(header)
+        main_container.prepend(header)
+        self._header = header
 
     def debug_print(self, message: str) -> None:
         """Affiche les messages de debug si activé."""
@@ -121,406 +271,406 @@ class Message_Widget(Gtk.Box):
             print(f"[Message_Widget {self.message_id}] {message}")
 
     def process_and_display_content(self, text: str) -> None:
-        """Traite le texte pour détecter et afficher les blocs de code."""
+        """Affiche un texte complet à la place du contenu actuel."""
         self.debug_print(f"Traitement du contenu: '{text[:50]}...'")
-        
-        # Extraire les blocs de code
-        code_blocks = self.extract_docstring(text)
-        
-        if not code_blocks:
-            # Pas de blocs de code, afficher le texte normal
-            self.debug_print("Aucun bloc de code détecté")
-            self.add_text_view(text)
-        else:
-            self.debug_print(f"Blocs de code détectés: {len(code_blocks)}")
-            # Diviser le texte en parties : texte normal et blocs de code
-            parts = self.split_text_with_code_blocks(text)
-            
-            for i, (part_type, content, lang) in enumerate(parts):
-                self.debug_print(f"Partie {i}: type={part_type}, longueur={len(content)}")
-                if part_type == 'text':
-                    if content.strip():  # Éviter d'ajouter du texte vide
-                        self.add_text_view(content)
-                elif part_type == 'code':
-                    self.add_code_block(content, lang)
+        self.bind(Message_Item(text, self.user, self.message_id, self.branch_info))
 
     def split_text_with_code_blocks(self, text: str) -> list[tuple[str, str, str]]:
         """Divise le texte en alternant entre texte normal et blocs de code."""
-        parts = []
-        pattern = r"```(\w*)\n(.*?)```"
-        
-        last_end = 0
-        for match in re.finditer(pattern, text, re.DOTALL):
-            # Texte avant le bloc de code
-            before_text = text[last_end:match.start()]
-            if before_text:
-                parts.append(('text', before_text, ''))
-            
-            # Bloc de code
-            lang = match.group(1) or self._detect_language(match.group(2))
-            code = match.group(2).strip()
-            parts.append(('code', code, lang))
-            
-            # Exécution des commandes shell (éviter les doublons)
-            # if lang in ["shell", "bash"] and code not in self._executed_blocks:
-            #     self.debug_print(f"Nouveau bloc shell détecté: {code}")
-            #     self._executed_blocks.add(code)
-            #     print(f"le code a exécuter : {code}")
-            #     outputs = self.execute_shell_command(code)
-                
-            #     # Afficher les résultats
-            #     for i, output in enumerate(outputs):
-            #         self.debug_print(f"Résultat shell {i+1}: {output}")
-            
-            last_end = match.end()
-        
-        # Texte après le dernier bloc de code
-        remaining_text = text[last_end:]
-        if remaining_text:
-            parts.append(('text', remaining_text, ''))
-        
-        return parts
+        return [
+            (kind, content, lang or (self._detect_language(content) if kind == 'code' else ''))
+            for kind, content, lang in Fence_Parser.parse(text)
+        ]
 
-    def add_text_view(self, text: str) -> None:
-        """Ajoute un TextView normal pour le texte."""
-        self.debug_print(f"Création TextView avec texte: '{text[:30]}...' (longueur: {len(text)})")
-        
-        text_view = Gtk.TextView()
-        text_view.set_wrap_mode(Gtk.WrapMode.WORD_CHAR)
-        text_view.set_editable(False)
-        text_view.set_cursor_visible(False)
-        text_view.add_css_class("message-textview")
-        text_view.set_hexpand(True)
-        text_view.set_vexpand(False)
-        text_view.set_size_request(800, -1)
-        
-        # Définir le texte AVANT d'ajouter à l'interface
-        buffer = text_view.get_buffer()
-        if text:
-            buffer.set_text(text)
-            # Vérification
-            start = buffer.get_start_iter()
-            end = buffer.get_end_iter()
-            actual_text = buffer.get_text(start, end, False)
-            self.debug_print(f"Texte dans le buffer: '{actual_text[:30]}...' (longueur: {len(actual_text)})")
-        else:
-            buffer.set_text("")
-        
-        # Sauvegarder la référence
-        self._last_textview = text_view
-        
-        # Ajouter à l'interface
-        self.content_container.append(text_view)
-        text_view.queue_draw()
+    def _apply_events(self, events: list[tuple[str, str]]) -> None:
+        """
+        Applique les événements de l'analyseur : le texte est ajouté au buffer du message,
+        un bloc de code n'est créé qu'à l'ouverture de sa clôture et scellé à sa fermeture.
+        Les widgets déjà construits ne sont jamais reconstruits.
+        """
+        for kind, value in events:
+            if kind == 'text':
+                self._append_prose(value)
+            elif kind == 'code_open':
+                self._open_code_block(value)
+            elif kind == 'code':
+                self._append_to_code_block(value)
+            elif kind == 'code_close':
+                self._seal_code_block()
+
+    def _append_prose(self, text: str) -> None:
+        """
+        Ajoute de la prose au buffer. Chaque ligne complète est mise en forme (titres,
+        listes, gras, italique, code en ligne) ; la ligne en cours reste brute jusqu'à sa fin.
+        """
+        lines = (self._line_text + text).split('\n')
+        buffer = self.text_view.get_buffer()
+        buffer.delete(buffer.get_iter_at_mark(self._line_mark), buffer.get_end_iter())
+        for line in lines[:-1]:
+            self._insert_formatted_line(line, True)
+        buffer.move_mark(self._line_mark, buffer.get_end_iter())
+        self._line_text = lines[-1]
+        buffer.insert(buffer.get_end_iter(), self._line_text)
+
+    def _flush_line(self) -> None:
+        """Met en forme la ligne en cours, sans attendre son saut de ligne."""
+        if not self._line_text:
+            return
+        buffer = self.text_view.get_buffer()
+        buffer.delete(buffer.get_iter_at_mark(self._line_mark), buffer.get_end_iter())
+        self._insert_formatted_line(self._line_text, False)
+        buffer.move_mark(self._line_mark, buffer.get_end_iter())
+        self._line_text = ""
+
+    def _insert_formatted_line(self, line: str, newline: bool) -> None:
+        """Insère une ligne de prose en fin de buffer avec ses tags."""
+        buffer = self.text_view.get_buffer()
+        fragments = parse_inline(line)
+        for text, tags in fragments:
+            if text:
+                buffer.insert_with_tags_by_name(buffer.get_end_iter(), text, *tags)
+        if newline:
+            # Le saut de ligne porte les tags de paragraphe (titre, liste, citation)
+            line_tags = set.intersection(*(set(tags) for _, tags in fragments))
+            buffer.insert_with_tags_by_name(buffer.get_end_iter(), "\n", *line_tags)
 
     def add_code_block(self, code: str, language: str) -> None:
-        """Ajoute un bloc de code avec coloration syntaxique."""
-        self.debug_print(f"Création bloc de code: langage={language}, longueur={len(code)}")
+        """Ajoute un bloc de code complet avec coloration syntaxique."""
+        self._open_code_block(language)
+        self._append_to_code_block(code)
+        self._seal_code_block()
+
+    def _open_code_block(self, language: str) -> None:
+        """Crée un bloc de code vide, ancré dans le buffer, qui recevra son contenu au fil du streaming."""
+        self.debug_print(f"Ouverture bloc de code: langage={language}")
+        self._flush_line()
         
         # Conteneur pour le bloc de code
         code_container = Gtk.Box(orientation=Gtk.Orientation.VERTICAL, spacing=2)
         code_container.add_css_class("code-block")
         
-        # Label du langage
-        if language and language != 'text':
-            lang_label = Gtk.Label(label=language.upper())
-            lang_label.add_css_class("language-label")
-            lang_label.set_halign(Gtk.Align.START)
-            code_container.append(lang_label)
+        # Label du langage (renseigné à la fermeture si le langage est détecté)
+        lang_label = Gtk.Label(label=language.upper())
+        lang_label.add_css_class("language-label")
+        lang_label.set_halign(Gtk.Align.START)
+        lang_label.set_visible(bool(language) and language != 'text')
+
+        # Bouton d'exécution, visible pour les blocs shell
+        run_button = Gtk.Button(icon_name="media-playback-start-symbolic")
+        run_button.set_tooltip_text("Exécuter")
+        run_button.set_has_frame(False)
+        run_button.set_hexpand(True)
+        run_button.set_halign(Gtk.Align.END)
+        run_button.set_visible(language in SHELL_LANGUAGES)
+
+        code_header = Gtk.Box(orientation=Gtk.Orientation.HORIZONTAL, spacing=6)
+        code_header.append(lang_label)
+        code_header.append(run_button)
+        code_container.append(code_header)
         
         # Essayer d'utiliser GtkSourceView pour la coloration syntaxique
         try:
             source_buffer = GtkSource.Buffer()
-            lang_manager = GtkSource.LanguageManager()
-            
-            # Mapper les noms de langages
-            lang_mapping = {
-                'python': 'python3',
-                'javascript': 'js',
-                'java': 'java',
-                'c': 'c',
-                'cpp': 'cpp',
-                'shell': 'sh',
-                'bash': 'sh',
-                'html': 'html',
-                'css': 'css',
-                'sql': 'sql'
-            }
-            
-            gtk_lang_id = lang_mapping.get(language, language)
-            gtk_language = lang_manager.get_language(gtk_lang_id)
-            
-            if gtk_language:
-                source_buffer.set_language(gtk_language)
-                source_buffer.set_highlight_syntax(True)
+            self._set_buffer_language(source_buffer, language)
             
-            source_buffer.set_text(code)
-            
-            source_view = GtkSource.View.new_with_buffer(source_buffer)
-            source_view.set_editable(False)
-            source_view.set_cursor_visible(False)
-            source_view.set_show_line_numbers(True)
-            source_view.set_highlight_current_line(False)
-            source_view.set_wrap_mode(Gtk.WrapMode.WORD_CHAR)
-            source_view.set_hexpand(True)
-            source_view.set_size_request(800, -1)
+            code_view = GtkSource.View.new_with_buffer(source_buffer)
+            code_view.set_show_line_numbers(True)
+            code_view.set_highlight_current_line(False)
             
             # Appliquer un thème sombre
-            scheme_manager = GtkSource.StyleSchemeManager()
-            dark_scheme = scheme_manager.get_scheme('Adwaita-dark')
+            dark_scheme = Render_Context.get_default().get_style_scheme()
             if dark_scheme:
                 source_buffer.set_style_scheme(dark_scheme)
             
-            code_container.append(source_view)
+            code_buffer = source_buffer
             
         except Exception as e:
             self.debug_print(f"Erreur avec GtkSourceView, utilisation de TextView simple: {e}")
             # Fallback vers TextView simple
             code_view = Gtk.TextView()
-            code_view.set_wrap_mode(Gtk.WrapMode.WORD_CHAR)
-            code_view.set_editable(False)
-            code_view.set_cursor_visible(False)
-            code_view.set_hexpand(True)
-            code_view.set_size_request(800, -1)
-            
-            # Police monospace
-            font_desc = code_view.get_style_context().get_font()
-            font_desc.set_family("monospace")
-            code_view.override_font(font_desc)
-            
+            code_view.set_monospace(True)
             code_buffer = code_view.get_buffer()
-            code_buffer.set_text(code)
-            
-            code_container.append(code_view)
-        
-        self.content_container.append(code_container)
+
+        code_view.set_editable(False)
+        code_view.set_cursor_visible(False)
+        code_view.set_wrap_mode(Gtk.WrapMode.WORD_CHAR)
+        code_view.set_hexpand(True)
+        code_view.set_size_request(800, -1)
+
+        # Un bloc très long défile dans son cadre : seules ses lignes visibles sont mises en page
+        scrolled = Gtk.ScrolledWindow()
+        scrolled.set_policy(Gtk.PolicyType.NEVER, Gtk.PolicyType.AUTOMATIC)
+        scrolled.set_propagate_natural_height(True)
+        scrolled.set_max_content_height(MAX_CODE_HEIGHT)
+        scrolled.set_child(code_view)
+        code_container.append(scrolled)
+
+        # Bouton de dépliage, visible seulement si le bloc dépasse l'aperçu
+        toggle = Gtk.Button()
+        toggle.set_has_frame(False)
+        toggle.set_halign(Gtk.Align.START)
+        toggle.set_visible(False)
+        code_container.append(toggle)
+
+        block = _Code_Block(code_buffer, lang_label, toggle, language, code_container, run_button)
+        toggle.connect("clicked", lambda btn: self._expand_code_block(block))
+        run_button.connect("clicked", lambda btn: self._run_code_block(block))
+        # La coloration n'est calculée qu'une fois le bloc affiché à l'écran
+        code_view.connect("map", lambda view: self._on_code_block_mapped(block))
+        
+        # Le bloc occupe sa propre ligne dans le buffer du message
+        buffer = self.text_view.get_buffer()
+        end = buffer.get_end_iter()
+        if not end.starts_line():
+            buffer.insert(end, "\n")
+        anchor = buffer.create_child_anchor(buffer.get_end_iter())
+        self.text_view.add_child_at_anchor(code_container, anchor)
+        buffer.insert(buffer.get_end_iter(), "\n")
+        buffer.move_mark(self._line_mark, buffer.get_end_iter())
+        self._open_code = block
+        self._code_blocks.append(block)
+
+    def _append_to_code_block(self, code: str) -> None:
+        """
+        Ajoute du contenu au bloc de code ouvert. Au-delà de PREVIEW_LINES lignes,
+        le contenu est conservé replié et n'est inséré qu'au dépliage du bloc.
+        """
+        if not self._open_code:
+            self._open_code_block("")
+        block = self._open_code
+
+        if not block.expanded and not block.hidden:
+            cut = self._preview_cut(code, PREVIEW_LINES - block.lines)
+            self._queue_insert(block, code[:cut])
+            code = code[cut:]
+        if not code:
+            return
+        if block.expanded:
+            self._queue_insert(block, code)
+        else:
+            block.hidden.append(code)
+            block.hidden_lines += code.count('\n')
+            self._update_code_toggle(block)
+
+    @staticmethod
+    def _preview_cut(code: str, lines: int) -> int:
+        """Retourne la position qui suit la lines-ième fin de ligne de code (ou sa longueur)."""
+        index = -1
+        for _ in range(max(lines, 0)):
+            index = code.find('\n', index + 1)
+            if index == -1:
+                return len(code)
+        return index + 1
+
+    def _queue_insert(self, block: _Code_Block, text: str) -> None:
+        """Insère du texte dans un bloc, par morceaux répartis sur plusieurs cycles s'il est volumineux."""
+        if not text:
+            return
+        block.lines += text.count('\n')
+        if not block.inserting and len(text) <= INSERT_CHUNK_SIZE:
+            block.buffer.insert(block.buffer.get_end_iter(), text)
+            return
+        block.pending += text
+        if not block.inserting:
+            block.inserting = True
+            self._update_highlighting(block)
+            GLib.idle_add(self._insert_pending, block)
+
+    def _insert_pending(self, block: _Code_Block) -> bool:
+        """Insère le morceau suivant du texte en attente ; appelé par GLib.idle_add."""
+        if block.pending:
+            chunk = block.pending[:INSERT_CHUNK_SIZE]
+            block.pending = block.pending[INSERT_CHUNK_SIZE:]
+            block.buffer.insert(block.buffer.get_end_iter(), chunk)
+        if block.pending:
+            return True
+        block.inserting = False
+        self._update_highlighting(block)
+        return False
+
+    def _update_code_toggle(self, block: _Code_Block) -> None:
+        """Affiche le nombre de lignes repliées sur le bouton de dépliage."""
+        tail = block.hidden[-1]
+        lines = block.hidden_lines + (1 if tail and not tail.endswith('\n') else 0)
+        block.toggle.set_label(f"Afficher les {lines} lignes suivantes")
+        block.toggle.set_visible(True)
+
+    def _expand_code_block(self, block: _Code_Block) -> None:
+        """Déplie un bloc de code : le texte replié est inséré par morceaux."""
+        block.expanded = True
+        block.toggle.set_visible(False)
+        hidden = "".join(block.hidden)
+        block.hidden = []
+        block.hidden_lines = 0
+        self._queue_insert(block, hidden)
+
+    def _on_code_block_mapped(self, block: _Code_Block) -> None:
+        block.mapped = True
+        self._update_highlighting(block)
+
+    def _update_highlighting(self, block: _Code_Block) -> None:
+        """Active la coloration d'un bloc visible, et la suspend pendant une insertion par morceaux."""
+        if isinstance(block.buffer, GtkSource.Buffer):
+            block.buffer.set_highlight_syntax(
+                block.mapped and not block.inserting and block.buffer.get_language() is not None
+            )
+
+    def _seal_code_block(self) -> None:
+        """Ferme le bloc de code ouvert : retire le saut de ligne final et fixe le langage."""
+        if not self._open_code:
+            return
+        block = self._open_code
+        self._open_code = None
+
+        # Le saut de ligne final se trouve dans la dernière partie reçue du bloc
+        if block.hidden:
+            if block.hidden[-1].endswith('\n'):
+                block.hidden[-1] = block.hidden[-1][:-1]
+                block.hidden_lines -= 1
+                self._update_code_toggle(block)
+        elif block.pending:
+            block.pending = block.pending.removesuffix('\n')
+        else:
+            end = block.buffer.get_end_iter()
+            last = end.copy()
+            if last.backward_char() and last.get_char() == '\n':
+                block.buffer.delete(last, end)
+
+        if not block.language:
+            block.language = self._detect_language(block.text())
+            if isinstance(block.buffer, GtkSource.Buffer):
+                self._set_buffer_language(block.buffer, block.language)
+            block.label.set_label(block.language.upper())
+            block.label.set_visible(block.language != 'text')
+            block.run_button.set_visible(block.language in SHELL_LANGUAGES)
+        self._update_highlighting(block)
+        self.debug_print(f"Bloc de code scellé: langage={block.language}")
+
+    def _run_code_block(self, block: _Code_Block) -> None:
+        """
+        Exécute un bloc shell en arrière-plan, ou arrête son exécution en cours.
+        La sortie s'affiche sous le bloc au fil de sa réception.
+        """
+        if block.execution is not None:
+            block.execution.cancel()
+            return
+
+        if block.output is None:
+            output_view = Gtk.TextView(buffer=Gtk.TextBuffer(tag_table=Render_Context.get_default().get_tag_table()))
+            output_view.set_monospace(True)
+            output_view.set_editable(False)
+            output_view.set_cursor_visible(False)
+            output_view.set_wrap_mode(Gtk.WrapMode.WORD_CHAR)
+            output_view.add_css_class("shell-output")
+
+            scrolled = Gtk.ScrolledWindow()
+            scrolled.set_policy(Gtk.PolicyType.NEVER, Gtk.PolicyType.AUTOMATIC)
+            scrolled.set_propagate_natural_height(True)
+            scrolled.set_max_content_height(MAX_OUTPUT_HEIGHT)
+            scrolled.set_child(output_view)
+            block.container.append(scrolled)
+            block.output = output_view.get_buffer()
+        else:
+            block.output.set_text("")
+
+        block.run_button.set_icon_name("media-playback-stop-symbolic")
+        block.run_button.set_tooltip_text("Arrêter")
+        # Les callbacks sont appelés depuis le thread de l'exécuteur
+        block.execution = Shell_Executor.get_default().run(
+            block.text(),
+            on_output=lambda stream, text: GLib.idle_add(self._on_shell_output, block, stream, text),
+            on_done=lambda execution: GLib.idle_add(self._on_shell_done, block, execution),
+            session=self._shell_session(),
+        )
+        self.debug_print(f"Exécution du bloc shell: {block.execution.command[:50]}")
+
+    def _shell_session(self):
+        """Retourne la clé de la session shell persistante (None : processus indépendant)."""
+        return self.session_callback() if self.session_callback else None
+
+    def _on_shell_output(self, block: _Code_Block, stream: str, text: str) -> bool:
+        """Ajoute un morceau de sortie sous le bloc ; appelé par GLib.idle_add."""
+        if block not in self._code_blocks:
+            # Bloc retiré par unbind : le widget affiche un autre message
+            return False
+        end = block.output.get_end_iter()
+        if stream == 'spool':
+            block.output.insert_with_tags_by_name(
+                end, f"\n[Sortie volumineuse : la suite est enregistrée dans {text}]\n", 'italic'
+            )
+        elif stream == 'stderr':
+            block.output.insert_with_tags_by_name(end, text, 'error')
+        else:
+            block.output.insert(end, text)
+        return False
+
+    def _on_shell_done(self, block: _Code_Block, execution: Shell_Execution) -> bool:
+        """Affiche l'issue de l'exécution et rétablit le bouton ; appelé par GLib.idle_add."""
+        if block not in self._code_blocks:
+            return False
+        if block.execution is execution:
+            block.execution = None
+            block.run_button.set_icon_name("media-playback-start-symbolic")
+            block.run_button.set_tooltip_text("Exécuter")
+
+        end = block.output.get_end_iter()
+        if not end.starts_line():
+            block.output.insert(end, "\n")
+        if execution.cancelled:
+            status = "[Annulé]"
+        else:
+            status = f"[Code de sortie : {execution.returncode}]"
+        block.output.insert_with_tags_by_name(
+            block.output.get_end_iter(), status, 'italic' if execution.returncode == 0 else 'error'
+        )
+        return False
+
+    def _set_buffer_language(self, source_buffer: GtkSource.Buffer, language: str) -> None:
+        """Associe le langage donné à un buffer (la coloration est activée à l'affichage du bloc)."""
+        if not language:
+            return
+        gtk_language = Render_Context.get_default().get_language(language)
+        if gtk_language:
+            source_buffer.set_language(gtk_language)
 
     def append_text(self, additional_text: str) -> None:
-        """Ajoute du texte au contenu existant de manière optimisée pour le streaming."""
+        """Ajoute du texte au message affiché de manière optimisée pour le streaming."""
         self.debug_print(f"Ajout de texte: '{additional_text[:30]}...' (longueur: {len(additional_text)})")
-        
-        try:
-            def update_content():
-                if not additional_text:
-                    self.debug_print("Texte vide reçu, ignoré")
-                    return
-                
-                success = self._append_to_last_textview(additional_text)
-                
-                if not success:
-                    self.debug_print("Échec de l'ajout au TextView existant, création d'un nouveau")
-                    self.add_text_view(additional_text)
-                
-                # Détecter la fin d'un bloc de code pour le reformater
-                if additional_text.endswith("```\n") or additional_text.endswith("```"):
-                    self.debug_print("Fin de bloc de code détectée, programmation du reformatage")
-                    GLib.timeout_add(100, self._check_and_reformat_if_needed)
-            
-            if not GLib.main_context_default().is_owner():
-                GLib.idle_add(update_content)
-            else:
-                update_content()
-        except Exception as e:
-            self.debug_print(f"Erreur lors de l'ajout de texte: {e}")
-    
-    def _check_and_reformat_if_needed(self) -> bool:
-        """Vérifie si le contenu actuel contient des blocs de code complets et les reformate si nécessaire."""
-        try:
-            current_text = self.get_current_displayed_text()
-            triple_quotes = current_text.count("```")
-            
-            self.debug_print(f"Vérification reformatage: {triple_quotes} triple quotes trouvées")
-            
-            if triple_quotes >= 2 and triple_quotes % 2 == 0:
-                self.debug_print("Reformatage du contenu")
-                self._rebuild_content(current_text)
-        except Exception as e:
-            self.debug_print(f"Erreur lors du reformatage: {e}")
-        
-        return False  # N'exécuter qu'une fois
-    
-    def _append_to_last_textview(self, text: str) -> bool:
-        """Ajoute du texte au dernier TextView existant."""
-        self.debug_print(f"Recherche du dernier TextView pour y ajouter: '{text[:20]}...'")
-        
-        # Utiliser la référence sauvegardée si elle existe
-        if self._last_textview and self._last_textview.get_parent():
-            try:
-                buffer = self._last_textview.get_buffer()
-                end_iter = buffer.get_end_iter()
-                buffer.insert(end_iter, text)
-                
-                # Vérification
-                start = buffer.get_start_iter()
-                end = buffer.get_end_iter()
-                actual_text = buffer.get_text(start, end, False)
-                self.debug_print(f"Texte ajouté avec succès. Buffer contient maintenant {len(actual_text)} caractères")
-                
-                self._last_textview.queue_draw()
-                return True
-            except Exception as e:
-                self.debug_print(f"Erreur avec la référence sauvegardée: {e}")
-                self._last_textview = None
-        
-        # Fallback : chercher le dernier TextView dans le conteneur
-        last_textview = None
-        child = self.content_container.get_first_child()
-        
-        while child:
-            if isinstance(child, Gtk.TextView):
-                last_textview = child
-                self.debug_print("TextView trouvé")
-            child = child.get_next_sibling()
-        
-        if last_textview:
-            try:
-                buffer = last_textview.get_buffer()
-                end_iter = buffer.get_end_iter()
-                buffer.insert(end_iter, text)
-                
-                # Sauvegarder la référence
-                self._last_textview = last_textview
-                
-                # Vérification
-                start = buffer.get_start_iter()
-                end = buffer.get_end_iter()
-                actual_text = buffer.get_text(start, end, False)
-                self.debug_print(f"Texte ajouté au TextView existant. Buffer contient maintenant {len(actual_text)} caractères")
-                
-                last_textview.queue_draw()
-                return True
-            except Exception as e:
-                self.debug_print(f"Erreur lors de l'ajout au TextView existant: {e}")
-                return False
+        if self.item is None:
+            return
+        if not GLib.main_context_default().is_owner():
+            GLib.idle_add(self.item.append_text, additional_text)
         else:
-            self.debug_print("Aucun TextView existant trouvé")
-            return False
-    
-    def _rebuild_content(self, full_text: str) -> None:
-        """Reconstruit le contenu complet seulement quand nécessaire."""
-        self.debug_print("Reconstruction complète du contenu")
-        
-        # Réinitialiser les références
-        self._last_textview = None
-        self._executed_blocks.clear()
-        
-        # Vider le conteneur
-        child = self.content_container.get_first_child()
-        while child:
-            next_child = child.get_next_sibling()
-            self.content_container.remove(child)
-            child = next_child
-        
-        # Reconstruire
-        self.process_and_display_content(full_text)
+            self.item.append_text(additional_text)
     
     def get_current_displayed_text(self) -> str:
-        """Récupère le texte actuellement affiché."""
-        full_text = ""
-        child = self.content_container.get_first_child()
-        
-        while child:
-            if isinstance(child, Gtk.TextView):
-                buffer = child.get_buffer()
-                start = buffer.get_start_iter()
-                end = buffer.get_end_iter()
-                text_content = buffer.get_text(start, end, False)
-                full_text += text_content
-                self.debug_print(f"TextView lu: {len(text_content)} caractères")
-            elif isinstance(child, Gtk.Box):
-                # Chercher le TextView/SourceView dans le bloc de code
-                code_child = child.get_first_child()
-                while code_child:
-                    if isinstance(code_child, (Gtk.TextView, GtkSource.View)):
-                        buffer = code_child.get_buffer()
-                        start = buffer.get_start_iter()
-                        end = buffer.get_end_iter()
-                        code_text = buffer.get_text(start, end, False)
-                        # Reconstituer le bloc de code avec les marqueurs ```
-                        full_text += f"```\n{code_text}\n```"
-                        break
-                    code_child = code_child.get_next_sibling()
-            
-            child = child.get_next_sibling()
-        
-        self.debug_print(f"Texte total récupéré: {len(full_text)} caractères")
-        return full_text
+        """Récupère le texte brut du message, blocs de code et langages compris."""
+        return self.item.text if self.item else ""
 
     def get_current_text(self) -> str:
         """Récupère le texte complet actuellement affiché."""
         return self.get_current_displayed_text()
     
-    def finalize_streaming(self) -> None:
-        """Finalise le streaming en reformatant le contenu final."""
+    def finalize_streaming(self) -> bool:
+        """Finalise le streaming : traite la dernière ligne retenue et ferme un bloc resté ouvert."""
         self.debug_print("Finalisation du streaming")
-        try:
-            current_text = self.get_current_displayed_text()
-            if "```" in current_text:
-                self.debug_print("Blocs de code détectés, reformatage final")
-                self._rebuild_content(current_text)
-            else:
-                self.debug_print("Pas de blocs de code, pas de reformatage nécessaire")
-        except Exception as e:
-            self.debug_print(f"Erreur lors de la finalisation: {e}")
+        if self.item is not None and self.item.streaming:
+            self.item.finish_streaming()
+        return False  # N'exécuter qu'une fois via GLib.idle_add
 
     def extract_docstring(self, text: str) -> list[tuple[str, str]]:
-        """Extrait tous les blocs de texte situés entre ``` dans une chaîne donnée."""
-        pattern = r"```(\w*)\n(.*?)```"
-        blocks = re.findall(pattern, text, re.DOTALL)
-        
-        processed_blocks = []
-        for lang, code in blocks:
-            code = code.strip()
-            if not code:
-                continue
-                
-            if not lang:
-                detected_lang = self._detect_language(code)
-                self.debug_print(f"Langage détecté: {detected_lang}")
-                lang = detected_lang
-            
-            processed_blocks.append((code, lang))
-        
-        return processed_blocks
+        """Extrait tous les blocs de code d'une chaîne donnée avec leur langage."""
+        return [
+            (code, lang)
+            for kind, code, lang in self.split_text_with_code_blocks(text)
+            if kind == 'code' and code.strip()
+        ]
 
     def _detect_language(self, code: str) -> str:
-        """Détecte le langage de programmation à partir du contenu du code."""
-        indicators = {
-            'python': [
-                'import ', 'from ', 'def ', 'class ', 'print(', 'return ',
-                'if __name__ == "__main__":', '# ', 'else:', 'elif ', 'try:',
-                'except:', 'finally:', 'with ', 'as ', 'lambda ', 'yield ',
-                'range(', 'len(', 'str(', 'int(', 'list(', 'dict(',
-            ],
-            'javascript': [
-                'function ', 'var ', 'let ', 'const ', 'console.log(',
-                '=>', 'document.', 'window.', '$(', 'require(', 'module.exports',
-                'async ', 'await ', '.then(', '.catch(', 'JSON.', 'Array.',
-            ],
-            'shell': [
-                '#!/bin/bash', '#!/bin/sh', 'mkdir ', 'cd ', 'ls ', 'echo ',
-                'sudo ', 'apt ', 'yum ', 'chmod ', 'chown ', 'grep ', 'awk ',
-                'sed ', 'curl ', 'wget ', 'export ', '$1', '$2', '${', 'fi',
-                'touch ', 'rm ', 'cp ', 'mv ', 'cat ', 'head ', 'tail ',
-            ],
-        }
-        
-        code_lower = code.lower()
-        scores = {lang: 0 for lang in indicators}
-        
-        for lang, patterns in indicators.items():
-            for pattern in patterns:
-                pattern_lower = pattern.lower()
-                count = code_lower.count(pattern_lower)
-                scores[lang] += count
-        
-        if any(scores.values()):
-            best_lang = max(scores.items(), key=lambda x: x[1])
-            language = best_lang[0]
-            self.debug_print(f"Langage détecté: {language}")
-            return language
-        
-        return 'text'
+        """Détecte le langage de programmation à partir du contenu du code (résultat mis en cache)."""
+        language = classify(code)
+        self.debug_print(f"Langage détecté: {language}")
+        return language
 
     # CORRECTION PRINCIPALE: Méthode execute_shell_command complètement refaite
     def execute_shell_command(self, commands: typing.Union[str, list[str]]) -> list[str]:
@@ -542,8 +692,11 @@ class Message_Widget(Gtk.Box):
             self.debug_print("Aucune commande valide à exécuter")
             return ["Aucune commande valide"]
         
-        outputs = []
-        
+        session = self._shell_session()
+        if session is not None:
+            # La session conserve le répertoire courant : les commandes s'y suivent une à une
+            return self._execute_individual_commands(command_list, session)
+
         # Détecter si on a besoin d'exécuter en séquence (avec cd)
         has_cd_command = any(cmd.strip().startswith('cd ') for cmd in command_list)
         
@@ -584,71 +737,49 @@ class Message_Widget(Gtk.Box):
 
     def _execute_sequential_commands(self, commands: list[str]) -> list[str]:
         """Exécute les commandes en séquence dans le même processus bash."""
+        # Combiner toutes les commandes avec &&
+        combined_command = " && ".join(commands)
+        self.debug_print(f"Exécution séquentielle: {combined_command}")
+
+        execution = Shell_Executor.get_default().run(combined_command)
         try:
-            # Combiner toutes les commandes avec &&
-            combined_command = " && ".join(commands)
-            
-            self.debug_print(f"Exécution séquentielle: {combined_command}")
-            
-            # CORRECTION: Passer la commande comme un seul argument string
-            host_command = ["flatpak-spawn", "--host", "bash", "-c", combined_command]
-            
-            result = subprocess.run(
-                host_command,
-                shell=False,
-                text=True,
-                capture_output=True,
-                check=False,
-                timeout=60
-            )
-            
-            if result.returncode == 0:
-                output = result.stdout.strip()
-                return [output if output else "Commandes exécutées avec succès"]
-            else:
-                error_msg = result.stderr.strip()
-                return [f"Erreur lors de l'exécution séquentielle: {error_msg}"]
-                
-        except Exception as e:
-            return [f"Exception lors de l'exécution séquentielle: {str(e)}"]
+            returncode = execution.wait(SEQUENTIAL_TIMEOUT)
+        except TimeoutError:
+            execution.cancel()
+            return ["Timeout lors de l'exécution séquentielle"]
+
+        output = execution.output.strip()
+        if returncode == 0:
+            return [output if output else "Commandes exécutées avec succès"]
+        return [f"Erreur lors de l'exécution séquentielle: {output}"]
 
-    def _execute_individual_commands(self, commands: list[str]) -> list[str]:
-        """Exécute chaque commande individuellement via bash."""
+    def _execute_individual_commands(self, commands: list[str], session=None) -> list[str]:
+        """
+        Exécute chaque commande séparément, dans la session shell persistante donnée
+        ou chacune dans son propre processus bash.
+        Une commande n'est soumise à l'exécuteur qu'une fois la précédente terminée.
+        """
+        executor = Shell_Executor.get_default()
         outputs = []
-        
         for command in commands:
+            self.debug_print(f"Exécution individuelle: '{command}'")
+            execution = executor.run(command, session=session)
             try:
-                self.debug_print(f"Exécution individuelle: '{command}'")
-                
-                # CORRECTION: Passer la commande comme un seul argument string
-                # PAS comme une liste de caractères !
-                host_command = ["flatpak-spawn", "--host", "bash", "-c", command]
-                
-                result = subprocess.run(
-                    host_command,
-                    shell=False,
-                    text=True,
-                    capture_output=True,
-                    check=False,
-                    timeout=30
-                )
-                
-                self._debug_print("retour du code commande : ", result.returncode)
-                
-                if result.returncode == 0:
-                    output = result.stdout.strip()
-                    self.debug_print(f"Succès: '{output}'")
-                    outputs.append(output if output else "Commande exécutée avec succès (pas de sortie)")
-                else:
-                    error_msg = result.stderr.strip()
-                    self.debug_print(f"Erreur (code {result.returncode}): {error_msg}")
-                    outputs.append(f"Erreur (code {result.returncode}): {error_msg}")
-                    
-            except subprocess.TimeoutExpired:
-                outputs.append(f"Timeout lors de l'exécution de '{command}'")
-            except Exception as e:
-                outputs.append(f"Exception lors de l'exécution de '{command}': {str(e)}")
-        
+                returncode = execution.wait(COMMAND_TIMEOUT)
+            except TimeoutError:
+                execution.cancel()
+                outputs.append(f"Timeout lors de l'exécution de '{execution.command}'")
+                continue
+
+            self.debug_print(f"retour du code commande : {returncode}")
+            output = execution.output.strip()
+            if returncode == 0:
+                self.debug_print(f"Succès: '{output}'")
+                outputs.append(output if output else "Commande exécutée avec succès (pas de sortie)")
+            else:
+                self.debug_print(f"Erreur (code {returncode}): {output}")
+                outputs.append(f"Erreur (code {returncode}): {output}")
+
         return outputs
 
     def get_message_id(self) -> str:
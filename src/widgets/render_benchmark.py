@@ -0,0 +1,121 @@
+import gi, sys, time
+gi.require_version('Gtk', '4.0')
+gi.require_version('GtkSource', '5')
+from gi.repository import Gtk, Gdk, GLib, GtkSource
+from .render_context import Render_Context, MESSAGE_CSS, LANGUAGE_IDS # type: ignore
+from .message_widget import Message_Widget # type: ignore
+
+# Nombres de messages affichés pour chaque mesure
+MESSAGE_COUNTS = (10, 100, 500)
+
+# Message type : de la prose et deux blocs de code (coloration et bouton d'exécution)
+SAMPLE_MESSAGE = """Voici comment lister les fichiers **Python** d'un dossier :
+
+```python
+import os
+
+for name in sorted(os.listdir('.')):
+    if name.endswith('.py'):
+        print(name)
+```
+
+Ou depuis le terminal :
+
+```bash
+ls -la *.py | wc -l
+```
+"""
+
+
+class _Legacy_Context(Render_Context):
+    """
+    Reproduit le rendu d'avant le contexte partagé : un CssProvider ajouté à l'affichage
+    par widget, et des gestionnaires GtkSourceView créés pour chaque bloc de code.
+    """
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.providers = []
+
+    def ensure_css(self) -> None:
+        css_provider = Gtk.CssProvider()
+        css_provider.load_from_data(MESSAGE_CSS)
+        Gtk.StyleContext.add_provider_for_display(
+            Gdk.Display.get_default(), css_provider, Gtk.STYLE_PROVIDER_PRIORITY_USER
+        )
+        self.providers.append(css_provider)
+
+    def get_language(self, language: str):
+        return GtkSource.LanguageManager().get_language(LANGUAGE_IDS.get(language, language))
+
+    def get_style_scheme(self):
+        return GtkSource.StyleSchemeManager().get_scheme('Adwaita-dark')
+
+    def remove_css(self) -> None:
+        for css_provider in self.providers:
+            Gtk.StyleContext.remove_provider_for_display(Gdk.Display.get_default(), css_provider)
+        self.providers.clear()
+
+
+def _wait_for_frame(window: Gtk.Window) -> None:
+    """Itère la boucle principale jusqu'à ce que la fenêtre ait peint une nouvelle image."""
+    painted = []
+    clock = window.get_frame_clock()
+    handler = clock.connect('after-paint', lambda clock: painted.append(True))
+    window.queue_draw()
+    context = GLib.MainContext.default()
+    while not painted:
+        context.iteration(True)
+    clock.disconnect(handler)
+
+
+def measure(window: Gtk.Window, box: Gtk.Box, count: int, context: Render_Context) -> tuple[float, float, float]:
+    """
+    Affiche count messages rendus avec un contexte donné et mesure le rendu.
+    Returns:
+        tuple: Les temps en millisecondes de la création d'un message (avec ses blocs de code),
+        de la première image et d'un recalcul des styles de tous les messages.
+    """
+    Render_Context._default = context
+
+    start = time.perf_counter()
+    widgets = [Message_Widget(SAMPLE_MESSAGE, user=False, message_id=str(i)) for i in range(count)]
+    created = time.perf_counter()
+    for widget in widgets:
+        box.append(widget)
+    _wait_for_frame(window)
+    shown = time.perf_counter()
+
+    # Une classe ajoutée à la fenêtre invalide le style de tous ses descendants
+    window.add_css_class('render-benchmark')
+    _wait_for_frame(window)
+    restyled = time.perf_counter()
+    window.remove_css_class('render-benchmark')
+
+    for widget in widgets:
+        box.remove(widget)
+    if isinstance(context, _Legacy_Context):
+        context.remove_css()
+    _wait_for_frame(window)
+    return (created - start) * 1000 / count, (shown - created) * 1000, (restyled - shown) * 1000
+
+
+def benchmark(counts: tuple[int, ...] = MESSAGE_COUNTS) -> None:
+    """Compare, pour chaque nombre de messages, le rendu avec et sans le contexte partagé."""
+    box = Gtk.Box(orientation=Gtk.Orientation.VERTICAL)
+    scrolled = Gtk.ScrolledWindow(child=box)
+    window = Gtk.Window(child=scrolled, default_width=900, default_height=700)
+    window.present()
+    _wait_for_frame(window)
+
+    print(f"{'messages':>8} {'contexte':>9} {'création/message':>17} {'première image':>15} {'recalcul styles':>16}")
+    shared = Render_Context()
+    for count in counts:
+        for label, context in (('ancien', _Legacy_Context()), ('partagé', shared)):
+            per_message, first_frame, restyle = measure(window, box, count, context)
+            print(f"{count:>8} {label:>9} {per_message:>14.2f} ms {first_frame:>12.0f} ms {restyle:>13.0f} ms")
+    window.destroy()
+
+
+if __name__ == "__main__":
+    benchmark(tuple(int(arg) for arg in sys.argv[1:]) or MESSAGE_COUNTS)
@@ -0,0 +1,146 @@
+import gi
+gi.require_version('Gtk', '4.0')
+gi.require_version('GtkSource', '5')
+from gi.repository import Gtk, Gdk, GtkSource, Pango
+from typing import Optional
+
+# Styles communs à tous les messages, installés une seule fois sur l'affichage
+MESSAGE_CSS = b"""
+.box_message {
+    border-radius: 10px;
+    box-shadow: 0px 2px 5px rgba(0, 0, 0, 0.1);
+    padding: 10px;
+}
+
+.message-textview {
+    background: transparent;
+    color: inherit;
+    min-height: 25px;
+}
+
+.code-block {
+    background: #2d3748;
+    border-radius: 5px;
+    padding: 10px;
+    margin: 5px 0;
+    font-family: 'Courier New', monospace;
+}
+
+.language-label {
+    background: #4a5568;
+    color: white;
+    padding: 2px 8px;
+    border-radius: 3px;
+    font-size: 12px;
+    font-weight: bold;
+}
+
+.shell-output {
+    background: #1a202c;
+    border-radius: 3px;
+    padding: 6px;
+}
+"""
+
+# Correspondance entre les noms de langages courants et les identifiants GtkSourceView
+LANGUAGE_IDS = {
+    'python': 'python3',
+    'py': 'python3',
+    'javascript': 'js',
+    'java': 'java',
+    'c': 'c',
+    'cpp': 'cpp',
+    'c++': 'cpp',
+    'csharp': 'c-sharp',
+    'cs': 'c-sharp',
+    'ts': 'typescript',
+    'rs': 'rust',
+    'rb': 'ruby',
+    'yml': 'yaml',
+    'shell': 'sh',
+    'bash': 'sh',
+    'zsh': 'sh',
+    'console': 'sh',
+    'html': 'html',
+    'css': 'css',
+    'sql': 'sql'
+}
+
+# Tags de mise en forme du texte des messages (noms produits par markdown_stream.parse_inline,
+# et 'error' pour la sortie d'erreur des commandes exécutées)
+TEXT_TAGS = {
+    'bold': {'weight': Pango.Weight.BOLD},
+    'italic': {'style': Pango.Style.ITALIC},
+    'code': {'family': 'monospace', 'background': 'rgba(127, 127, 127, 0.2)'},
+    'h1': {'weight': Pango.Weight.BOLD, 'scale': 1.6, 'pixels-above-lines': 8},
+    'h2': {'weight': Pango.Weight.BOLD, 'scale': 1.4, 'pixels-above-lines': 6},
+    'h3': {'weight': Pango.Weight.BOLD, 'scale': 1.2, 'pixels-above-lines': 4},
+    'list': {'left-margin': 15},
+    'quote': {'style': Pango.Style.ITALIC, 'left-margin': 15, 'foreground': '#888888'},
+    'error': {'foreground': '#f56565'},
+}
+
+
+class Render_Context:
+    """
+    Ressources de rendu partagées par tous les widgets de message du processus.
+
+    Le CSS est installé une seule fois sur l'affichage, les gestionnaires de langages
+    et de thèmes de GtkSourceView sont ceux par défaut, et les recherches de langage
+    sont mises en cache.
+    """
+
+    _default = None
+
+    @classmethod
+    def get_default(cls) -> "Render_Context":
+        """Retourne le contexte de rendu unique du processus."""
+        if cls._default is None:
+            cls._default = cls()
+        return cls._default
+
+    def __init__(self) -> None:
+        self.language_manager = GtkSource.LanguageManager.get_default()
+        self.scheme_manager = GtkSource.StyleSchemeManager.get_default()
+        self._languages = {}
+        self._style_scheme = None
+        self._tag_table = None
+        self._css_displays = set()
+
+    def ensure_css(self) -> None:
+        """Installe le CSS des messages sur l'affichage par défaut s'il ne l'est pas déjà."""
+        display = Gdk.Display.get_default()
+        if display is None or display in self._css_displays:
+            return
+        css_provider = Gtk.CssProvider()
+        css_provider.load_from_data(MESSAGE_CSS)
+        Gtk.StyleContext.add_provider_for_display(
+            display,
+            css_provider,
+            Gtk.STYLE_PROVIDER_PRIORITY_USER
+        )
+        self._css_displays.add(display)
+
+    def get_language(self, language: str) -> Optional[GtkSource.Language]:
+        """Retourne le langage GtkSourceView correspondant à un nom, ou None (résultat mis en cache)."""
+        if language not in self._languages:
+            gtk_lang_id = LANGUAGE_IDS.get(language, language)
+            self._languages[language] = self.language_manager.get_language(gtk_lang_id) if gtk_lang_id else None
+        return self._languages[language]
+
+    def get_style_scheme(self) -> Optional[GtkSource.StyleScheme]:
+        """Retourne le thème sombre appliqué aux blocs de code."""
+        if self._style_scheme is None:
+            self._style_scheme = self.scheme_manager.get_scheme('Adwaita-dark')
+        return self._style_scheme
+
+    def get_tag_table(self) -> Gtk.TextTagTable:
+        """Retourne la table de tags partagée par les buffers de tous les messages."""
+        if self._tag_table is None:
+            self._tag_table = Gtk.TextTagTable()
+            for name, properties in TEXT_TAGS.items():
+                tag = Gtk.TextTag(name=name)
+                for key, value in properties.items():
+                    tag.set_property(key, value)
+                self._tag_table.add(tag)
+        return self._tag_table
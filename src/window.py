@@ -19,13 +19,81 @@
 
 from typing import List, Optional, Dict, Union
 
+import os
 import threading
 import time
-from gi.repository import Adw, Gtk, Gdk, GLib
+from collections import OrderedDict
+from itertools import islice
+from gi.repository import Adw, Gtk, Gdk, GLib, Gio, GObject, Pango
 from .ollama_client import Ollama_client # type: ignore
 from .ollama_model import Ollama_model # type: ignore
+from .model_manager import Model_Manager, CATEGORY_TITLES # type: ignore
+from .catalogue_index import describe # type: ignore
+from .hardware_planner import Hardware_Planner, DEFAULT_NUM_CTX # type: ignore
 from .message_widget import Message_Widget # type: ignore
-from .voice_recognizer import VoiceRecognizer
+from .message_item import Message_Item # type: ignore
+from .conversation_item import Conversation_Item # type: ignore
+from .shell_executor import Shell_Executor # type: ignore
+from .image_processor import Image_Processor, Processed_Image, model_resolution # type: ignore
+from .voice_recognizer import VoiceRecognizer # type: ignore
+
+# Nombre de conversations récemment affichées dont la liste de messages est conservée
+CONVERSATION_CACHE_SIZE = 8
+# Messages les plus récents affichés dès l'ouverture d'une conversation
+INITIAL_MESSAGES = 30
+# Messages plus anciens ajoutés en tête de liste à chaque cycle d'inactivité
+LOAD_BATCH_SIZE = 200
+# Conversations importées transmises ensemble au thread principal
+IMPORT_BATCH_SIZE = 50
+# Taille d'affichage des miniatures des images jointes au message en cours de saisie
+ATTACHMENT_PREVIEW_SIZE = 48
+# Schéma GSettings de l'application
+SETTINGS_SCHEMA = 'org.descarpentries.gtk_ollama'
+# Icône et infobulle du bouton de dictée selon l'état du modèle Whisper
+SPEAK_BUTTON_STATES = {
+    'unloaded': ('audio-input-microphone-symbolic', "Dicter un message"),
+    'loading': ('content-loading-symbolic', "Chargement du modèle de reconnaissance vocale…"),
+    'ready': ('audio-input-microphone-symbolic', "Dicter un message"),
+    'error': ('dialog-warning-symbolic', "Le modèle de reconnaissance vocale n'a pas pu être chargé"),
+}
+# Options de la recherche dans le catalogue des modèles : (libellé, valeur)
+MODEL_SORT_OPTIONS = (
+    ("Pertinence", 'relevance'),
+    ("Popularité", 'pulls'),
+    ("Taille", 'size'),
+    ("Mise à jour", 'updated'),
+)
+MODEL_MODALITY_FILTERS = (
+    ("Toute entrée", None),
+    ("Texte", 'text'),
+    ("Image", 'image'),
+)
+# Icône des versions d'un modèle selon leur adéquation à la machine
+FIT_ICONS = {
+    'fits': 'emblem-ok-symbolic',
+    'tight': 'dialog-information-symbolic',
+    'swap': 'dialog-warning-symbolic',
+}
+# Taille maximale, en milliards de paramètres, d'au moins une version du modèle
+MODEL_SIZE_FILTERS = (
+    ("Toute taille", None),
+    ("≤ 4B", 4),
+    ("≤ 8B", 8),
+    ("≤ 14B", 14),
+    ("≤ 32B", 32),
+    ("≤ 70B", 70),
+)
+
+
+class _Attachment:
+    """Image jointe au message en cours de saisie."""
+    __slots__ = ('path', 'widget', 'picture', 'image')
+
+    def __init__(self, path: str, widget: Gtk.Widget, picture: Gtk.Picture) -> None:
+        self.path = path
+        self.widget = widget
+        self.picture = picture
+        self.image = None   # Processed_Image, une fois le traitement terminé
 
 
 @Gtk.Template(resource_path="/org/descarpentries/gtk_ollama/window.ui")
@@ -45,9 +113,10 @@ class GtkOllamaWindow(Adw.ApplicationWindow):
     scrolled_messages: Gtk.ScrolledWindow = Gtk.Template.Child()
     combo_models_list: Gtk.ComboBoxText = Gtk.Template.Child()
     user_entry: Gtk.TextView = Gtk.Template.Child()
+    attachments_box: Gtk.Box = Gtk.Template.Child()
     system_entry: Gtk.TextView = Gtk.Template.Child()
-    messages_list: Gtk.ListBox = Gtk.Template.Child()
-    conversations_list: Gtk.ListBox = Gtk.Template.Child()
+    messages_list: Gtk.ListView = Gtk.Template.Child()
+    conversations_list: Gtk.ListView = Gtk.Template.Child()
     toast_overlay: Adw.ToastOverlay = Gtk.Template.Child()
     conv_title: Gtk.Label = Gtk.Template.Child()
     edit_title_button: Gtk.Button = Gtk.Template.Child()
@@ -57,9 +126,14 @@ class GtkOllamaWindow(Adw.ApplicationWindow):
     temp_spin: Adw.SpinRow = Gtk.Template.Child()
     custom_option_modal: Gtk.Dialog = Gtk.Template.Child()
     sendSpinner: Adw.Spinner = Gtk.Template.Child()
+    speakButton: Gtk.Button = Gtk.Template.Child()
 
     # Déclarations des enfants de l'interdace secondaire
-    model_find:Gtk.ListBox = Gtk.Template.Child()
+    model_find: Gtk.ListView = Gtk.Template.Child()
+    model_search_entry: Gtk.SearchEntry = Gtk.Template.Child()
+    model_sort_dropdown: Gtk.DropDown = Gtk.Template.Child()
+    model_modality_dropdown: Gtk.DropDown = Gtk.Template.Child()
+    model_size_dropdown: Gtk.DropDown = Gtk.Template.Child()
     model_infos:Adw.PreferencesGroup = Gtk.Template.Child()
     stack_model_buttons_options:Gtk.Stack = Gtk.Template.Child()
     local_buttons_options: Gtk.Box = Gtk.Template.Child()
@@ -68,10 +142,13 @@ class GtkOllamaWindow(Adw.ApplicationWindow):
     
 
     # Déclarations des variables transversales
-    toggle_buttons_conv: List[Gtk.ToggleButton] = []
-    toggle_buttons_models: List[Gtk.ToggleButton] = []
-    active_toggle_button: Optional[Gtk.ToggleButton] = None
+    # Model_Item du modèle sélectionné, ou Conversation_Item de la conversation affichée
+    active_toggle_button: Optional[GObject.Object] = None
     model_progress_bars: dict[str, Gtk.ProgressBar] = {}
+    # Version choisie dans les informations du modèle distant affiché (None : version par défaut)
+    selected_version: Optional[str] = None
+    # Message modifié en attente d'envoi : (conversation, parent à partir duquel créer la branche)
+    _branch_from: Optional[tuple[int, Optional[int]]] = None
     system_entry_await = ""
 
     def __init__(self, **kwargs: Dict[str, Union[str, int, float]]) -> None:
@@ -83,12 +160,20 @@ class GtkOllamaWindow(Adw.ApplicationWindow):
         self.action_rows = []
         self.ollama_model = Ollama_model()
         self.ollama_client = Ollama_client()
-        self.voice_recognizer = VoiceRecognizer(modele="small")
+        self.model_manager = Model_Manager(self.ollama_client)
+        self.voice_recognizer = VoiceRecognizer()
         self.ollama_model.load_from_file()
         self.message_id_counter = 0
-        self.downloading_models = None
+        self._attachments = []
+        # Vider le champ de saisie abandonne la modification d'un message
+        self.user_entry.get_buffer().connect("changed", self._on_user_entry_changed)
 
         self.apply_styles()
+        self._setup_messages_list()
+        self._setup_conversations_list()
+        self._setup_models_view()
+        self._setup_image_drop()
+        self._setup_voice_input()
         self._initialize_ui()
 
     def apply_styles(self) -> None:
@@ -101,16 +186,67 @@ class GtkOllamaWindow(Adw.ApplicationWindow):
             Gtk.STYLE_PROVIDER_PRIORITY_APPLICATION,
         )
 
+    def _setup_messages_list(self) -> None:
+        """
+        Associe la liste des messages à son modèle : seules les lignes visibles
+        possèdent un Message_Widget, recyclé d'un message à l'autre au défilement.
+        """
+        self._conversation_stores = OrderedDict()  # id de conversation -> Gio.ListStore
+        factory = Gtk.SignalListItemFactory()
+        factory.connect("setup", self._on_message_setup)
+        factory.connect("bind", self._on_message_bind)
+        factory.connect("unbind", self._on_message_unbind)
+        self.messages_list.set_factory(factory)
+        self._clear_messages()
+
+    def _set_messages_store(self, store: Gio.ListStore) -> None:
+        """Affiche une liste de messages."""
+        self.messages_store = store
+        self.messages_list.set_model(Gtk.NoSelection(model=store))
+
+    def _on_message_setup(self, factory: Gtk.SignalListItemFactory, list_item: Gtk.ListItem) -> None:
+        list_item.set_activatable(False)
+        list_item.set_child(Message_Widget(
+            delete_callback=self.delete_message,
+            edit_callback=self.edit_message,
+            branch_callback=self.switch_message_branch,
+            session_callback=self._get_shell_session,
+        ))
+
+    def _get_shell_session(self) -> Optional[int]:
+        """Retourne la clé de la session shell de la conversation affichée."""
+        if isinstance(self.active_toggle_button, Conversation_Item):
+            return self.active_toggle_button.conversation_id
+        return None
+
+    def _on_message_bind(self, factory: Gtk.SignalListItemFactory, list_item: Gtk.ListItem) -> None:
+        list_item.get_child().bind(list_item.get_item())
+
+    def _on_message_unbind(self, factory: Gtk.SignalListItemFactory, list_item: Gtk.ListItem) -> None:
+        list_item.get_child().unbind()
+
     def _initialize_ui(self) -> None:
         """Initialize les éléments de l'interface"""
         self._populate_models_list()
         self._load_models_find()
         self._load_conversations()
-
-    def _populate_models_list(self) -> None:
-        """Remplit le GtkComboBoxText avec les noms des modèles."""
-        for name in self.ollama_client.get_name_model():
+        if self.ollama_model.read_only:
+            toast = Adw.Toast(title="Sauvegarde illisible : les conversations ne seront pas enregistrées")
+            toast.set_timeout(0)
+            self.toast_overlay.add_toast(toast)
+
+    def _populate_models_list(self, *args) -> None:
+        """Remplit le GtkComboBoxText avec les noms des modèles locaux connus, en conservant la sélection."""
+        active = self.combo_models_list.get_active_text()
+        self.combo_models_list.remove_all()
+        for index, name in enumerate(self.model_manager.local_names):
             self.combo_models_list.append_text(name)
+            if name == active:
+                self.combo_models_list.set_active(index)
+
+    def _on_user_entry_changed(self, buffer: Gtk.TextBuffer) -> None:
+        if self._branch_from is not None and buffer.get_char_count() == 0:
+            self._branch_from = None
 
     def _get_user_input(self) -> str:
         """Récupère la saisie de l'utilisateur et efface le champ."""
@@ -126,14 +262,156 @@ class GtkOllamaWindow(Adw.ApplicationWindow):
         if not model:
             self.show_toast("Aucun modèle actif")
             return
+        if any(attachment.image is None for attachment in self._attachments):
+            self.show_toast("Images en cours de préparation")
+            return
+        if self._attachments and not self.model_manager.supports_images(model):
+            self.show_toast("Le modèle actif n'accepte pas les images")
+            return
+        branch_from = self._branch_from
         user_input = self._get_user_input()
         if not user_input:
             self.show_toast("Saisie utilisateur vide")
             return
 
-        self.add_message(user_input, True)
+        # Message modifié : le fil actif ne s'arrête avant l'original qu'à l'envoi de la nouvelle version
+        if branch_from is not None and isinstance(self.active_toggle_button, Conversation_Item):
+            conv_id, parent = branch_from
+            if conv_id == self.active_toggle_button.conversation_id:
+                self.ollama_model.set_active_message(conv_id, parent)
+                self.load_conversation_to_chat(self.ollama_model.get_conversation(conv_id))
+
+        images = self._take_attachments()
+        self.add_message(user_input, True, images)
         self.scroll_to_bottom()
-        GLib.Thread.new("fetch_response", self.fetch_response, model, user_input)
+        GLib.Thread.new("fetch_response", self.fetch_response, model, user_input, images)
+
+    @Gtk.Template.Callback()
+    def on_attach_button_clicked(self, button: Gtk.Button) -> None:
+        """Ouvre la sélection des images à joindre au message."""
+        image_filter = Gtk.FileFilter()
+        image_filter.set_name("Images")
+        image_filter.add_pixbuf_formats()
+
+        dialog = Gtk.FileChooserDialog(
+            title="Joindre des images",
+            transient_for=self,
+            modal=True,
+        )
+        dialog.set_action(Gtk.FileChooserAction.OPEN)
+        dialog.set_select_multiple(True)
+        dialog.add_filter(image_filter)
+        dialog.add_buttons(
+            "_Annuler", Gtk.ResponseType.CANCEL,
+            "_Ouvrir", Gtk.ResponseType.OK
+        )
+        dialog.connect("response", self._on_attach_dialog_response)
+        dialog.show()
+
+    def _on_attach_dialog_response(self, dialog: Gtk.FileChooserDialog, response: int) -> None:
+        if response == Gtk.ResponseType.OK:
+            for file in dialog.get_files():
+                if file.get_path():
+                    self._attach_image(file.get_path())
+        dialog.close()
+
+    def _setup_image_drop(self) -> None:
+        """Permet de joindre des images en les déposant sur le champ de saisie."""
+        drop_target = Gtk.DropTarget.new(Gdk.FileList, Gdk.DragAction.COPY)
+        drop_target.connect("drop", self._on_image_drop)
+        self.user_entry.add_controller(drop_target)
+
+    def _setup_voice_input(self) -> None:
+        """
+        Affiche l'état du modèle de reconnaissance vocale sur le bouton de dictée, et commence
+        à le charger dès que le pointeur ou le focus arrive sur ce bouton.
+        """
+        whisper = self.voice_recognizer.whisper
+        source = Gio.SettingsSchemaSource.get_default()
+        if source is not None and source.lookup(SETTINGS_SCHEMA, True) is not None:
+            self.settings = Gio.Settings.new(SETTINGS_SCHEMA)
+            self.settings.bind('whisper-idle-timeout', whisper, 'idle-timeout', Gio.SettingsBindFlags.GET)
+
+        motion = Gtk.EventControllerMotion()
+        motion.connect("enter", lambda *args: whisper.warm_up())
+        self.speakButton.add_controller(motion)
+        focus = Gtk.EventControllerFocus()
+        focus.connect("enter", lambda *args: whisper.warm_up())
+        self.speakButton.add_controller(focus)
+
+        whisper.connect("notify::state", self._update_speak_button)
+        self._update_speak_button(whisper)
+
+    def _update_speak_button(self, whisper, *args) -> None:
+        icon_name, tooltip = SPEAK_BUTTON_STATES[whisper.state]
+        self.speakButton.set_icon_name(icon_name)
+        self.speakButton.set_tooltip_text(tooltip)
+
+    def _on_image_drop(self, drop_target: Gtk.DropTarget, files: Gdk.FileList, x: float, y: float) -> bool:
+        paths = [file.get_path() for file in files.get_files() if file.get_path()]
+        for path in paths:
+            self._attach_image(path)
+        return bool(paths)
+
+    def _attach_image(self, path: str) -> None:
+        """
+        Joint une image au message en cours de saisie. Elle est décodée, réduite à la
+        résolution du modèle actif et encodée par le processeur d'images, hors du thread de l'interface.
+        """
+        picture = Gtk.Picture()
+        picture.set_size_request(ATTACHMENT_PREVIEW_SIZE, ATTACHMENT_PREVIEW_SIZE)
+        picture.set_content_fit(Gtk.ContentFit.COVER)
+        spinner = Adw.Spinner()
+        overlay = Gtk.Overlay(child=picture)
+        overlay.add_overlay(spinner)
+        overlay.set_tooltip_text(os.path.basename(path))
+
+        remove_button = Gtk.Button(icon_name="window-close-symbolic")
+        remove_button.set_has_frame(False)
+        remove_button.set_valign(Gtk.Align.START)
+        widget = Gtk.Box(spacing=0)
+        widget.append(overlay)
+        widget.append(remove_button)
+
+        attachment = _Attachment(path, widget, picture)
+        remove_button.connect("clicked", lambda btn: self._remove_attachment(attachment))
+        self._attachments.append(attachment)
+        self.attachments_box.append(widget)
+        self.attachments_box.set_visible(True)
+
+        model = self.combo_models_list.get_active_text() or ""
+        Image_Processor.get_default().process(
+            path, model_resolution(model),
+            lambda future: GLib.idle_add(self._on_attachment_processed, attachment, spinner, future),
+        )
+
+    def _on_attachment_processed(self, attachment: _Attachment, spinner: Adw.Spinner, future) -> bool:
+        """Affiche la miniature d'une image traitée ; appelé par GLib.idle_add."""
+        if attachment not in self._attachments:
+            return False
+        try:
+            attachment.image = future.result()
+        except Exception as e:
+            print(f"Erreur lors du traitement de l'image {attachment.path} : {e}")
+            self.show_toast("Image illisible")
+            self._remove_attachment(attachment)
+            return False
+        spinner.set_visible(False)
+        attachment.picture.set_paintable(attachment.image.get_texture())
+        return False
+
+    def _remove_attachment(self, attachment: _Attachment) -> None:
+        if attachment in self._attachments:
+            self._attachments.remove(attachment)
+            self.attachments_box.remove(attachment.widget)
+        self.attachments_box.set_visible(bool(self._attachments))
+
+    def _take_attachments(self) -> list[Processed_Image]:
+        """Retourne les images jointes au message envoyé et vide la zone des pièces jointes."""
+        images = [attachment.image for attachment in self._attachments]
+        for attachment in list(self._attachments):
+            self._remove_attachment(attachment)
+        return images
     
     @Gtk.Template.Callback()
     def on_speak_button_clicked(self, button: Gtk.Button) -> None:
@@ -160,25 +438,18 @@ class GtkOllamaWindow(Adw.ApplicationWindow):
     
     def delete_message(self, message_widget: Message_Widget) -> None:
         """Supprime un message de la conversation et met à jour l'interface et le fichier."""
-        # Trouver le ListBoxRow correspondant à message_widget
-        row_to_remove = None
-        for row in self.messages_list:
-            if row.get_child() == message_widget:
-                row_to_remove = row
-                break
-
-        if row_to_remove:
+        # Trouver la position du message affiché par message_widget
+        found, position = self.messages_store.find(message_widget.item) if message_widget.item else (False, 0)
+
+        if found:
             # Trouver l'ID de la conversation à partir du widget
             conv_id = self.active_toggle_button.conversation_id if self.active_toggle_button else None
 
             # Supprimer le message du modèle de données (conversation)
             self.ollama_model.delete_message_from_conversation(conv_id, message_widget.get_message_id())  # Méthode à ajouter
 
-            # Supprimer le row de la ListBox
-            self.messages_list.remove(row_to_remove)
-
-            # Sauvegarder la conversation dans le fichier
-            self.ollama_model.save_to_file()
+            # Supprimer le message de la liste (le modèle a déjà sauvegardé la conversation)
+            self.messages_store.remove(position)
 
     def on_trash_dialog_confirm(self, dialog: Adw.MessageDialog, response: str) -> None:
         """Supprime la conversation active."""
@@ -186,17 +457,22 @@ class GtkOllamaWindow(Adw.ApplicationWindow):
             conv_id = self.active_toggle_button.conversation_id if self.active_toggle_button else None
 
             self.ollama_model.delete_conversation(conv_id)
+            self._conversation_stores.pop(conv_id, None)
+            Shell_Executor.get_default().close_session(conv_id)
             self._clear_messages()
             self.conv_title.set_label("Aucune conversation en cours")
             self.active_toggle_button = None
-            self._load_conversations()
+            self._remove_conversation_row(conv_id)
 
     def on_trash_model_dialog_confirm(self, dialog: Adw.MessageDialog, response: str) -> None:
         """Supprime le modele actif """
-        model_name = self.active_toggle_button.model_data['name'] if self.active_toggle_button else "nom"
-        self.ollama_client.delete_model(model_name)
-        self.model_finds.remove_all()
-        self._load_models_find()
+        if response != "delete" or not self.active_toggle_button:
+            return
+        model_name = self.active_toggle_button.data['name']
+        self.model_manager.delete(
+            model_name,
+            lambda success: self.show_toast(f"{model_name} supprimé" if success else "Échec de la suppression"),
+        )
 
     @Gtk.Template.Callback()
     def on_edit_title_button_clicked(self, button: Gtk.Button) -> None:
@@ -212,7 +488,7 @@ class GtkOllamaWindow(Adw.ApplicationWindow):
         title = self.edit_title_label.get_text()
         conversation = self.ollama_model.get_conversation(conv_id)
         conversation['title'] = title
-        self._load_conversations()
+        self._refresh_conversation(conversation)
 
     @Gtk.Template.Callback()
     def on_title_edit_change(self, editableLabel: Gtk.EditableLabel, param) -> None:
@@ -222,19 +498,81 @@ class GtkOllamaWindow(Adw.ApplicationWindow):
             conversation = self.ollama_model.get_conversation(conv_id)
             if conversation:
                 conversation['title'] = title
-                self._load_conversations()
+                self._refresh_conversation(conversation)
                 self.ollama_model.save_to_file()
 
             self.edit_title_button.set_visible(True)
             self.edit_title_label.set_visible(False)
 
-    def _update_conversation(self, conv_id: str, user_input: str, response: str) -> None:
+    def _update_conversation(self, conv_id: str, user_input: Optional[str], response: str) -> None:
         """Met à jour une conversation existante."""
         self.ollama_model.update_conversation(conv_id, user_input, response)
-        self._load_conversations()
+        self._sync_last_messages(conv_id, 1 if user_input is None else 2)
+        conversation = self.ollama_model.get_conversation(conv_id)
+        if conversation:
+            self._refresh_conversation(conversation)
         self.ollama_model.save_to_file()
 
-    def _create_new_conversation(self, model: str, user_input: str) -> None:
+    def _sync_last_messages(self, conv_id: int, count: int) -> None:
+        """
+        Associe aux derniers widgets affichés les IDs des messages qui viennent d'être enregistrés.
+        Si ces messages ouvrent une nouvelle branche, la conversation est réaffichée pour montrer la navigation.
+        """
+        conversation = self.ollama_model.get_conversation(conv_id)
+        store = self._conversation_stores.get(conv_id)
+        if not conversation or store is None:
+            return
+        new_messages = conversation["history"].path()[-count:]
+        if len(self.ollama_model.get_message_branches(conv_id, new_messages[0]['id'])) > 1:
+            if store is self.messages_store:
+                self.load_conversation_to_chat(conversation)
+            else:
+                # Conversation en arrière-plan : sa liste sera reconstruite à son prochain affichage
+                del self._conversation_stores[conv_id]
+            return
+
+        n_items = store.get_n_items()
+        items = [store.get_item(i) for i in range(max(n_items - count, 0), n_items)]
+        for item, message in zip(items, new_messages):
+            item.message_id = message['id']
+
+    def edit_message(self, message_widget: Message_Widget) -> None:
+        """
+        Édite un message utilisateur ou régénère une réponse en créant une nouvelle branche.
+        Le préfixe de la conversation est partagé avec la branche d'origine.
+        """
+        conv_id = self.active_toggle_button.conversation_id if self.active_toggle_button else None
+        conversation = self.ollama_model.get_conversation(conv_id)
+        message = conversation["history"].get(message_widget.get_message_id()) if conversation else None
+        if not message:
+            self.show_toast("Message introuvable")
+            return
+
+        if message_widget.user:
+            # Le fil affiché reste inchangé jusqu'à l'envoi de la version modifiée (voir on_send_button_clicked)
+            self.user_entry.get_buffer().set_text(message['content'])
+            self._branch_from = (conv_id, message['parent'])
+            self.user_entry.grab_focus()
+            self.show_toast("Envoyez le message modifié pour créer une nouvelle branche, videz le champ pour annuler")
+        else:
+            # Régénération immédiate : le fil actif s'arrête juste avant la réponse
+            self.ollama_model.set_active_message(conv_id, message['parent'])
+            self.load_conversation_to_chat(conversation)
+            model = self.combo_models_list.get_active_text() or conversation.get("model")
+            GLib.Thread.new("fetch_response", self.fetch_response, model, None)
+
+    def switch_message_branch(self, message_widget: Message_Widget, step: int) -> None:
+        """Affiche la version précédente ou suivante d'un message."""
+        conv_id = self.active_toggle_button.conversation_id if self.active_toggle_button else None
+        branches = self.ollama_model.get_message_branches(conv_id, message_widget.get_message_id())
+        if message_widget.get_message_id() not in branches:
+            return
+        index = branches.index(message_widget.get_message_id()) + step
+        if 0 <= index < len(branches):
+            self.ollama_model.switch_branch(conv_id, branches[index])
+            self.load_conversation_to_chat(self.ollama_model.get_conversation(conv_id))
+
+    def _create_new_conversation(self, model: str, user_input: str, images: Optional[list] = None) -> None:
         """Crée une nouvelle conversation et met à jour l'interface."""
         def show_spinner():
             self.sendSpinner.set_visible(True)
@@ -248,12 +586,9 @@ class GtkOllamaWindow(Adw.ApplicationWindow):
                 # Ajouter le message à l'interface
                 self.add_message(full_response, False)
 
-                # Recharger les conversations
-                self._load_conversations()
-
-                # Créer et activer le bouton de conversation
-                self.active_toggle_button = self._create_conversation_button(new_conv)
-                self.active_toggle_button.set_active(True)
+                # Ajouter la conversation au panneau latéral et la sélectionner
+                self._refresh_conversation(new_conv)
+                self._select_conversation(new_conv["id"])
 
                 # Sauvegarder
                 self.ollama_model.save_to_file()
@@ -273,7 +608,8 @@ class GtkOllamaWindow(Adw.ApplicationWindow):
                 model=model,
                 temp=temp,
                 conversation={"system": self.system_entry_await},
-                user_input=user_input
+                user_input=user_input,
+                images=images
             )
 
             # Ajouter la conversation au modèle avec la réponse complète
@@ -286,7 +622,7 @@ class GtkOllamaWindow(Adw.ApplicationWindow):
             print(f"Erreur _create_new_conversation: {e}")
             GLib.idle_add(hide_spinner)
 
-    def fetch_response(self, model: str, user_input: str) -> None:
+    def fetch_response(self, model: str, user_input: str, images: Optional[list] = None) -> None:
         """Récupère une réponse et met à jour l'interface en conséquence."""
         def show_spinner():
             self.sendSpinner.set_visible(True)
@@ -306,7 +642,8 @@ class GtkOllamaWindow(Adw.ApplicationWindow):
                     model=model,
                     temp=temp,
                     conversation=conversation,
-                    user_input=user_input
+                    user_input=user_input,
+                    images=images
                 )
             except Exception as e:
                 print(f"Erreur fetch_response: {e}")
@@ -315,36 +652,12 @@ class GtkOllamaWindow(Adw.ApplicationWindow):
                 GLib.idle_add(self._update_conversation, conv_id, user_input, full_response)
 
         else:
-            self._create_new_conversation(model, user_input)
+            self._create_new_conversation(model, user_input, images)
 
-    def stream_response(self, model, temp, conversation, user_input) -> str:
+    def stream_response(self, model, temp, conversation, user_input, images=None) -> str:
         """Stream response avec gestion correcte des threads GTK."""
-        temp_message = None
-        message_created = threading.Event()  # Pour synchroniser la création
-
-        def create_message():
-            nonlocal temp_message
-            try:
-                temp_message = Message_Widget(
-                    "",
-                    user=False,
-                    delete_callback=self.delete_message,
-                    message_id=self.message_id_counter + 1
-                )
-                self.messages_list.append(temp_message)
-            except Exception as e:
-                print(f"Erreur création widget: {e}")
-            finally:
-                message_created.set()  # Signaler que la création est terminée
-
-        GLib.idle_add(create_message)
-
-        # Attendre que le widget soit créé avec timeout
-        if not message_created.wait(timeout=5.0):  # Timeout de 5 secondes
-            return ""
-
-        if temp_message is None:
-            return ""
+        temp_message = Message_Item("", user=False, streaming=True)
+        GLib.idle_add(self.messages_store.append, temp_message)
 
         full_response = ""
 
@@ -353,7 +666,8 @@ class GtkOllamaWindow(Adw.ApplicationWindow):
                 model=model,
                 temp=temp,
                 conversation=conversation,
-                user_input=user_input
+                user_input=user_input,
+                images=self._encode_images(images, model)
             ):
                 safe_chunk = chunk.encode('utf-8', errors='replace').decode('utf-8')
                 full_response += safe_chunk
@@ -366,136 +680,319 @@ class GtkOllamaWindow(Adw.ApplicationWindow):
             GLib.idle_add(temp_message.append_text, f"\n[Erreur: {e}]")
 
         # Traitement final via le thread principal
-        GLib.idle_add(temp_message.extract_docstring, full_response)
+        GLib.idle_add(temp_message.finish_streaming)
         return full_response
 
-    def add_message(self, text: str, user: bool) -> None:
+    @staticmethod
+    def _encode_images(images: Optional[list], model: str) -> list[str]:
+        """
+        Retourne les images encodées à la résolution du modèle (appelé depuis le thread de la requête).
+        Une image déjà traitée à cette résolution est reprise du cache du processeur d'images.
+        """
+        processor = Image_Processor.get_default()
+        encoded = []
+        for image in images or []:
+            try:
+                encoded.append(processor.process(image.path, model_resolution(model)).result().data)
+            except Exception:
+                # Fichier déplacé depuis sa sélection : l'image déjà préparée est envoyée
+                encoded.append(image.data)
+        return encoded
+
+    def add_message(self, text: str, user: bool, images: Optional[list] = None) -> None:
         """Ajoute un message à la liste des messages."""
-        message = Message_Widget(text, user, self.delete_message, self.message_id_counter +1)
-        self.messages_list.append(message)
+        self.messages_store.append(Message_Item(text, user, images=images))
 
     def _clear_messages(self) -> None:
-        """Efface tous les messages de la liste."""
-        self.messages_list.remove_all()
+        """Affiche une liste de messages vide (les listes des conversations en cache sont conservées)."""
+        self._set_messages_store(Gio.ListStore(item_type=Message_Item))
 
-    def _load_conversations(self) -> None:
-        """Ajoute les conversations à la liste sous forme de boutons."""
-        if self.conversations_list:
-            self.toggle_buttons_conv.clear()
-            self.conversations_list.remove_all()
-            for conversation in self.ollama_model.get_all_conversations():
-                button = Gtk.ToggleButton(label=conversation["title"])
-                button.set_has_frame(False)
-                button.set_hexpand(True)
-                button.set_halign(Gtk.Align.FILL)  # Le bouton prend toute la largeur
-                
-                # Créer un conteneur pour aligner le texte à gauche
-                box = Gtk.Box(orientation=Gtk.Orientation.HORIZONTAL)
-                label = Gtk.Label(label=conversation["title"])
-                label.set_halign(Gtk.Align.START)
-                box.append(label)
-                button.set_child(box)
-                
-                button.conversation_id = conversation["id"]
-                button.connect("toggled", self.on_conversation_selected)
-                self.toggle_buttons_conv.append(button)
-
-                row = Gtk.ListBoxRow()
-                row.set_child(button)
-                self.conversations_list.set_selection_mode(Gtk.SelectionMode.NONE)
-                self.conversations_list.append(row)
+    def _setup_conversations_list(self) -> None:
+        """
+        Associe le panneau latéral à son modèle : les conversations sont triées par dernière
+        activité et regroupées par date. Seules les lignes et les en-têtes de section visibles
+        possèdent un widget, et une mise à jour ne touche que la conversation concernée.
+        """
+        self.conversations_store = Gio.ListStore(item_type=Conversation_Item)
+        self._conversation_items = {}  # id de conversation -> Conversation_Item
+        sorted_model = Gtk.SortListModel(
+            model=self.conversations_store,
+            sorter=Gtk.CustomSorter.new(self._compare_conversations, None),
+            section_sorter=Gtk.CustomSorter.new(self._compare_sections, None),
+        )
+        self.conversations_selection = Gtk.SingleSelection(model=sorted_model, autoselect=False, can_unselect=True)
+        self.conversations_selection.connect("selection-changed", self.on_conversation_selected)
+
+        factory = Gtk.SignalListItemFactory()
+        factory.connect("setup", self._on_conversation_setup)
+        factory.connect("bind", self._on_conversation_bind)
+        factory.connect("unbind", self._on_conversation_unbind)
+        header_factory = Gtk.SignalListItemFactory()
+        header_factory.connect("setup", self._on_section_setup)
+        header_factory.connect("bind", self._on_section_bind)
+
+        self.conversations_list.set_factory(factory)
+        self.conversations_list.set_header_factory(header_factory)
+        self.conversations_list.set_model(self.conversations_selection)
+
+    @staticmethod
+    def _compare_conversations(a: Conversation_Item, b: Conversation_Item, data) -> Gtk.Ordering:
+        """Les conversations les plus récentes en premier."""
+        key_a, key_b = (a.updated_at, a.conversation_id), (b.updated_at, b.conversation_id)
+        return Gtk.Ordering.from_cmpfunc((key_a < key_b) - (key_a > key_b))
+
+    @staticmethod
+    def _compare_sections(a: Conversation_Item, b: Conversation_Item, data) -> Gtk.Ordering:
+        return Gtk.Ordering.from_cmpfunc(a.section() - b.section())
+
+    def _on_conversation_setup(self, factory: Gtk.SignalListItemFactory, list_item: Gtk.ListItem) -> None:
+        label = Gtk.Label(xalign=0)
+        label.set_ellipsize(Pango.EllipsizeMode.END)
+        list_item.set_child(label)
+
+    def _on_conversation_bind(self, factory: Gtk.SignalListItemFactory, list_item: Gtk.ListItem) -> None:
+        label = list_item.get_child()
+        # Le libellé suit le titre de la conversation sans que la ligne soit recréée
+        label.binding = list_item.get_item().bind_property(
+            "title", label, "label", GObject.BindingFlags.SYNC_CREATE
+        )
 
-    def _load_models_find(self) -> None:
+    def _on_conversation_unbind(self, factory: Gtk.SignalListItemFactory, list_item: Gtk.ListItem) -> None:
+        label = list_item.get_child()
+        label.binding.unbind()
+        label.binding = None
+
+    def _on_section_setup(self, factory: Gtk.SignalListItemFactory, list_header: Gtk.ListHeader) -> None:
+        label = Gtk.Label(xalign=0)
+        label.add_css_class("dim-label")
+        label.add_css_class("caption-heading")
+        list_header.set_child(label)
+
+    def _on_section_bind(self, factory: Gtk.SignalListItemFactory, list_header: Gtk.ListHeader) -> None:
+        list_header.get_child().set_label(list_header.get_item().section_title())
+
+    def _load_conversations(self) -> None:
         """
-        Charge les modèles locaux et distants depuis l'API et met à jour l'interface utilisateur.
+        Met à jour le panneau latéral d'après toutes les conversations (diff par ID) :
+        seules les conversations ajoutées, supprimées ou modifiées sont touchées.
         """
-        if not self.model_find:
-            self.show_toast("Erreur : la liste des modèles n'existe pas.")
+        conversations = self.ollama_model.get_all_conversations()
+        ids = {conversation["id"] for conversation in conversations}
+        for conv_id in [conv_id for conv_id in self._conversation_items if conv_id not in ids]:
+            self._remove_conversation_row(conv_id)
+
+        new_items = []
+        for conversation in conversations:
+            if conversation["id"] in self._conversation_items:
+                self._refresh_conversation(conversation)
+            else:
+                item = Conversation_Item(conversation["id"], conversation["title"], conversation.get("updated_at", 0))
+                self._conversation_items[item.conversation_id] = item
+                new_items.append(item)
+        # Les nouvelles conversations sont ajoutées en une seule fois
+        if new_items:
+            self.conversations_store.splice(self.conversations_store.get_n_items(), 0, new_items)
+
+    def _refresh_conversation(self, conversation: dict) -> None:
+        """Ajoute une conversation au panneau latéral ou met à jour sa ligne (titre, position)."""
+        item = self._conversation_items.get(conversation["id"])
+        updated_at = conversation.get("updated_at", 0)
+        if item is None:
+            item = Conversation_Item(conversation["id"], conversation["title"], updated_at)
+            self._conversation_items[item.conversation_id] = item
+            self.conversations_store.append(item)
             return
-        local_models, distant_models = self.compare_model_lists_find()
-
-        # Effacer les boutons précédents
-        self.toggle_buttons_models.clear()
-        self.model_find.remove_all()
-        # Ajouter les modèles locaux
-        if self.downloading_models:
-            self.add_model_category(
-                models=self.downloading_models,
-                category_title="Modele en cours de Téléchargement...",
-                toggle_button_callback=self.on_model_selected,
-            )
-        self.add_model_category(
-            models=local_models,
-            category_title="Modèles locaux",
-            toggle_button_callback=self.on_model_selected,
+
+        if item.title != conversation["title"]:
+            item.title = conversation["title"]
+        if item.updated_at != updated_at:
+            # Le tri ne suit pas les changements de propriété : seule cette ligne est réinsérée
+            item.touch(updated_at)
+            found, position = self.conversations_store.find(item)
+            if found:
+                self.conversations_store.remove(position)
+            self.conversations_store.append(item)
+            if item is self.active_toggle_button:
+                self._select_conversation(item.conversation_id)
+
+    def _remove_conversation_row(self, conv_id: int) -> None:
+        item = self._conversation_items.pop(conv_id, None)
+        if item is not None:
+            found, position = self.conversations_store.find(item)
+            if found:
+                self.conversations_store.remove(position)
+
+    def _select_conversation(self, conv_id: int) -> None:
+        """Sélectionne une conversation dans le panneau latéral (ce qui l'affiche)."""
+        item = self._conversation_items.get(conv_id)
+        model = self.conversations_selection.get_model()
+        for position in range(model.get_n_items()):
+            if model.get_item(position) is item:
+                self.conversations_selection.set_selected(position)
+                return
+
+    def _setup_models_view(self) -> None:
+        """
+        Associe la vue des modèles au modèle de données du gestionnaire de modèles : une section
+        par catégorie, dont seules les lignes visibles possèdent un widget. La vue affiche
+        immédiatement le dernier état connu, puis se met à jour à chaque publication.
+        """
+        self.models_selection = Gtk.SingleSelection(
+            model=Gtk.FlattenListModel(model=self.model_manager.sections), autoselect=False, can_unselect=True,
         )
-        self.add_model_category(
-            models=distant_models,
-            category_title="Modèles distant",
-            toggle_button_callback=self.on_model_selected,
+        self.models_selection.connect("selection-changed", self.on_model_selected)
+
+        factory = Gtk.SignalListItemFactory()
+        factory.connect("setup", self._on_model_setup)
+        factory.connect("bind", self._on_model_bind)
+        header_factory = Gtk.SignalListItemFactory()
+        header_factory.connect("setup", self._on_section_setup)
+        header_factory.connect("bind", self._on_model_section_bind)
+
+        self.model_find.set_factory(factory)
+        self.model_find.set_header_factory(header_factory)
+        self.model_find.set_model(self.models_selection)
+        self.model_manager.connect('local-models-changed', self._populate_models_list)
+
+        for dropdown, options in (
+            (self.model_sort_dropdown, MODEL_SORT_OPTIONS),
+            (self.model_modality_dropdown, MODEL_MODALITY_FILTERS),
+            (self.model_size_dropdown, MODEL_SIZE_FILTERS),
+        ):
+            dropdown.set_model(Gtk.StringList.new([label for label, _ in options]))
+            dropdown.connect("notify::selected", self._apply_model_search)
+
+    def _on_model_setup(self, factory: Gtk.SignalListItemFactory, list_item: Gtk.ListItem) -> None:
+        name = Gtk.Label(xalign=0)
+        name.set_ellipsize(Pango.EllipsizeMode.END)
+        details = Gtk.Label(xalign=0)
+        details.set_ellipsize(Pango.EllipsizeMode.END)
+        details.add_css_class("dim-label")
+        details.add_css_class("caption")
+        box = Gtk.Box(orientation=Gtk.Orientation.VERTICAL)
+        box.append(name)
+        box.append(details)
+        list_item.set_child(box)
+
+    def _on_model_bind(self, factory: Gtk.SignalListItemFactory, list_item: Gtk.ListItem) -> None:
+        item = list_item.get_item()
+        name = list_item.get_child().get_first_child()
+        details = name.get_next_sibling()
+        name.set_label(item.name)
+        summary = describe(item.data) if item.category == 'distant' else ""
+        details.set_label(summary)
+        details.set_visible(bool(summary))
+
+    def _on_model_section_bind(self, factory: Gtk.SignalListItemFactory, list_header: Gtk.ListHeader) -> None:
+        list_header.get_child().set_label(CATEGORY_TITLES[list_header.get_item().category])
+
+    @Gtk.Template.Callback()
+    def on_model_search_changed(self, entry: Gtk.SearchEntry) -> None:
+        self._apply_model_search()
+
+    def _apply_model_search(self, *args) -> None:
+        """Applique au catalogue le texte recherché, le tri et les filtres choisis."""
+        self.model_manager.search(
+            self.model_search_entry.get_text(),
+            MODEL_SORT_OPTIONS[self.model_sort_dropdown.get_selected()][1],
+            MODEL_MODALITY_FILTERS[self.model_modality_dropdown.get_selected()][1],
+            MODEL_SIZE_FILTERS[self.model_size_dropdown.get_selected()][1],
         )
 
-    def move_model_category(self, model: list, category_title: str):
-        if not self.downloading_models:
-            self.downloading_models = []
-            self.downloading_models.append(model)
-            self._load_models_find()
-        else:
-            self.downloading_models.append(model)
-            self._load_models_find()
-
-    def compare_model_lists_find(self) -> list:
-        """
-        Compare la liste de modele distante à la local et supprime de
-        la liste distante les model déjà installé en local
-        """
-        # Récupérer les modèles depuis les API
-        local_models = self.ollama_client.get_list_models().get('models', [])
-        distant_models = self.ollama_client.get_distant_models()
-        # Supprimer les doublons entre local_models et distant_models
-        local_model_names = {model['name'] for model in local_models}
-        filtered_distant_models = [model for model in distant_models if model['name'] not in local_model_names]
-        # Combiner les deux listes sans doublons
-        models = local_models + filtered_distant_models
-
-        return local_models, filtered_distant_models
-
-    def add_model_category(self, models: list, category_title: str, toggle_button_callback) -> None:
-        """
-        Ajoute une catégorie de modèles avec un header et des boutons pour chaque modèle.
-
-        :param models: Liste de modèles à afficher.
-        :param category_title: Titre de la catégorie (ex: "Modèles locaux", "Modèles distants").
-        :param toggle_button_callback: Callback à connecter aux boutons de chaque modèle.
-        """
-        if models:
-            # Ajouter un header pour la catégorie
-            header = Gtk.Label(label=category_title)
-            header.get_style_context().add_class("list-group-header")
-            header.set_halign(Gtk.Align.START)
-            row_header = Gtk.ListBoxRow()
-            row_header.set_activatable(False)
-            row_header.set_child(header)
-            self.model_find.append(row_header)
-
-            # Ajouter les modèles de la catégorie
-            for model_data in models:
-                button = Gtk.ToggleButton(label=model_data['name'])
-                button.set_has_frame(False)
-                button.model_data = model_data
-                button.connect("toggled", toggle_button_callback)
-                button.set_halign(Gtk.Align.START)  # Aligne le bouton à droite
-                self.toggle_buttons_models.append(button)
-
-                # Créer une ligne pour chaque bouton de modèle
-                row = Gtk.ListBoxRow()
-                row.set_child(button)
-                self.model_find.append(row)
+    def _load_models_find(self) -> None:
+        """
+        Demande au gestionnaire de modèles de relire l'inventaire local et le catalogue distant
+        (hors du thread principal) ; la vue est mise à jour à la réception des résultats.
+        """
+        self.model_manager.refresh()
+
+    def move_model_category(self, model: dict, category_title: str):
+        self.model_manager.set_downloading(model)
 
     def show_toast(self, message: str) -> None:
         """Affiche un toast avec un message donné."""
         self.toast_overlay.add_toast(Adw.Toast(title=message))
 
+    def _run_archive_task(self, label: str, task, on_done) -> None:
+        """
+        Exécute une tâche d'import/export dans un thread en affichant sa progression dans un toast.
+
+        :param label: Libellé affiché devant le pourcentage.
+        :param task: Fonction recevant un callback de progression, exécutée hors du thread principal.
+        :param on_done: Appelée dans le thread principal avec le résultat de la tâche (ou None en cas d'erreur).
+        """
+        toast = Adw.Toast(title=f"{label} : 0 %")
+        toast.set_timeout(0)
+        self.toast_overlay.add_toast(toast)
+        last_percent = [0]
+
+        def on_progress(fraction: float) -> None:
+            percent = int(fraction * 100)
+            if percent != last_percent[0]:
+                last_percent[0] = percent
+                GLib.idle_add(toast.set_title, f"{label} : {percent} %")
+
+        def finish(result) -> bool:
+            toast.dismiss()
+            on_done(result)
+            return False
+
+        def worker() -> None:
+            try:
+                result = task(on_progress)
+            except Exception as e:
+                print(f"Erreur {label.lower()} : {e}")
+                result = None
+            GLib.idle_add(finish, result)
+
+        threading.Thread(target=worker, daemon=True).start()
+
+    def import_conversations(self, file_path: str) -> None:
+        """
+        Importe des conversations depuis un fichier sans bloquer l'interface.
+        Le fichier est lu dans un thread de travail, qui transmet les conversations
+        par lots au thread principal, seul à modifier les conversations.
+        """
+        imported = [0]
+
+        def add_batch(batch: list) -> bool:
+            imported[0] += self.ollama_model.add_imported(batch, save=False)
+            return False
+
+        def read(progress) -> int:
+            conversations = self.ollama_model.read_import(file_path, progress)
+            count = 0
+            while batch := list(islice(conversations, IMPORT_BATCH_SIZE)):
+                count += len(batch)
+                GLib.idle_add(add_batch, batch)
+            return count
+
+        def on_done(count) -> None:
+            # Les lots sont traités dans l'ordre de leur envoi, avant cet appel
+            if imported[0]:
+                self.ollama_model.save_to_file()
+                self._load_conversations()
+            if count is None:
+                self.show_toast(f"Échec de l'import après {imported[0]} conversation(s)")
+            else:
+                self.show_toast(f"{imported[0]} conversation(s) importée(s)")
+
+        self._run_archive_task("Import", read, on_done)
+
+    def export_conversations(self, file_path: str) -> None:
+        """Exporte les conversations vers un fichier JSONL ou Markdown sans bloquer l'interface."""
+        def on_done(count) -> None:
+            if count is None:
+                self.show_toast("Échec de l'export")
+                return
+            self.show_toast(f"{count} conversation(s) exportée(s)")
+
+        self._run_archive_task(
+            "Export",
+            lambda progress: self.ollama_model.export_to_file(file_path, progress),
+            on_done,
+        )
+
     @Gtk.Template.Callback()
     def on_personnalize_system_button_clicked(self, button: Gtk.Button):
         """
@@ -559,9 +1056,39 @@ class GtkOllamaWindow(Adw.ApplicationWindow):
             Prépare les élément graphique du téléchargement
             et appel son téléchargement dans un Thread
         """
-        # Récupérer le nom du modèle
-        model_name = self.active_toggle_button.model_data['name'] if self.active_toggle_button else "nom"
+        # Récupérer le nom du modèle (ou de la version choisie)
+        if not self.active_toggle_button:
+            return
+        model_name = self.selected_version or self.active_toggle_button.data['name']
+
+        # Prévenir avant de télécharger une version inadaptée à la machine
+        version = next(
+            (v for v in self.active_toggle_button.data.get('versions', []) if v.get('name') == model_name),
+            None,
+        ) or self.model_manager.index.version(model_name)
+        warnings = Hardware_Planner.get_default().plan(version, DEFAULT_NUM_CTX).warnings if version else []
+        if warnings:
+            dialog = Adw.MessageDialog(
+                transient_for=self,
+                modal=True,
+                heading=f"Télécharger {model_name} ?",
+                body="\n\n".join(warnings),
+                close_response="cancel",
+            )
+            dialog.add_response("cancel", "_Annuler")
+            dialog.add_response("download", "Télécharger quand même")
+            dialog.set_response_appearance("download", Adw.ResponseAppearance.DESTRUCTIVE)
+            dialog.connect("response", self._on_download_confirmed, model_name)
+            dialog.present()
+            return
+        self._start_download(model_name)
+
+    def _on_download_confirmed(self, dialog: Adw.MessageDialog, response: str, model_name: str) -> None:
+        if response == "download":
+            self._start_download(model_name)
 
+    def _start_download(self, model_name: str) -> None:
+        """Affiche la progression du téléchargement d'un modèle et le lance dans un thread."""
         # Vérifier si une barre de progression existe déjà pour ce modèle
         if model_name not in self.model_progress_bars:
             # Créer une nouvelle barre de progression si nécessaire
@@ -574,8 +1101,8 @@ class GtkOllamaWindow(Adw.ApplicationWindow):
             self.distant_buttons_options.append(progress_bar)
             self.model_progress_bars[model_name] = progress_bar
 
-            #mettre à jour sa catégorie
-            self.move_model_category(self.active_toggle_button.model_data, "model en cours de téléchargement...",)
+            #mettre à jour sa catégorie, sous le nom (et le tag) réellement téléchargé
+            self.move_model_category(dict(self.active_toggle_button.data, name=model_name), "model en cours de téléchargement...",)
 
         # Démarrer le téléchargement dans un thread séparé
         threading.Thread(target=self.downloading_model, args=(model_name,), daemon=True).start()
@@ -598,7 +1125,9 @@ class GtkOllamaWindow(Adw.ApplicationWindow):
             if progress is None:
                 print(f"Erreur lors du téléchargement de {model_name}.")
                 GLib.idle_add(progress_bar.set_fraction, 0.0)
-                break
+                GLib.idle_add(progress_bar.set_text, f"Échec du téléchargement de {model_name}.")
+                GLib.idle_add(self.model_manager.cancel_downloading, model_name)
+                return
             else:
                 print(f"Progression de {model_name} : {progress * 100:.2f}%")
                 GLib.idle_add(progress_bar.set_fraction, progress)
@@ -606,6 +1135,8 @@ class GtkOllamaWindow(Adw.ApplicationWindow):
         # Mise à jour finale lorsque le téléchargement est terminé
         GLib.idle_add(progress_bar.set_text, f"{model_name} téléchargé.")
         print(f"Téléchargement terminé pour {model_name}")
+        # Le modèle quitte les téléchargements quand l'inventaire local le contient
+        self.model_manager.refresh()
 
     @Gtk.Template.Callback()
     def on_trash_model_clicked(self, button: Gtk.Button) -> None:
@@ -635,60 +1166,49 @@ class GtkOllamaWindow(Adw.ApplicationWindow):
             self.conv_options.set_visible(True)
             self.conv_option_set_visible.set_icon_name("go-down-symbolic")
 
-    def _create_conversation_button(self, title: str) -> Gtk.ToggleButton:
-        """Ajoute une conversation au panneau latéral."""
-        button = Gtk.ToggleButton(label=title)
-        button.conversation_id = len(self.ollama_model.get_all_conversations())
-        button.connect("toggled", self.on_conversation_selected)
-        self.toggle_buttons_conv.append(button)
-        return button
-
-    def on_conversation_selected(self, button: Gtk.ToggleButton) -> None:
-        """Gère la sélection et le basculement des conversation."""
-        if button.get_active():
-            self.active_toggle_button = button
-            for other_button in self.toggle_buttons_conv:
-                if other_button != button:
-                    other_button.set_active(False)
-            conv_id = button.conversation_id
-            self.is_conversation_active(conv_id)
-
-    def on_model_selected(self, button: Gtk.ToggleButton) -> None:
-        if button.get_active():
-            self.active_toggle_button = button
-            model_name = self.active_toggle_button.model_data['name']
-
-            # Vérifier si un téléchargement est en cours pour ce modèle
-            if model_name in self.model_progress_bars:
-                progress_bar = self.model_progress_bars[model_name]
-                if progress_bar.get_fraction() < 1.0:
-                    # Afficher uniquement la barre de progression du modèle sélectionné
-                    for bar_model, progress_bar in self.model_progress_bars.items():
-                        if bar_model == model_name:
-                            progress_bar.set_visible(True)
-                        else:
-                            progress_bar.set_visible(False)
-                    return
-                else:
-                    print(f"Téléchargement terminé pour {model_name}.")
-            else:
-                # Si aucun téléchargement n'est actif, cacher toutes les barres de progression
-                for progress_bar in self.model_progress_bars.values():
-                    progress_bar.set_visible(False)
+    def on_conversation_selected(self, selection: Gtk.SingleSelection, position: int, n_items: int) -> None:
+        """Affiche la conversation sélectionnée dans le panneau latéral."""
+        item = selection.get_selected_item()
+        # Une ligne réinsérée (nouveau message) perd un instant sa sélection : rien à recharger
+        if item is None or item is self.active_toggle_button:
+            return
+        self.active_toggle_button = item
+        self.is_conversation_active(item.conversation_id)
 
-            # Vérifier l'état du modèle et afficher les bons boutons
-            if self.active_toggle_button.model_data.get('last_updated') is not None:
-                self.stack_model_buttons_options.set_visible_child(self.distant_buttons_options)
+    def on_model_selected(self, selection: Gtk.SingleSelection, position: int, n_items: int) -> None:
+        item = selection.get_selected_item()
+        # Une ligne remplacée (recherche, mise à jour du catalogue) perd sa sélection : rien à afficher
+        if item is None or item is self.active_toggle_button:
+            return
+        self.active_toggle_button = item
+        model_name = item.name
+
+        # Vérifier si un téléchargement est en cours pour ce modèle
+        if model_name in self.model_progress_bars:
+            progress_bar = self.model_progress_bars[model_name]
+            if progress_bar.get_fraction() < 1.0:
+                # Afficher uniquement la barre de progression du modèle sélectionné
+                for bar_model, progress_bar in self.model_progress_bars.items():
+                    if bar_model == model_name:
+                        progress_bar.set_visible(True)
+                    else:
+                        progress_bar.set_visible(False)
+                return
             else:
-                self.stack_model_buttons_options.set_visible_child(self.local_buttons_options)
+                print(f"Téléchargement terminé pour {model_name}.")
+        else:
+            # Si aucun téléchargement n'est actif, cacher toutes les barres de progression
+            for progress_bar in self.model_progress_bars.values():
+                progress_bar.set_visible(False)
 
-            # Désactiver les autres boutons
-            for other_button in self.toggle_buttons_models:
-                if other_button != button:
-                    other_button.set_active(False)
+        # Vérifier l'état du modèle et afficher les bons boutons
+        if item.data.get('last_updated') is not None:
+            self.stack_model_buttons_options.set_visible_child(self.distant_buttons_options)
+        else:
+            self.stack_model_buttons_options.set_visible_child(self.local_buttons_options)
 
-            # Construire les informations du modèle
-            self._build_model_infos(button.model_data)
+        # Construire les informations du modèle
+        self._build_model_infos(item.data)
 
     def _build_model_infos(self, data: dict):
         if not data:
@@ -696,6 +1216,8 @@ class GtkOllamaWindow(Adw.ApplicationWindow):
 
         allowed_keys = {"name", "model", "modified_at", "size", "versions", "pulls", "tags", "last_updated", "description"}
 
+        self.selected_version = None
+
         # Vider les anciennes lignes
         for row in getattr(self, "action_rows", []):
             self.model_infos.remove(row)
@@ -718,9 +1240,10 @@ class GtkOllamaWindow(Adw.ApplicationWindow):
             }.get(key, key.capitalize())
 
             if key == "versions" and isinstance(value, list):
-                # Créer un AdwExpanderRow pour les versions
+                # Créer un AdwExpanderRow pour les versions, classées selon leur adéquation à la machine
                 expander_row = Adw.ExpanderRow(title=label_text)
-                for v in value:
+                for plan in Hardware_Planner.get_default().rank(value, DEFAULT_NUM_CTX):
+                    v = plan.version
                     version_name = v.get("name", "N/A")
                     latest = v.get("latest", "")
                     size = v.get("size", "N/A")
@@ -728,9 +1251,15 @@ class GtkOllamaWindow(Adw.ApplicationWindow):
                     input_type = v.get("input", "N/A")
                     latest_str = f" ({latest})" if latest else ""
 
-                    # Créer une ActionRow pour chaque version
+                    # Créer une ActionRow pour chaque version ; l'activer la choisit pour le téléchargement
                     version_row = Adw.ActionRow(title=f"{version_name}{latest_str}")
-                    version_row.set_subtitle(f"{size} · {context} · {input_type}")
+                    version_row.set_subtitle(f"{size} · {context} · {input_type}\n{plan.summary()}")
+                    if plan.footprint is not None:
+                        icon = Gtk.Image.new_from_icon_name(FIT_ICONS[plan.fit])
+                        icon.set_tooltip_text("\n".join(plan.warnings) or "Adapté à cette machine")
+                        version_row.add_suffix(icon)
+                    version_row.set_activatable(True)
+                    version_row.connect("activated", self._on_version_activated, version_name)
 
                     expander_row.add_row(version_row)
 
@@ -743,12 +1272,17 @@ class GtkOllamaWindow(Adw.ApplicationWindow):
                 self.model_infos.add(row)
                 self.action_rows.append(row)
 
+    def _on_version_activated(self, row: Adw.ActionRow, version_name: str) -> None:
+        """Choisit la version téléchargée par le bouton de téléchargement."""
+        self.selected_version = version_name
+        self.show_toast(f"Version {version_name} sélectionnée")
+
     def is_conversation_active(self, conv_id: int) -> None:
         conversation = self.ollama_model.get_conversation(conv_id)
         title = conversation['title']
         self.conv_title.set_label(title)
         self.load_active_model(conversation)
-        self.load_conversation_to_chat(conversation)
+        self.load_conversation_to_chat(conversation, use_cache=True)
         
     def load_active_model(self, conversation: Dict[str, str]) -> None:
         """Active le modèle dans le GtkComboBoxText."""
@@ -760,27 +1294,56 @@ class GtkOllamaWindow(Adw.ApplicationWindow):
                 return
             self.combo_models_list.set_active(-1)
 
-    def load_conversation_to_chat(self, conversation: Dict[str, Union[str, List[Dict[str, str]]]]) -> None:
-        """Charge les messages d'une conversation dans l'interface."""
-        self._clear_messages()  # Réinitialiser les messages affichés
-
-        for message in conversation["history"]:
-            # Ajouter un identifiant unique au message
-            message['id'] = self.generate_message_id()  # Méthode pour générer un ID unique
-
-            # Déterminer si le message est envoyé par l'utilisateur ou l'assistant
-            is_sent = message["role"] == "user"
-
-            # Créer un widget MessageWidget pour chaque message
-            message_widget = Message_Widget(message["content"], is_sent, self.delete_message, message['id'])
-
-            # Créer un ListBoxRow pour chaque message
-            list_box_row = Gtk.ListBoxRow()
-            list_box_row.set_child(message_widget)
-
-            # Ajouter le ListBoxRow à la messages_list
-            self.messages_list.append(list_box_row)
-            self.scroll_to_bottom()
+    def load_conversation_to_chat(self, conversation: Dict[str, Union[str, List[Dict[str, str]]]],
+                                  use_cache: bool = False) -> None:
+        """
+        Charge les messages d'une conversation dans l'interface.
+        Les messages les plus récents sont affichés immédiatement ; les plus anciens sont
+        ajoutés en tête de liste par lots, pendant les cycles d'inactivité de la boucle principale.
+        Args:
+            conversation (dict): La conversation à afficher.
+            use_cache (bool): Réutilise la liste déjà construite si la conversation a été affichée récemment.
+        """
+        conv_id = conversation["id"]
+        store = self._conversation_stores.get(conv_id) if use_cache else None
+        if store is None:
+            history = conversation["history"]
+            # Seul le fil actif de l'arbre est affiché
+            messages = history.path()
+            end = max(len(messages) - INITIAL_MESSAGES, 0)
+            store = Gio.ListStore(item_type=Message_Item)
+            store.splice(0, 0, [self._create_message_item(history, message) for message in messages[end:]])
+
+            def load_older_messages() -> bool:
+                """Ajoute le lot de messages précédant les messages déjà chargés."""
+                nonlocal end
+                if self._conversation_stores.get(conv_id) is not store:
+                    # Liste reconstruite ou retirée du cache entre-temps
+                    return False
+                start = max(end - LOAD_BATCH_SIZE, 0)
+                # Gtk.ListView garde sa position d'ancrage : la vue ne bouge pas pendant l'ajout
+                store.splice(0, 0, [self._create_message_item(history, message) for message in messages[start:end]])
+                end = start
+                return end > 0
+
+            if end:
+                GLib.idle_add(load_older_messages, priority=GLib.PRIORITY_LOW)
+
+        self._conversation_stores[conv_id] = store
+        self._conversation_stores.move_to_end(conv_id)
+        while len(self._conversation_stores) > CONVERSATION_CACHE_SIZE:
+            self._conversation_stores.popitem(last=False)
+
+        self._set_messages_store(store)
+        GLib.idle_add(self.scroll_to_bottom)
+
+    @staticmethod
+    def _create_message_item(history, message) -> Message_Item:
+        """Crée l'élément affiché pour un message de l'historique."""
+        # Position du message parmi ses versions alternatives
+        branches = history.siblings(message['id'])
+        branch_info = (branches.index(message['id']) + 1, len(branches))
+        return Message_Item(message["content"], message["role"] == "user", message['id'], branch_info)
 
     def generate_message_id(self) -> int:
         """Génère un ID unique pour chaque message."""
@@ -0,0 +1,4 @@
+import os, sys
+
+# Les modules de src/ollama_tools s'importent comme le paquet ollama_tools
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src'))
@@ -0,0 +1,70 @@
+import os
+import pytest
+
+from ollama_tools.blob_store import Blob_Store
+
+LARGE = "x" * 64
+
+
+@pytest.fixture
+def store(tmp_path) -> Blob_Store:
+    return Blob_Store(str(tmp_path / 'blobs'), threshold=32)
+
+
+def blob_exists(store: Blob_Store, digest: str) -> bool:
+    return os.path.exists(store._path(digest))
+
+
+def test_is_large(store):
+    assert store.is_large(LARGE)
+    assert not store.is_large("court")
+    assert not store.is_large(None)
+
+
+def test_retain_shares_content_and_counts_references(store):
+    digest, first = store.retain(LARGE)
+    _, second = store.retain("x" * 64)
+    assert first is second
+    assert store.refcounts[digest] == 2
+    assert blob_exists(store, digest)
+    assert store.read(digest) == LARGE
+
+
+def test_release_deletes_only_after_flush(store):
+    digest, _ = store.retain(LARGE)
+    store.retain(LARGE)
+
+    store.release(digest)
+    store.flush_deletions()
+    assert blob_exists(store, digest)
+
+    store.release(digest)
+    assert digest not in store.refcounts
+    # La sauvegarde n'est pas encore écrite : le fichier reste jusqu'à flush_deletions
+    assert blob_exists(store, digest)
+    store.flush_deletions()
+    assert not blob_exists(store, digest)
+
+
+def test_retain_after_release_cancels_deletion(store):
+    digest, _ = store.retain(LARGE)
+    store.release(digest)
+    store.retain_digest(digest)
+    store.flush_deletions()
+    assert blob_exists(store, digest)
+    assert store.read(digest) == LARGE
+
+
+def test_collect_garbage_removes_unreferenced_blobs(store):
+    kept, _ = store.retain(LARGE)
+    orphan, _ = store.retain("y" * 64)
+    # Une nouvelle session ne référence que les blobs de la sauvegarde chargée
+    reloaded = Blob_Store(store.directory, threshold=32)
+    reloaded.retain_digest(kept)
+    assert reloaded.collect_garbage() == 1
+    assert blob_exists(store, kept)
+    assert not blob_exists(store, orphan)
+
+
+def test_read_missing_blob(store):
+    assert store.read("0" * 64).startswith("[Contenu introuvable")
@@ -0,0 +1,105 @@
+import math
+import pytest
+
+from ollama_tools.catalogue_index import Catalogue_Index, fuzzy_score, parse_age, parse_parameters, parse_pulls
+
+MODELS = [
+    {
+        'name': 'llama3.2', 'description': "Meta's Llama 3.2 small models", 'pulls': '49.6M',
+        'sizes': ['1b', '3b'], 'last_updated': '1 year ago',
+        'versions': [{'name': 'llama3.2:latest', 'latest': 'latest', 'input': 'Text'}],
+    },
+    {
+        'name': 'qwen2.5vl', 'description': "Vision-language model", 'pulls': '605.3K',
+        'sizes': ['3b', '7b', '32b', '72b'], 'last_updated': '2 weeks ago',
+        'versions': [{'name': 'qwen2.5vl:7b', 'input': 'Text, Image'}],
+    },
+    {
+        'name': 'mixtral', 'description': "Mixture of experts from Mistral AI", 'pulls': '1.2M',
+        'sizes': ['8x7b', '8x22b'], 'last_updated': 'yesterday',
+    },
+    {'description': "Sans nom : ignoré"},
+]
+
+
+@pytest.fixture
+def index() -> Catalogue_Index:
+    return Catalogue_Index(MODELS)
+
+
+def names(entries) -> list:
+    return [entry.data['name'] for entry in entries]
+
+
+def test_parsers():
+    assert parse_pulls('49.6M') == 49_600_000
+    assert parse_pulls('1,234') == 1234
+    assert parse_pulls(None) == 0
+    assert parse_parameters('8x7b') == 56
+    assert parse_parameters('270m') == pytest.approx(0.27)
+    assert parse_parameters('latest') is None
+    assert parse_age('an hour ago') == 3600
+    assert parse_age('3 days ago') == 3 * 86400
+    assert parse_age('bientôt') == math.inf
+
+
+def test_fuzzy_score_prefers_prefix_then_substring_then_subsequence():
+    assert fuzzy_score('lla', 'llama3.2') > fuzzy_score('ama', 'llama3.2') > fuzzy_score('lm3', 'llama3.2') > 0
+    assert fuzzy_score('xyz', 'llama3.2') == 0
+
+
+def test_search_without_query_sorts_by_pulls(index):
+    assert names(index.search()) == ['llama3.2', 'mixtral', 'qwen2.5vl']
+
+
+def test_search_matches_name_and_description(index):
+    assert names(index.search('mix')) == ['mixtral']
+    assert names(index.search('vision')) == ['qwen2.5vl']
+    assert names(index.search('qwn')) == ['qwen2.5vl']
+    assert index.search('model inconnu') == []
+
+
+@pytest.mark.parametrize('sort, expected', [
+    ('size', ['llama3.2', 'qwen2.5vl', 'mixtral']),
+    ('updated', ['mixtral', 'qwen2.5vl', 'llama3.2']),
+])
+def test_sort(index, sort, expected):
+    assert names(index.search(sort=sort)) == expected
+
+
+def test_filters(index):
+    assert names(index.search(modality='image')) == ['qwen2.5vl']
+    assert names(index.search(max_parameters=2)) == ['llama3.2']
+    # Sans version connue, un modèle ne lit que du texte
+    assert 'mixtral' in names(index.search(modality='text'))
+
+
+def test_incremental_search_rescans_previous_matches(index):
+    assert names(index.search('m', sort='pulls')) == ['llama3.2', 'mixtral', 'qwen2.5vl']
+    assert names(index.search('mi')) == ['mixtral']
+    # Les candidats de la recherche prolongée sont les seuls résultats de la précédente
+    index.search('m')
+    index._last[3][:] = [match for match in index._last[3] if match[1].data['name'] == 'llama3.2']
+    assert names(index.search('mi')) == []
+
+
+def test_search_restarts_when_query_is_not_an_extension(index):
+    index.search('mix')
+    assert names(index.search('qwen')) == ['qwen2.5vl']
+    index.search('l', modality='image')
+    assert names(index.search('ll')) == ['llama3.2']
+
+
+def test_version_lookup_by_canonical_name(index):
+    assert index.version('llama3.2')['name'] == 'llama3.2:latest'
+    assert index.version('llama3.2:latest') is index.version('llama3.2')
+    assert index.version('qwen2.5vl:7b')['input'] == 'Text, Image'
+    # Aucune version de qwen2.5vl n'est marquée 'latest'
+    assert index.version('qwen2.5vl') is None
+    assert index.version('inconnu') is None
+
+
+def test_entries_by_name(index):
+    assert index.by_name['mixtral'].key == 'mixtral:latest'
+    assert index.by_name['qwen2.5vl'].modalities == {'text', 'image'}
+    assert len(index.entries) == 3
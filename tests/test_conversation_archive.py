@@ -0,0 +1,129 @@
+import json
+import pytest
+
+from ollama_tools import conversation_archive
+from ollama_tools.conversation_archive import export_to_jsonl, export_to_markdown, iter_conversations_from_file
+from ollama_tools.message_tree import Message_Tree
+
+
+def make_conversation() -> dict:
+    history = Message_Tree()
+    history.add('user', "Bonjour")
+    history.add('assistant', "Bonjour !")
+    history.add('user', "Explique les listes")
+    history.add('user', "Explique les tuples", parent=2)
+    history.switch_branch(3)
+    return {
+        'id': 7, 'model': 'llama3', 'title': "Branches", 'system': "Réponds en français",
+        'history': history, 'updated_at': 1700000000.5, 'created_at': 1600000000,
+    }
+
+
+def read_all(path) -> list:
+    return list(iter_conversations_from_file(str(path)))
+
+
+def test_jsonl_round_trip_keeps_tree(tmp_path):
+    path = tmp_path / 'export.jsonl'
+    assert export_to_jsonl([make_conversation()], str(path)) == 1
+
+    [conversation] = read_all(path)
+    assert conversation['title'] == "Branches"
+    assert conversation['system'] == "Réponds en français"
+    assert conversation['leaf'] == 3
+    assert [(m['id'], m['parent'], m['content']) for m in conversation['history']] == [
+        (1, None, "Bonjour"), (2, 1, "Bonjour !"), (3, 2, "Explique les listes"), (4, 2, "Explique les tuples"),
+    ]
+    assert (conversation['updated_at'], conversation['created_at']) == (1700000000.5, 1600000000.0)
+
+
+def test_jsonl_invalid_message_children_are_relinked(tmp_path):
+    path = tmp_path / 'export.jsonl'
+    records = [
+        {'type': 'conversation', 'title': "Trou", 'leaf': 3},
+        {'type': 'message', 'id': 1, 'parent': None, 'role': 'user', 'content': "Question"},
+        {'type': 'message', 'id': 2, 'parent': 1, 'role': 'tool', 'content': "ignoré"},
+        {'type': 'message', 'id': 3, 'parent': 2, 'role': 'assistant', 'content': "Réponse"},
+    ]
+    path.write_text("\n".join(json.dumps(r) for r in records) + "\nligne illisible\n", encoding='utf-8')
+
+    [conversation] = read_all(path)
+    assert [(m['id'], m['parent']) for m in conversation['history']] == [(1, None), (3, 1)]
+    assert conversation['leaf'] == 3
+
+
+def test_json_array_of_linear_conversations(tmp_path):
+    path = tmp_path / 'saves.json'
+    path.write_text(json.dumps([
+        {'title': "Un", 'history': [{'role': 'user', 'content': "a"}, {'role': 'assistant', 'content': "b"}]},
+        {'name': "Deux", 'messages': [{'role': 'user', 'content': [{'type': 'text', 'text': "c"}]}]},
+        "ignoré",
+    ]), encoding='utf-8')
+
+    conversations = read_all(path)
+    assert [c['title'] for c in conversations] == ["Un", "Deux"]
+    assert conversations[0]['history'] == [{'role': 'user', 'content': "a"}, {'role': 'assistant', 'content': "b"}]
+    assert 'leaf' not in conversations[0]
+    assert conversations[1]['history'] == [{'role': 'user', 'content': "c"}]
+
+
+def test_chatgpt_mapping_follows_current_node(tmp_path):
+    def node(parent, role, text, children=()):
+        message = {'author': {'role': role}, 'content': {'parts': [text]}} if role else None
+        return {'parent': parent, 'message': message, 'children': list(children)}
+
+    path = tmp_path / 'conversations.json'
+    path.write_text(json.dumps([{
+        'title': "ChatGPT", 'default_model_slug': 'gpt-4o', 'update_time': 1710000000.0,
+        'current_node': 'c',
+        'mapping': {
+            'root': node(None, None, None, ['q']),
+            'q': node('root', 'user', "Question", ['a', 'c']),
+            'a': node('q', 'assistant', "Première réponse"),
+            'c': node('q', 'assistant', "Réponse régénérée"),
+        },
+    }]), encoding='utf-8')
+
+    [conversation] = read_all(path)
+    assert conversation['model'] == 'gpt-4o'
+    assert [m['content'] for m in conversation['history']] == ["Question", "Réponse régénérée"]
+    assert conversation['updated_at'] == 1710000000.0
+
+
+def test_json_array_split_across_reads(tmp_path, monkeypatch):
+    monkeypatch.setattr(conversation_archive, 'READ_CHUNK_SIZE', 3)
+    conversations = [
+        {'title': f"Conversation {i}", 'messages': [{'role': 'user', 'content': 'é"\\]} ' * i}]}
+        for i in range(1, 6)
+    ]
+    path = tmp_path / 'export.json'
+    path.write_text(json.dumps(conversations, ensure_ascii=False), encoding='utf-8')
+    assert [c['history'][0]['content'] for c in read_all(path)] == [c['messages'][0]['content'] for c in conversations]
+
+
+def test_json_array_skips_corrupt_element(tmp_path):
+    path = tmp_path / 'export.json'
+    path.write_text(
+        '[{"title": "A", "messages": [{"role": "user", "content": "a"}]},'
+        ' {"title": "B", "messages": [1 2]},'
+        ' {"title": "C", "messages": [{"role": "user", "content": "c"}]}]',
+        encoding='utf-8',
+    )
+    assert [c['title'] for c in read_all(path)] == ["A", "C"]
+
+
+def test_json_array_element_size_is_capped(tmp_path, monkeypatch):
+    monkeypatch.setattr(conversation_archive, 'MAX_ITEM_SIZE', 16)
+    monkeypatch.setattr(conversation_archive, 'READ_CHUNK_SIZE', 8)
+    path = tmp_path / 'export.json'
+    path.write_text(json.dumps([{'title': "x" * 100}]), encoding='utf-8')
+    with pytest.raises(ValueError):
+        read_all(path)
+
+
+def test_markdown_exports_active_branch(tmp_path):
+    path = tmp_path / 'export.md'
+    export_to_markdown([make_conversation()], str(path))
+    text = path.read_text(encoding='utf-8')
+    assert "Explique les listes" in text
+    assert "Explique les tuples" not in text
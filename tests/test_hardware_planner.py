@@ -0,0 +1,101 @@
+import os
+import pytest
+
+from ollama_tools.hardware_planner import (
+    CPU_MEMORY_BANDWIDTH, Hardware_Planner, NO_SIMD_FACTOR, parse_context, parse_size, read_cpuinfo, read_meminfo,
+)
+
+# Extraits de /proc/meminfo et /proc/cpuinfo de quelques machines
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures', 'proc')
+
+SMALL = {'name': 'llama3.2:3b', 'size': '2.0GB', 'context': '128K'}
+MEDIUM = {'name': 'qwen2.5:14b', 'size': '10GB', 'context': '32K'}
+LARGE = {'name': 'llama3.3:70b', 'size': '43GB', 'context': '128K'}
+
+
+def fixture(name: str) -> str:
+    return os.path.join(FIXTURES_DIR, name)
+
+
+def planner(meminfo: str = 'meminfo_16g', cpuinfo: str = 'cpuinfo_x86') -> Hardware_Planner:
+    return Hardware_Planner(fixture(meminfo), fixture(cpuinfo))
+
+
+def test_parse_labels():
+    assert parse_size('4.7GB') == 4_700_000_000
+    assert parse_size('815MB') == 815_000_000
+    assert parse_size('-') is None
+    assert parse_context('128K') == 131072
+    assert parse_context('2048') == 2048
+    assert parse_context(None) is None
+
+
+def test_read_meminfo():
+    memory = read_meminfo(fixture('meminfo_16g'))
+    assert memory['MemTotal'] == 16273488 * 1024
+    assert memory['MemAvailable'] == 11718992 * 1024
+    # Compteur sans unité : la valeur est gardée telle quelle
+    assert memory['HugePages_Total'] == 0
+    assert read_meminfo(fixture('absent')) == {}
+
+
+@pytest.mark.parametrize('name, cores, flag', [
+    ('cpuinfo_x86', 4, 'avx2'),
+    ('cpuinfo_arm', 2, 'asimd'),
+    ('cpuinfo_old_x86', 2, 'sse4_1'),
+])
+def test_read_cpuinfo(name, cores, flag):
+    count, flags = read_cpuinfo(fixture(name))
+    assert count == cores
+    assert flag in flags
+
+
+def test_read_cpuinfo_missing_file_uses_cpu_count():
+    count, flags = read_cpuinfo(fixture('absent'))
+    assert count == (os.cpu_count() or 1)
+    assert flags == frozenset()
+
+
+@pytest.mark.parametrize('cpuinfo, simd', [('cpuinfo_x86', True), ('cpuinfo_arm', True), ('cpuinfo_old_x86', False)])
+def test_has_simd(cpuinfo, simd):
+    assert planner(cpuinfo=cpuinfo).has_simd is simd
+
+
+@pytest.mark.parametrize('version, fit', [(SMALL, 'fits'), (MEDIUM, 'tight'), (LARGE, 'swap')])
+def test_fit_levels(version, fit):
+    plan = planner().plan(version)
+    assert plan.fit == fit
+    assert bool(plan.warnings) is (fit != 'fits')
+
+
+def test_context_is_limited_to_the_model():
+    assert planner().plan(SMALL, num_ctx=8192).num_ctx == 8192
+    assert planner().plan({'name': 'tiny:1b', 'size': '1GB', 'context': '2K'}, num_ctx=8192).num_ctx == 2048
+
+
+def test_speed_depends_on_simd_and_cores():
+    fast = planner().plan(SMALL).tokens_per_second
+    assert fast == pytest.approx(CPU_MEMORY_BANDWIDTH / (2e9 + 16 * 1024 * 3 * 4096))
+    # Deux cœurs sans AVX2 : débit réduit de moitié puis par NO_SIMD_FACTOR
+    slow = planner(cpuinfo='cpuinfo_old_x86').plan(SMALL)
+    assert slow.tokens_per_second == pytest.approx(fast * NO_SIMD_FACTOR / 2)
+    assert any("AVX2" in warning for warning in slow.warnings)
+
+
+def test_memory_is_read_at_each_plan(tmp_path):
+    meminfo = tmp_path / 'meminfo'
+    with open(fixture('meminfo_16g'), 'r', encoding='ascii') as f:
+        meminfo.write_text(f.read(), encoding='ascii')
+    hardware = Hardware_Planner(str(meminfo), fixture('cpuinfo_x86'))
+    assert hardware.plan(MEDIUM).fit == 'tight'
+    with open(fixture('meminfo_4g'), 'r', encoding='ascii') as f:
+        meminfo.write_text(f.read(), encoding='ascii')
+    assert hardware.plan(MEDIUM).fit == 'swap'
+
+
+def test_rank_orders_by_fit_then_speed():
+    unknown = {'name': 'mystery:latest'}
+    plans = planner().rank([LARGE, unknown, MEDIUM, SMALL])
+    assert [plan.name for plan in plans] == ['llama3.2:3b', 'qwen2.5:14b', 'llama3.3:70b', 'mystery:latest']
+    assert plans[-1].footprint is None
+    assert plans[-1].summary() == "Besoins inconnus"
@@ -0,0 +1,38 @@
+import pytest
+
+from utils import language_classifier
+from utils.language_classifier import HELD_OUT_SAMPLES, SAMPLES, accuracy, classify
+
+
+@pytest.mark.parametrize('expected, code', SAMPLES, ids=[f"{lang}-{i}" for i, (lang, _) in enumerate(SAMPLES)])
+def test_tuning_samples(expected, code):
+    assert classify(code) == expected
+
+
+def test_held_out_accuracy():
+    # Les échantillons de contrôle n'ont pas servi au réglage : seul un seuil est exigé
+    rate, _ = accuracy(HELD_OUT_SAMPLES)
+    assert rate >= 0.9
+
+
+@pytest.mark.parametrize('code', ["", "Bonjour tout le monde", "42"])
+def test_unrecognised_text(code):
+    assert classify(code) == 'text'
+
+
+def test_line_tokens_need_line_start():
+    assert classify("    def area(self) -> float:\n        return 0.0") == 'python'
+    assert classify("echo def f():") == 'shell'
+
+
+def test_only_sample_is_scored(monkeypatch):
+    monkeypatch.setattr(language_classifier, 'SAMPLE_SIZE', 16)
+    code = "Quelques mots.\n" + "#include <stdio.h>\nint main(void) { return 0; }"
+    assert classify(code) == 'text'
+
+
+def test_results_are_cached(monkeypatch):
+    code = "fn main() {\n    let mut x = 1;\n}"
+    assert classify(code) == 'rust'
+    monkeypatch.setattr(language_classifier, '_score', lambda code: pytest.fail("analyse non mise en cache"))
+    assert classify(code) == 'rust'
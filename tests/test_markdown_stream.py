@@ -0,0 +1,83 @@
+import pytest
+
+from widgets.markdown_stream import Fence_Parser, parse_inline
+
+MESSAGE = """Voici un exemple :
+
+```python
+print("a")
+```
+Et en shell :
+  ```bash
+ls ``` -la
+```
+Fin
+"""
+
+
+def merge(events) -> list:
+    """Fusionne les événements consécutifs de même type, comme les applique le widget."""
+    merged = []
+    for kind, value in events:
+        if merged and kind in ('text', 'code') and merged[-1][0] == kind:
+            merged[-1] = (kind, merged[-1][1] + value)
+        else:
+            merged.append((kind, value))
+    return merged
+
+
+def stream(text: str, size: int) -> list:
+    parser = Fence_Parser()
+    events = []
+    for start in range(0, len(text), size):
+        events += parser.feed(text[start:start + size])
+    return events + parser.finish()
+
+
+def test_complete_message_events():
+    assert merge(Fence_Parser.events(MESSAGE)) == [
+        ('text', "Voici un exemple :\n\n"),
+        ('code_open', 'python'),
+        ('code', 'print("a")\n'),
+        ('code_close', ''),
+        ('text', "Et en shell :\n"),
+        ('code_open', 'bash'),
+        ('code', "ls ``` -la\n"),
+        ('code_close', ''),
+        ('text', "Fin\n"),
+    ]
+
+
+@pytest.mark.parametrize('size', [1, 2, 3, 5, 8])
+def test_fences_split_across_feed_calls(size):
+    assert merge(stream(MESSAGE, size)) == merge(Fence_Parser.events(MESSAGE))
+
+
+def test_partial_fence_is_held_until_line_ends():
+    parser = Fence_Parser()
+    assert parser.feed("Texte\n``") == [('text', "Texte\n")]
+    assert parser.feed("`py") == []
+    assert parser.feed("thon\nx = 1\n") == [('code_open', 'python'), ('code', "x = 1\n")]
+    assert parser.feed("``") == []
+    assert parser.feed("`\n") == [('code_close', '')]
+    assert parser.text == "Texte\n```python\nx = 1\n```\n"
+
+
+def test_finish_closes_open_block():
+    parser = Fence_Parser()
+    parser.feed("```\nsans fin\n``")
+    assert parser.finish() == [('code', "``"), ('code_close', '')]
+    assert not parser.in_code
+
+
+def test_nested_info_fence_is_code_content():
+    assert Fence_Parser.parse("```md\n```python\n```\n") == [('code', "```python", 'md')]
+
+
+def test_parse_inline():
+    assert parse_inline("## Titre") == (("Titre", ('h2',)),)
+    assert parse_inline("- un **gras** et `code`") == (
+        ("• ", ('list',)), ("un ", ('list',)), ("gras", ('list', 'bold')),
+        (" et ", ('list',)), ("code", ('list', 'code')),
+    )
+    assert parse_inline("2 * 3 * 4") == (("2 * 3 * 4", ()),)
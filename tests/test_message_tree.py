@@ -0,0 +1,79 @@
+from ollama_tools.message_tree import Message_Tree
+
+
+def make_tree() -> Message_Tree:
+    """Question (1), réponse (2), puis une question modifiée (4) à côté de la question d'origine (3)."""
+    tree = Message_Tree()
+    tree.add('user', "Bonjour")
+    tree.add('assistant', "Bonjour !")
+    tree.add('user', "Explique les listes")
+    tree.add('user', "Explique les tuples", parent=2)
+    return tree
+
+
+def contents(tree: Message_Tree) -> list:
+    return [message.content for message in tree.path()]
+
+
+def test_add_extends_active_path():
+    tree = Message_Tree()
+    first = tree.add('user', "Bonjour")
+    second = tree.add('assistant', "Bonjour !")
+    assert (first.id, first.parent) == (1, None)
+    assert (second.id, second.parent) == (2, 1)
+    assert tree.leaf == 2
+    assert len(tree) == 2
+    assert second['content'] == "Bonjour !"
+
+
+def test_add_with_parent_creates_branch():
+    tree = make_tree()
+    assert tree.siblings(3) == [3, 4]
+    assert tree.leaf == 4
+    assert contents(tree) == ["Bonjour", "Bonjour !", "Explique les tuples"]
+
+
+def test_switch_branch_follows_last_visited_leaf():
+    tree = make_tree()
+    tree.add('assistant', "Un tuple est immuable.")
+    tree.switch_branch(3)
+    assert contents(tree) == ["Bonjour", "Bonjour !", "Explique les listes"]
+    tree.add('assistant', "Une liste est modifiable.")
+
+    # Revenir sur la version modifiée redescend jusqu'à sa réponse
+    tree.switch_branch(4)
+    assert tree.leaf == 5
+    tree.switch_branch(3)
+    assert tree.leaf == 6
+    # Depuis la racine, la dernière branche consultée est suivie
+    tree.switch_branch(1)
+    assert tree.leaf == 6
+
+
+def test_remove_reparents_children():
+    tree = make_tree()
+    tree.switch_branch(3)
+    assert tree.remove(2)
+    assert tree.get(3).parent == 1
+    assert tree.get(4).parent == 1
+    # Les réponses prennent la place du message supprimé parmi les enfants de son parent
+    assert tree.children[1] == [3, 4]
+    assert contents(tree) == ["Bonjour", "Explique les listes"]
+    assert not tree.remove(2)
+
+
+def test_remove_leaf_moves_leaf_to_parent():
+    tree = make_tree()
+    assert tree.remove(4)
+    assert tree.leaf == 2
+    assert tree.siblings(3) == [3]
+
+
+def test_from_rows_restores_leaf():
+    tree = make_tree()
+    rows = [[m.id, m.parent, m.role, m.content] for m in tree.to_list()]
+    restored = Message_Tree.from_rows(rows, leaf=3)
+    assert contents(restored) == ["Bonjour", "Bonjour !", "Explique les listes"]
+    assert restored.add('assistant', "Réponse").id == 5
+    # Une feuille inconnue retombe sur la dernière ligne
+    assert Message_Tree.from_rows(rows, leaf=42).leaf == 4
@@ -0,0 +1,56 @@
+import pytest
+
+pytest.importorskip('gi')
+
+from gi.repository import Gio
+from ollama_tools.model_manager import Model_Item, Model_Manager
+
+
+def make_store(names: list) -> Gio.ListStore:
+    store = Gio.ListStore(item_type=Model_Item)
+    for name in names:
+        store.append(Model_Item({'name': name}, 'local'))
+    return store
+
+
+def rows(names: list) -> list:
+    return [Model_Item({'name': name}, 'local') for name in names]
+
+
+def splice(store: Gio.ListStore, names: list) -> list:
+    """Applique _splice et retourne les notifications (position, retirées, ajoutées) émises."""
+    changes = []
+    handler = store.connect('items-changed', lambda store, *change: changes.append(change))
+    Model_Manager._splice(store, rows(names))
+    store.disconnect(handler)
+    assert [store.get_item(i).name for i in range(store.get_n_items())] == names
+    return changes
+
+
+def test_splice_unchanged_store_emits_nothing():
+    store = make_store(['a', 'b', 'c'])
+    assert splice(store, ['a', 'b', 'c']) == []
+
+
+def test_splice_replaces_only_differing_range():
+    store = make_store(['a', 'b', 'c', 'd'])
+    assert splice(store, ['a', 'x', 'y', 'd']) == [(1, 2, 2)]
+
+
+@pytest.mark.parametrize('old, new, change', [
+    (['a', 'c'], ['a', 'b', 'c'], (1, 0, 1)),
+    (['a', 'b', 'c'], ['a', 'c'], (1, 1, 0)),
+    ([], ['a'], (0, 0, 1)),
+    (['a', 'b'], [], (0, 2, 0)),
+])
+def test_splice_insertions_and_removals(old, new, change):
+    assert splice(make_store(old), new) == [change]
+
+
+def test_splice_compares_rank_and_category():
+    store = make_store(['a'])
+    changes = []
+    store.connect('items-changed', lambda store, *change: changes.append(change))
+    Model_Manager._splice(store, [Model_Item({'name': 'a'}, 'distant')])
+    Model_Manager._splice(store, [Model_Item({'name': 'a'}, 'distant', rank=1)])
+    assert changes == [(0, 1, 1), (0, 1, 1)]
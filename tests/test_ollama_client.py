@@ -0,0 +1,45 @@
+import pytest
+
+pytest.importorskip('ollama')
+
+from ollama_tools.ollama_client import Ollama_client
+from ollama_tools.message_tree import Message_Tree
+
+
+def make_conversation() -> dict:
+    history = Message_Tree()
+    history.add('user', "Bonjour")
+    history.add('assistant', "Bonjour, que puis-je faire ?")
+    history.add('user', "Explique les listes")
+    history.add('assistant', "Une liste est une séquence modifiable.")
+    return {'id': 1, 'model': 'llama3', 'system': "Réponds en français", 'history': history}
+
+
+def test_prepare_messages_sends_history():
+    conversation = make_conversation()
+    messages = Ollama_client().prepare_messages(conversation, "Et les tuples ?")
+    assert messages == [
+        {'role': 'system', 'content': "Réponds en français"},
+        {'role': 'user', 'content': "Bonjour"},
+        {'role': 'assistant', 'content': "Bonjour, que puis-je faire ?"},
+        {'role': 'user', 'content': "Explique les listes"},
+        {'role': 'assistant', 'content': "Une liste est une séquence modifiable."},
+        {'role': 'user', 'content': "Et les tuples ?"},
+    ]
+
+
+def test_prepare_messages_follows_active_branch():
+    conversation = make_conversation()
+    history = conversation['history']
+    # Régénération de la dernière réponse : le fil actif se termine sur la question
+    history.set_leaf(3)
+    messages = Ollama_client().prepare_messages(conversation, None)
+    assert [m['content'] for m in messages] == [
+        "Réponds en français", "Bonjour", "Bonjour, que puis-je faire ?", "Explique les listes",
+    ]
+
+    history.add('assistant', "Une liste se note entre crochets.")
+    history.switch_branch(4)
+    messages = Ollama_client().prepare_messages(conversation, "Merci", images=["aW1n"])
+    assert messages[-2] == {'role': 'assistant', 'content': "Une liste est une séquence modifiable."}
+    assert messages[-1] == {'role': 'user', 'content': "Merci", 'images': ["aW1n"]}
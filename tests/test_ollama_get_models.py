@@ -0,0 +1,46 @@
+import os
+import pytest
+
+pytest.importorskip('bs4')
+pytest.importorskip('requests')
+
+from ollama_tools.ollama_get_models import check_extraction, parse_content, parse_model_versions, PARSER
+
+# Pages enregistrées de ollama.com (search, library/<nom>), réduites à quelques modèles
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures', 'ollama_library')
+PARSERS = sorted({'html.parser', PARSER})
+
+
+def read_fixture(*path: str) -> str:
+    with open(os.path.join(FIXTURES_DIR, *path), 'r', encoding='utf-8') as f:
+        return f.read()
+
+
+def test_check_extraction_on_fixtures():
+    assert check_extraction(FIXTURES_DIR, rounds=1)
+
+
+@pytest.mark.parametrize('parser', PARSERS)
+def test_restricted_search_parse_matches_full_parse(parser):
+    html = read_fixture('search')
+    models = parse_content(html, parser)
+    assert models == parse_content(html, 'html.parser', parse_only=False)
+    assert [model['name'] for model in models] == ['llama3.2', 'qwen2.5vl', 'mixtral']
+    assert models[1]['sizes'] == ['3b', '7b', '32b', '72b']
+    assert models[2]['last_updated'] == '1 year ago'
+
+
+@pytest.mark.parametrize('parser', PARSERS)
+@pytest.mark.parametrize('name', sorted(os.listdir(os.path.join(FIXTURES_DIR, 'library'))))
+def test_restricted_versions_parse_matches_full_parse(parser, name):
+    html = read_fixture('library', name)
+    versions = parse_model_versions(html, parser)
+    assert versions == parse_model_versions(html, 'html.parser', parse_only=False)
+    assert versions and all(version.get('name', '').startswith(f"{name}:") for version in versions)
+
+
+def test_versions_fields():
+    versions = parse_model_versions(read_fixture('library', 'qwen2.5vl'))
+    assert versions[0] == {
+        'name': 'qwen2.5vl:latest', 'latest': 'latest', 'size': '6.0GB', 'context': '125K', 'input': 'Text, Image',
+    }
@@ -0,0 +1,89 @@
+import json
+import pytest
+
+from ollama_tools import save_format
+from ollama_tools.save_format import MAGIC, SCHEMA_VERSION, decode, encode, migrate, read_save, write_save
+
+
+def v0_conversations() -> list:
+    return [{
+        'id': 1, 'model': 'llama3', 'title': "Salut",
+        'history': [
+            {'role': 'user', 'content': "Bonjour"},
+            {'role': 'assistant', 'content': "Bonjour !"},
+        ],
+    }]
+
+
+def test_migrate_v0_to_current():
+    conversations = migrate(v0_conversations())
+    assert conversations[0]['history'] == [
+        [1, None, 'user', "Bonjour", None],
+        [2, 1, 'assistant', "Bonjour !", None],
+    ]
+    assert conversations[0]['leaf'] == 2
+
+
+def test_migrate_v1_keeps_tree_and_blobs():
+    v1 = [{
+        'id': 1, 'title': "Arbre", 'leaf': 3,
+        'history': [
+            {'id': 1, 'parent': None, 'role': 'user', 'content': "Question"},
+            {'id': 2, 'parent': 1, 'role': 'assistant', 'blob': 'abc'},
+            {'id': 3, 'parent': 1, 'role': 'assistant', 'content': "Autre réponse"},
+        ],
+    }]
+    conversations = migrate(v1)
+    assert conversations[0]['history'] == [
+        [1, None, 'user', "Question", None],
+        [2, 1, 'assistant', None, 'abc'],
+        [3, 1, 'assistant', "Autre réponse", None],
+    ]
+    assert conversations[0]['leaf'] == 3
+
+
+def test_migrate_rejects_newer_version():
+    with pytest.raises(ValueError):
+        migrate({'version': SCHEMA_VERSION + 1, 'conversations': []})
+
+
+def test_decode_legacy_json_list():
+    raw = json.dumps(v0_conversations()).encode('utf-8')
+    assert decode(raw) == migrate(v0_conversations())
+    assert decode(b"") == []
+
+
+@pytest.mark.parametrize('binary', [True, False])
+def test_encode_decode_round_trip(binary):
+    conversations = migrate(v0_conversations())
+    assert decode(encode(conversations, binary)) == conversations
+
+
+def test_decode_rejects_bad_magic():
+    pytest.importorskip('msgpack')
+    packed = encode(migrate(v0_conversations()), binary=True)
+    assert packed.startswith(MAGIC)
+    # En-tête altéré : le contenu n'est ni une sauvegarde binaire ni du JSON
+    with pytest.raises(ValueError):
+        decode(b"GTKOLLAMB" + packed[len(MAGIC) - 1:])
+    with pytest.raises(ValueError):
+        decode(MAGIC + b"\xc1\xc1")
+
+
+def test_decode_rejects_unexpected_payload():
+    with pytest.raises(ValueError):
+        decode(b"42")
+
+
+def test_binary_save_without_msgpack(monkeypatch):
+    monkeypatch.setattr(save_format, 'msgpack', None)
+    with pytest.raises(ValueError):
+        decode(MAGIC + b"\x80")
+
+
+def test_write_and_read_save(tmp_path):
+    conversations = migrate(v0_conversations())
+    path = write_save(conversations, str(tmp_path / 'saves.json'))
+    with open(path, 'rb') as f:
+        assert not f.read().startswith(MAGIC)
+    assert read_save(path) == conversations